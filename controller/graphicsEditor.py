@@ -6,10 +6,11 @@ from model.debugger.voronoiDelaunayDebugger import VoronoiDelaunayDebugger
 # ---------------------------
 from model.algorithms.algorithmsLine import LineContext, LineStrategyInterface
 from model.algorithms.algorithmsSecondOrderLine import SecondOrderLineContext, SecondOrderLineStrategyInterface
-from model.algorithms.algorithmsCurves import CurveContext, CurveStrategy
+from model.algorithms.algorithmsCurves import CurveContext, CurveStrategy, CurveIndex, PREVIEW_TAG
 from model.algorithms.algorithmsMenu import LineMenuClass, SecondOrderLineMenuClass, CurveMenuClass
-from model.algorithms.algorithmsPolygon import PolygonContext, PolygonMenuClass
+from model.algorithms.algorithmsPolygon import PolygonContext, PolygonMenuClass, AutoHullStrategy
 from view.canvas import CanvasView
+from model.framebuffer import FrameBuffer
 from view.opengl_view import run_opengl_view
 from view.transform_controls import TransformControls
 import math # Import math for distance calculation
@@ -43,6 +44,8 @@ class GraphicsEditor:
     DOCKING_RADIUS = 10 # Radius for curve endpoint docking
     TEMP_POINT_RADIUS = 2 # Radius for temporary polygon points
     TEMP_VD_POINT_RADIUS = 3 # Radius for Voronoi/Delaunay input points
+    PREVIEW_INTERVAL_MS = 16 # Live curve preview while dragging a handle: at most one per display frame
+    RESIZE_REDRAW_MS = 100 # Clipped shapes are redrawn once the window has stopped resizing
 
     def __init__(self, root):
         self.root = root
@@ -66,6 +69,10 @@ class GraphicsEditor:
         self.vd_debug_mode_active = tk.BooleanVar(value=False)
         # -------------------------
         self.debug_mode_active = tk.BooleanVar(value=False) # General debug flag for transforms
+        # --- Растровый буфер (NumPy) вместо элементов Canvas для линий ---
+        self.framebuffer_mode_active = tk.BooleanVar(value=False)
+        self.framebuffer = FrameBuffer(1, 1) # Real size is set on <Configure>
+        # ----------------------------------------------------------------
 
         self.main_frame = tk.Frame(root)
         self.main_frame.pack(fill=tk.BOTH, expand=True)
@@ -87,6 +94,14 @@ class GraphicsEditor:
         self.menu.add_cascade(label="Отладка", menu=self.debug_menu)
         # ------------------
 
+        # --- Меню Вид ---
+        self.view_menu = tk.Menu(self.menu, tearoff=0)
+        self.view_menu.add_checkbutton(label="Растровый буфер (NumPy)",
+                                       variable=self.framebuffer_mode_active,
+                                       command=self.toggle_framebuffer_mode)
+        self.menu.add_cascade(label="Вид", menu=self.view_menu)
+        # ----------------
+
         # --- Меню Анализ Полигона ---
         self.analysis_menu = tk.Menu(self.menu, tearoff=0)
         self.analysis_menu.add_command(label="Проверить выпуклость", command=lambda: self.enter_polygon_analysis_mode("check_convex"))
@@ -101,15 +116,19 @@ class GraphicsEditor:
 
         # Используем CanvasView
         self.canvas_view = CanvasView(self.main_frame)
+        self.canvas_view.canvas.bind("<Configure>", self.on_canvas_resize)
 
         # State for drawing and editing
         self.click_count = 0
         self.click_points = []
         self.drawn_items = [] # Store info about drawn shapes {id, type, points, handles, strategy}
+        self.curve_index = CurveIndex() # Flattened curves by item index, for picking curves under the cursor
         self.edit_mode = False
         self.selected_item_index = None # Index in self.drawn_items
         self.selected_handle_index = None # Index of the handle within the item's points/handles
         self.drag_start_pos = None # Store initial position for dragging
+        self.preview_job = None # Pending root.after id of the live curve preview
+        self.resize_job = None # Pending root.after id of the redraw of clipped shapes
         # --- State for Voronoi/Delaunay ---
         self.vd_input_points = [] # Points specifically for V/D calculation
         self.vd_temp_point_ids = [] # Canvas IDs of temporary points shown during input
@@ -144,6 +163,18 @@ class GraphicsEditor:
         self.scale_y_var = tk.DoubleVar(value=1.0)
         # -----------------------------------------
 
+        # --- Толщина и концы отрезков ---
+        self.line_width_var = tk.IntVar(value=1)
+        self.line_cap_var = tk.StringVar(value="butt")
+        self.line_width_var.trace_add("write", self.on_line_style_change)
+        self.line_cap_var.trace_add("write", self.on_line_style_change)
+        # --------------------------------
+
+        # --- Вес точек NURBS ---
+        self.curve_weight_var = tk.DoubleVar(value=1.0) # Weight of the next clicked control point
+        self.click_weights = [] # Weights of the points of the curve being entered
+        # -----------------------
+
         # Toolbar Buttons
         self.edit_button = None
         self.mode_3d_button = None
@@ -178,6 +209,14 @@ class GraphicsEditor:
         basic_menu_line = LineMenuClass(self.root, line_button, self.line_context, self.activate_line_tool)
         line_button.config(command=basic_menu_line.show_algorithm_menu)
 
+        # Толщина отрезка и форма концов
+        line_style_frame = tk.Frame(self.toolbar, bg="lightgrey")
+        line_style_frame.pack(pady=2, fill=tk.X)
+        tk.Label(line_style_frame, text="Толщина:", bg="lightgrey").pack(side=tk.LEFT, padx=2)
+        tk.Spinbox(line_style_frame, from_=1, to=100, width=4, textvariable=self.line_width_var).pack(side=tk.LEFT, padx=2)
+        tk.Radiobutton(line_style_frame, text="Плоские", value="butt", variable=self.line_cap_var, bg="lightgrey").pack(side=tk.LEFT)
+        tk.Radiobutton(line_style_frame, text="Круглые", value="round", variable=self.line_cap_var, bg="lightgrey").pack(side=tk.LEFT)
+
         # Линии второго порядка (окружность, эллипс и т. д.)
         second_order_button = tk.Button(self.toolbar, text="Линии 2-го порядка")
         second_order_button.pack(pady=5, fill=tk.X)
@@ -190,6 +229,13 @@ class GraphicsEditor:
         curve_menu = CurveMenuClass(self.root, curve_button, self.curve_context, self.activate_curve_tool)
         curve_button.config(command=curve_menu.show_algorithm_menu)
 
+        # Вес следующей точки рациональной кривой (NURBS)
+        curve_weight_frame = tk.Frame(self.toolbar, bg="lightgrey")
+        curve_weight_frame.pack(pady=2, fill=tk.X)
+        tk.Label(curve_weight_frame, text="Вес точки NURBS:", bg="lightgrey").pack(side=tk.LEFT, padx=2)
+        tk.Spinbox(curve_weight_frame, from_=0.1, to=10.0, increment=0.1, width=5,
+                   textvariable=self.curve_weight_var).pack(side=tk.LEFT, padx=2)
+
         # --- Выпуклые оболочки ---
         polygon_button = tk.Button(self.toolbar, text="Выпуклая оболочка")
         polygon_button.pack(pady=5, fill=tk.X)
@@ -287,7 +333,9 @@ class GraphicsEditor:
         """Очищает область рисования, включая все элементы и состояния."""
         print("Clearing canvas...")
         self.canvas_view.clear()
+        self.framebuffer.clear()
         self.drawn_items = []
+        self.curve_index.clear()
         self.click_points = []
         self.click_count = 0
         self.selected_item_index = None
@@ -355,6 +403,8 @@ class GraphicsEditor:
         """Активирует инструмент рисования кривых."""
         self.active_context = self.curve_context
         self.canvas_view.bind_click_event(self.capture_curve_points)
+        self.canvas_view.bind_event("<Button-3>", self.finish_curve_points) # Ends a spline of any length
+        self.canvas_view.canvas.delete("temp_curve_point")
         self.click_count = 0
         self.click_points = []
         self.last_active_draw_context = self.curve_context # Remember this tool
@@ -565,7 +615,10 @@ class GraphicsEditor:
                 # print(f"Рисование линии стратегией: {strategy.name}")
                 shape_tag = None
                 try:
-                    shape_tag = strategy.execute(start_point, end_point, self.canvas_view.canvas)
+                    viewport = self.canvas_view.get_viewport()
+                    shape_tag = self.line_context.execute_cached(start_point, end_point, self.get_render_target(),
+                                                                 viewport=viewport)
+                    self.present_framebuffer()
                     if shape_tag:
                         handle_ids = self.draw_handles(points, shape_tag)
                         for handle_id in handle_ids:
@@ -575,7 +628,10 @@ class GraphicsEditor:
                             "type": "line",
                             "points": points,
                             "handles": handle_ids,
-                            "strategy": strategy
+                            "strategy": strategy,
+                            "width": self.line_context.width,
+                            "cap": self.line_context.cap,
+                            "viewport": viewport # Area the line was clipped to
                         })
                         self.update_analysis_menu_state() # Обновляем состояние меню анализа
                         # print(f"Сохранен элемент Линия с тегом: {shape_tag}")
@@ -608,7 +664,7 @@ class GraphicsEditor:
             self.click_points = []
             return
 
-        required_points = 2 if strategy.name == "Окружность" else 3
+        required_points = strategy.required_points
         print(f"Стратегия '{strategy.name}' требует {required_points} точки. Есть {self.click_count}.")
 
         if self.click_count == required_points:
@@ -616,10 +672,10 @@ class GraphicsEditor:
             # print(f"Рисование {strategy.name} точками: {points_to_draw}")
             shape_tag = None
             try:
-                if strategy.name == "Окружность":
-                    shape_tag = strategy.execute(points_to_draw[0], points_to_draw[1], None, self.canvas_view.canvas)
-                else:
-                    shape_tag = strategy.execute(points_to_draw[0], points_to_draw[1], points_to_draw[2], self.canvas_view.canvas)
+                viewport = self.canvas_view.get_viewport()
+                shape_tag = self.second_order_context.execute_cached(points_to_draw, self.get_render_target(),
+                                                                     viewport=viewport)
+                self.present_framebuffer()
 
                 if shape_tag:
                     handle_ids = self.draw_handles(points_to_draw, shape_tag)
@@ -630,7 +686,9 @@ class GraphicsEditor:
                         "type": "second_order",
                         "points": points_to_draw,
                         "handles": handle_ids,
-                        "strategy": strategy
+                        "strategy": strategy,
+                        "rotation": 0.0, # Accumulated rotation of the curve axes, degrees
+                        "viewport": viewport # Area the curve was clipped to
                     })
                     self.update_analysis_menu_state()
                     # print(f"Сохранен элемент {strategy.name} с тегом: {shape_tag}")
@@ -653,6 +711,9 @@ class GraphicsEditor:
         self.click_points.append([x, y])
         self.click_count = len(self.click_points)
         print(f"Захвачена точка {self.click_count} для кривой: ({x}, {y})")
+        if self.click_count == 1:
+            self.click_weights = []
+        self.click_weights.append(self.get_curve_weight())
 
         strategy = self.active_context.get_strategy()
         if not strategy or not isinstance(strategy, CurveStrategy):
@@ -660,38 +721,84 @@ class GraphicsEditor:
             self.click_points = []
             return
 
-        required_points = 4 # Assuming all curve strategies need 4 points
+        required_points = strategy.required_points
+        if required_points is None:
+            # Spline or curve of any degree: any number of points, finished by the right button
+            r = self.TEMP_POINT_RADIUS
+            self.canvas_view.canvas.create_oval(x-r, y-r, x+r, y+r, fill="black", outline="black", tags="temp_curve_point")
+            print(f"Сплайн: {self.click_count} точек (минимум {strategy.min_points}), правая кнопка - завершить.")
+            return
         print(f"Стратегия кривой требует {required_points} точки. Есть {self.click_count}.")
 
         if self.click_count == required_points:
-            points_to_draw = list(self.click_points)
-            # print(f"Рисование кривой точками: {points_to_draw}")
-            shape_tag = None
-            try:
-                shape_tag = strategy.draw(points_to_draw, self.canvas_view.canvas)
-                if shape_tag:
-                    handle_ids = self.draw_handles(points_to_draw, shape_tag)
-                    for handle_id in handle_ids:
-                        self.canvas_view.canvas.itemconfig(handle_id, state=tk.HIDDEN)
-                    self.drawn_items.append({
-                        "tag": shape_tag,
-                        "type": "curve",
-                        "points": points_to_draw,
-                        "handles": handle_ids,
-                        "strategy": strategy
-                    })
-                    self.update_analysis_menu_state()
-                    # print(f"Сохранен элемент Кривая с тегом: {shape_tag}")
-                else:
-                    print(f"Не удалось получить тег от стратегии кривой.")
-            except Exception as e:
-                print(f"Ошибка выполнения стратегии кривой: {e}")
-                import traceback
-                traceback.print_exc()
-            finally:
-                # Reset after drawing attempt
-                self.click_count = 0
-                self.click_points = []
+            self.draw_curve_item(strategy, list(self.click_points))
+
+    def finish_curve_points(self, event):
+        """Завершает ввод сплайна с произвольным числом точек (правая кнопка мыши) и рисует его."""
+        if self.active_context != self.curve_context: return
+        strategy = self.active_context.get_strategy()
+        if not isinstance(strategy, CurveStrategy) or strategy.required_points is not None: return
+        if len(self.click_points) < strategy.min_points:
+            print(f"Недостаточно точек для сплайна (нужно >= {strategy.min_points}).")
+            return
+        self.canvas_view.canvas.delete("temp_curve_point")
+        weights = list(self.click_weights) if strategy.weighted else None
+        self.draw_curve_item(strategy, list(self.click_points), weights)
+
+    def get_curve_weight(self):
+        """Вес точки NURBS из панели (1.0, пока поле редактируется или значение не положительно)."""
+        try:
+            weight = self.curve_weight_var.get()
+        except tk.TclError:
+            return 1.0
+        return weight if weight > 0 else 1.0
+
+    @staticmethod
+    def curve_options(item):
+        """Дополнительные аргументы draw/draw_preview/polyline кривой элемента (веса NURBS)."""
+        return {"weights": item["weights"]} if item.get("weights") is not None else {}
+
+    def draw_curve_item(self, strategy, points_to_draw, weights=None):
+        """
+        Рисует кривую или сплайн по точкам, сохраняет элемент (с ТЕГОМ и ручками).
+        weights - веса точек для стратегий с weighted = True.
+        """
+        # print(f"Рисование кривой точками: {points_to_draw}")
+        shape_tag = None
+        options = {"weights": weights} if weights is not None else {}
+        try:
+            segments = strategy.new_cache()
+            if strategy.required_points is None:
+                shape_tag = strategy.draw(points_to_draw, self.get_render_target(), segments, **options)
+            else:
+                shape_tag = strategy.draw(points_to_draw, self.get_render_target())
+            self.present_framebuffer()
+            if shape_tag:
+                handle_ids = self.draw_handles(points_to_draw, shape_tag)
+                for handle_id in handle_ids:
+                    self.canvas_view.canvas.itemconfig(handle_id, state=tk.HIDDEN)
+                self.drawn_items.append({
+                    "tag": shape_tag,
+                    "type": "curve",
+                    "points": points_to_draw,
+                    "handles": handle_ids,
+                    "strategy": strategy,
+                    "segments": segments, # Redraw cache of the strategy (segments of a composite spline)
+                    "weights": weights # Per-point weights of a NURBS curve or None
+                })
+                self.curve_index.set(len(self.drawn_items) - 1, strategy.polyline(points_to_draw, segments, **options))
+                self.update_analysis_menu_state()
+                # print(f"Сохранен элемент Кривая с тегом: {shape_tag}")
+            else:
+                print(f"Не удалось получить тег от стратегии кривой.")
+        except Exception as e:
+            print(f"Ошибка выполнения стратегии кривой: {e}")
+            import traceback
+            traceback.print_exc()
+        finally:
+            # Reset after drawing attempt
+            self.click_count = 0
+            self.click_points = []
 
     def capture_polygon_point(self, event):
         """Фиксирует точки для построения выпуклой оболочки."""
@@ -728,12 +835,14 @@ class GraphicsEditor:
         try:
             shape_tag, hull_points = self.polygon_context.execute_strategy(points_to_build, self.canvas_view.canvas)
             if shape_tag and hull_points:
+                # "Авто" delegates to another strategy; keep that one so redraws use its color
+                executed_strategy = strategy.last_choice if isinstance(strategy, AutoHullStrategy) else strategy
                 # Сохраняем информацию об оболочке. Ручки НЕ создаем для оболочек.
                 self.drawn_items.append({
                     "tag": shape_tag,
                     "type": "polygon",
                     "points": hull_points, # Сохраняем ТОЛЬКО точки оболочки
-                    "strategy": strategy,
+                    "strategy": executed_strategy,
                     "original_points": points_to_build # Сохраняем исходные точки (опционально)
                 })
                 print(f"Сохранен элемент Выпуклая Оболочка ({strategy.name}) с тегом: {shape_tag}")
@@ -769,6 +878,86 @@ class GraphicsEditor:
             self.debugger.debug_window.destroy()
             self.debugger = None
 
+    # --- Растровый буфер ---
+
+    def get_render_target(self):
+        """Возвращает цель растеризации (линии, кривые 2-го порядка и сплайны): буфер кадра или сам Canvas."""
+        if self.framebuffer_mode_active.get():
+            return self.framebuffer
+        return self.canvas_view.canvas
+
+    def present_framebuffer(self):
+        """Выводит буфер кадра на холст (одно изображение на кадр)."""
+        if self.framebuffer_mode_active.get():
+            self.canvas_view.blit(self.framebuffer)
+
+    def toggle_framebuffer_mode(self):
+        """Переключает режим вывода растровых фигур и перерисовывает уже нарисованные."""
+        mode = "буфер кадра" if self.framebuffer_mode_active.get() else "элементы Canvas"
+        print(f"Режим вывода растровых фигур: {mode}")
+        for idx, item in enumerate(self.drawn_items):
+            if item.get("type") in ("line", "second_order", "curve"):
+                self.redraw_item(idx)
+        self.present_framebuffer() # One blit for all redrawn items
+        if not self.framebuffer_mode_active.get():
+            self.canvas_view.canvas.delete("framebuffer")
+
+    def on_canvas_resize(self, event):
+        """Подгоняет размер буфера кадра под холст и планирует перерисовку обрезанных фигур."""
+        self.framebuffer.resize(event.width, event.height)
+        self.present_framebuffer()
+        if self.resize_job is not None:
+            self.root.after_cancel(self.resize_job)
+        self.resize_job = self.root.after(self.RESIZE_REDRAW_MS, self.redraw_clipped_items)
+
+    def redraw_clipped_items(self):
+        """
+        Перерисовывает отрезки и кривые 2-го порядка, обрезанные по прежней видимой области,
+        если холст вырос за ее пределы (фигуры в пределах старой области не трогаются).
+        """
+        self.resize_job = None
+        xmin, ymin, xmax, ymax = self.canvas_view.get_viewport()
+        for idx, item in enumerate(self.drawn_items):
+            clipped_to = item.get("viewport")
+            if clipped_to is None:
+                continue
+            cxmin, cymin, cxmax, cymax = clipped_to
+            if xmin >= cxmin and ymin >= cymin and xmax <= cxmax and ymax <= cymax:
+                continue # Only shrank: the clipped part is still off screen
+            if self.exceeds_viewport(item, clipped_to):
+                self.redraw_item(idx)
+        self.present_framebuffer()
+
+    @staticmethod
+    def exceeds_viewport(item, viewport):
+        """Выходит ли фигура элемента (с запасом на толщину) за viewport, то есть могла быть обрезана."""
+        points = item.get("points") or []
+        strategy = item.get("strategy")
+        if not points or not strategy:
+            return False
+        if item.get("type") == "line":
+            pad = item.get("width", 1) / 2 + strategy.VIEWPORT_MARGIN
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            lo_x, lo_y, hi_x, hi_y = min(xs) - pad, min(ys) - pad, max(xs) + pad, max(ys) + pad
+        else:
+            if not strategy.bounded:
+                return True
+            cx, cy = points[0]
+            radius = max((math.hypot(px - cx, py - cy) for px, py in points[1:]), default=0.0) + 1
+            lo_x, lo_y, hi_x, hi_y = cx - radius, cy - radius, cx + radius, cy + radius
+        xmin, ymin, xmax, ymax = viewport
+        return lo_x < xmin or lo_y < ymin or hi_x > xmax or hi_y > ymax
+
+    def on_line_style_change(self, *args):
+        """Передает толщину и концы отрезков из панели в контекст линий."""
+        try:
+            width = self.line_width_var.get()
+        except tk.TclError:
+            return # Spinbox is being edited and holds no number yet
+        self.line_context.width = max(1, width)
+        self.line_context.cap = self.line_cap_var.get()
+
     def toggle_transform_debug(self):
         """Включает/выключает режим отладки трансформаций (вывод в консоль)."""
         if self.debug_mode_active.get():
@@ -874,6 +1063,10 @@ class GraphicsEditor:
                     min_dist_to_item_sq = dist_sq
                     break # Found a close point for this item
 
+        # Curves can also be picked anywhere along their flattened outline
+        if selected_item_idx is None:
+            selected_item_idx = self.curve_index.hit_test((x, y), self.SNAP_RADIUS)
+
         if selected_item_idx is not None:
             self.selected_item_index = selected_item_idx
             self.selected_handle_index = None
@@ -908,6 +1101,36 @@ class GraphicsEditor:
                                        nx - self.HANDLE_SIZE, ny - self.HANDLE_SIZE,
                                        nx + self.HANDLE_SIZE, ny + self.HANDLE_SIZE)
 
+        # Curves follow the handle live; motion events between frames are coalesced
+        if item.get("type") == "curve" and self.preview_job is None:
+            self.preview_job = self.root.after(self.PREVIEW_INTERVAL_MS, self.update_curve_preview)
+
+    def update_curve_preview(self):
+        """Перерисовывает эскиз перетаскиваемой кривой (не чаще раза в PREVIEW_INTERVAL_MS)."""
+        self.preview_job = None
+        if self.selected_item_index is None or self.selected_handle_index is None: return
+        item = self.drawn_items[self.selected_item_index]
+        strategy = item.get("strategy")
+        if not strategy: return
+        canvas = self.canvas_view.canvas
+        # The finished curve stays hidden until release; its handles keep the same tag
+        canvas.itemconfig(f"{item['tag']}&&curve_segment", state=tk.HIDDEN)
+        self.framebuffer.delete(item["tag"])
+        self.clear_curve_preview()
+        try:
+            strategy.draw_preview(item["points"], self.get_render_target(), item.get("segments"), **self.curve_options(item))
+        except Exception as e:
+            print(f"Ошибка эскиза кривой: {e}")
+        self.present_framebuffer()
+
+    def clear_curve_preview(self):
+        """Удаляет эскиз кривой и отменяет запланированное обновление."""
+        if self.preview_job is not None:
+            self.root.after_cancel(self.preview_job)
+            self.preview_job = None
+        self.canvas_view.canvas.delete(PREVIEW_TAG)
+        self.framebuffer.delete(PREVIEW_TAG)
+
     def on_canvas_release(self, event):
         """Обработчик отпускания кнопки мыши: проверка стыковки, перерисовка."""
         if not self.edit_mode or self.selected_item_index is None:
@@ -919,13 +1142,14 @@ class GraphicsEditor:
             return
 
         # --- Handle was dragged and released ---
+        self.clear_curve_preview()
         current_item_idx = self.selected_item_index
         current_handle_idx = self.selected_handle_index
         item = self.drawn_items[current_item_idx]
 
         # --- Docking Logic (Only for Curves) ---
         docked = False
-        if item.get("type") == "curve" and current_handle_idx in [0, 3]:
+        if item.get("type") == "curve" and current_handle_idx in [0, len(item["points"]) - 1]:
             # ... (docking logic remains the same) ...
             current_point = item["points"][current_handle_idx]
             nx, ny = current_point
@@ -934,17 +1158,18 @@ class GraphicsEditor:
             min_dist_sq = self.DOCKING_RADIUS**2
             for target_item_idx, target_item in enumerate(self.drawn_items):
                 if target_item_idx == current_item_idx: continue
-                if target_item.get("type") == "curve" and len(target_item.get("points", [])) == 4:
+                if target_item.get("type") == "curve" and len(target_item.get("points", [])) >= 4:
                     target_p0 = target_item["points"][0]
                     dist_sq_p0 = (nx - target_p0[0])**2 + (ny - target_p0[1])**2
                     if dist_sq_p0 < min_dist_sq:
                         min_dist_sq = dist_sq_p0
                         closest_target_info = {"item_idx": target_item_idx, "handle_idx": 0, "coords": target_p0}
-                    target_p3 = target_item["points"][3]
+                    last_idx = len(target_item["points"]) - 1
+                    target_p3 = target_item["points"][last_idx]
                     dist_sq_p3 = (nx - target_p3[0])**2 + (ny - target_p3[1])**2
                     if dist_sq_p3 < min_dist_sq:
                         min_dist_sq = dist_sq_p3
-                        closest_target_info = {"item_idx": target_item_idx, "handle_idx": 3, "coords": target_p3}
+                        closest_target_info = {"item_idx": target_item_idx, "handle_idx": last_idx, "coords": target_p3}
             if closest_target_info:
                 target_coords = closest_target_info["coords"]
                 # print(f"---> СТЫКОВКА ручки {current_handle_idx} к ручке {closest_target_info['handle_idx']} элемента {closest_target_info['item_idx']}")
@@ -956,6 +1181,7 @@ class GraphicsEditor:
         # Redraw the item whose handle was just released
         # print(f"Отпущена ручка {current_handle_idx} элемента {current_item_idx}. Перерисовка.")
         self.redraw_item(current_item_idx) # Redraw handles as well
+        self.present_framebuffer()
 
         # Reset visual feedback for selected handle (after redraw)
         self.reset_handle_appearance(current_item_idx, current_handle_idx)
@@ -980,7 +1206,10 @@ class GraphicsEditor:
                 except IndexError: pass
 
     def redraw_item(self, item_index):
-        """Перерисовывает элемент (включая полигоны), удаляя старый объект и ручки по ТЕГУ."""
+        """
+        Перерисовывает элемент (включая полигоны), удаляя старый объект и ручки по ТЕГУ.
+        Буфер кадра не выводится: вызывающий код делает present_framebuffer() один раз.
+        """
         if item_index < 0 or item_index >= len(self.drawn_items): return
         item = self.drawn_items[item_index]
         canvas = self.canvas_view.canvas
@@ -990,6 +1219,7 @@ class GraphicsEditor:
         if old_tag:
             # print(f"Удаление элементов с тегом: {old_tag}")
             canvas.delete(old_tag)
+            self.framebuffer.delete(old_tag)
             item["handles"] = [] # Reset handle list even if none were expected
         else:
              print(f"Предупреждение: Тег не найден для элемента {item_index}.")
@@ -1004,13 +1234,29 @@ class GraphicsEditor:
         new_tag = None
         new_hull_points = None # For polygon redraw
         try:
+            if item_type in ("line", "second_order"):
+                 item["viewport"] = self.canvas_view.get_viewport()
             if item_type == "line":
-                 if len(points) == 2: new_tag = strategy.execute(points[0], points[1], canvas)
+                 # Through the raster cache: a line moved by whole pixels is only shifted
+                 if len(points) == 2: new_tag = self.line_context.execute_cached(points[0], points[1], self.get_render_target(),
+                                                                                 viewport=item["viewport"],
+                                                                                 strategy=strategy,
+                                                                                 width=item.get("width", 1),
+                                                                                 cap=item.get("cap", "butt"))
             elif item_type == "second_order":
-                 if strategy.name == "Окружность" and len(points) == 2: new_tag = strategy.execute(points[0], points[1], None, canvas)
-                 elif strategy.name != "Окружность" and len(points) == 3: new_tag = strategy.execute(points[0], points[1], points[2], canvas)
+                 required_points = strategy.required_points
+                 if len(points) == required_points:
+                     new_tag = self.second_order_context.execute_rotated(points, item.get("rotation", 0.0),
+                                                                              self.get_render_target(), strategy=strategy,
+                                                                              viewport=item["viewport"])
             elif item_type == "curve":
-                 if len(points) == 4: new_tag = strategy.draw(points, canvas)
+                 options = self.curve_options(item)
+                 if strategy.required_points is None:
+                     # Composite splines recompute only the segments around moved points
+                     new_tag = strategy.draw(points, self.get_render_target(), item.get("segments"), **options)
+                 elif len(points) == 4: new_tag = strategy.draw(points, self.get_render_target())
+                 if new_tag: self.curve_index.set(item_index, strategy.polyline(points, item.get("segments"), **options))
+                 else: self.curve_index.remove(item_index)
             elif item_type == "polygon":
                  # Re-execute the hull algorithm using the *original* points if stored,
                  # otherwise, just redraw the polygon with the existing hull points.
@@ -1029,6 +1275,9 @@ class GraphicsEditor:
                      outline_color = 'purple' # Default redraw color
                      if strategy.name == "Грэхем": outline_color = 'blue'
                      elif strategy.name == "Джарвис": outline_color = 'red'
+                     elif strategy.name == "Монотонная цепь": outline_color = 'green'
+                     elif strategy.name == "Quickhull": outline_color = 'darkorange'
+                     elif strategy.name == "Чан": outline_color = 'brown'
                      canvas.create_polygon(flat_hull, outline=outline_color, fill='', width=2, tags=(new_tag, "hull"))
                      # Note: We are NOT re-running the algorithm here, just redrawing the shape
                      # The 'points' in the item dictionary are updated by the transformation method.
@@ -1152,6 +1401,7 @@ class GraphicsEditor:
 
         item["points"] = new_points # Update stored points
         self.redraw_item(self.selected_item_index) # Redraw the item in new position
+        self.present_framebuffer()
         self.translate_x_var.set(0.0)
         self.translate_y_var.set(0.0)
 
@@ -1176,7 +1426,10 @@ class GraphicsEditor:
             print("-----------------------------")
 
         item["points"] = new_points
+        if item.get("type") == "second_order":
+            item["rotation"] = item.get("rotation", 0.0) + angle # Redrawn along the rotated axes
         self.redraw_item(self.selected_item_index)
+        self.present_framebuffer()
         self.rotate_angle_var.set(0.0)
 
     def apply_scale_2d(self):
@@ -1203,6 +1456,7 @@ class GraphicsEditor:
 
         item["points"] = new_points
         self.redraw_item(self.selected_item_index)
+        self.present_framebuffer()
         self.scale_x_var.set(1.0)
         self.scale_y_var.set(1.0)
 
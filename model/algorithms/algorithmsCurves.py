@@ -1,105 +1,713 @@
 import numpy as np
 from abc import ABC, abstractmethod
+from functools import lru_cache
+import math
 import time # Add time for unique tags
+from model.framebuffer import FrameBuffer
+from .algorithmsLine import BresenhamStrategy
+from .pixelStream import render_array
+
+# Cubic Bezier basis: P(t) = T * M_BEZIER * [P0, P1, P2, P3], T = [t^3, t^2, t, 1]
+M_BEZIER = np.array([
+    [-1, 3, -3, 1],
+    [3, -6, 3, 0],
+    [-3, 3, 0, 0],
+    [1, 0, 0, 0]
+])
+M_BEZIER_INVERSE = np.linalg.inv(M_BEZIER)
+
+FLATNESS_TOLERANCE = 0.25 # Screen-space error of the flattened curve, pixels
+MAX_SUBDIVISION_DEPTH = 16 # At most 2^16 segments per curve
+DEFAULT_SAMPLES = 101 # Uniform samples of t in [0, 1] for evaluate / evaluate_many
+BASIS_TABLE_CACHE_SIZE = 64 # Distinct (curve type, sample count) pairs kept by basis_table
+PREVIEW_TAG = "curve_preview" # Canvas / frame buffer tag of the live drag preview
+
+
+@lru_cache(maxsize=BASIS_TABLE_CACHE_SIZE)
+def basis_table(curve_type, samples):
+    """
+    Таблица T * M (samples, 4) для кривой типа curve_type, только для чтения.
+
+    Строка i - веса четырех точек геометрии при t = i / (samples - 1), так что
+    точки кривой - одно матричное умножение table @ G.
+    """
+    t = np.linspace(0.0, 1.0, samples)
+    powers = np.stack([t ** 3, t ** 2, t, np.ones_like(t)], axis=1)
+    table = powers @ curve_type.M
+    table.flags.writeable = False
+    return table
+
+@lru_cache(maxsize=BASIS_TABLE_CACHE_SIZE)
+def bernstein_table(degree, samples):
+    """
+    Многочлены Бернштейна B(i, degree)(t) в samples равноотстоящих t:
+    таблица (samples, degree + 1) только для чтения. Кривая Безье любой степени -
+    одно умножение table @ P.
+    """
+    t = np.linspace(0.0, 1.0, samples)[:, None]
+    i = np.arange(degree + 1)
+    binomial = np.array([math.comb(degree, k) for k in range(degree + 1)], dtype=float)
+    table = binomial * t ** i * (1 - t) ** (degree - i)
+    table.flags.writeable = False
+    return table
+
+@lru_cache(maxsize=BASIS_TABLE_CACHE_SIZE)
+def composite_table(curve_type, segments, samples):
+    """
+    Таблица составного сплайна из segments сегментов для samples равноотстоящих
+    значений общего параметра u в [0, segments]: номера управляющих точек (samples, 4)
+    и их веса T * M (samples, 4), только для чтения. Сегмент s берет точки
+    STRIDE * s .. STRIDE * s + 3, его локальный параметр t = u - s.
+    """
+    u = np.linspace(0.0, segments, samples)
+    segment = np.minimum(u.astype(np.int64), segments - 1)
+    t = u - segment
+    index = curve_type.STRIDE * segment[:, None] + np.arange(4)
+    weights = np.stack([t ** 3, t ** 2, t, np.ones_like(t)], axis=1) @ curve_type.M
+    index.flags.writeable = False
+    weights.flags.writeable = False
+    return index, weights
+
+def clamped_knots(n, degree):
+    """Равномерный зажатый узловой вектор для n управляющих точек: кортеж из n + degree + 1 узлов."""
+    spans = n - degree
+    return (0.0,) * degree + tuple(i / spans for i in range(spans + 1)) + (1.0,) * degree
+
+@lru_cache(maxsize=BASIS_TABLE_CACHE_SIZE)
+def bspline_basis(knots, degree, samples):
+    """
+    Базисные функции B-сплайна N(i, degree)(t) по рекурсии Кокса - де Бура,
+    вычисленные сразу для всех samples значений t на [knots[degree], knots[-degree - 1]].
+
+    Args:
+        knots: узловой вектор (кортеж, ключ кэша).
+
+    Returns:
+        np.ndarray: таблица (samples, len(knots) - degree - 1) только для чтения.
+    """
+    knots = np.asarray(knots, dtype=float)
+    end = knots[-degree - 1]
+    t = np.linspace(knots[degree], end, samples)[:, None]
+    basis = ((knots[:-1] <= t) & (t < knots[1:])).astype(float)
+    # Half-open spans miss t = end: it belongs to the last non-empty span
+    basis[-1, :] = 0.0
+    basis[-1, np.searchsorted(knots, end, side='left') - 1] = 1.0
+    m = len(knots) - 1
+    for p in range(1, degree + 1):
+        left = knots[p:m] - knots[:m - p]
+        right = knots[p + 1:m + 1] - knots[1:m - p + 1]
+        # 0/0 terms of the recursion are zero
+        left_term = np.divide(t - knots[:m - p], left, out=np.zeros((samples, m - p)), where=left > 0)
+        right_term = np.divide(knots[p + 1:m + 1] - t, right, out=np.zeros((samples, m - p)), where=right > 0)
+        basis = left_term * basis[:, :m - p] + right_term * basis[:, 1:m - p + 1]
+    basis.flags.writeable = False
+    return basis
+
+def sample_count(control, degree, spans=1, tolerance=FLATNESS_TOLERANCE):
+    """
+    Число точек для кривой степени degree по формуле Ванга
+    n = ceil(sqrt(d(d - 1)/8 * max|P(i) - 2P(i+1) + P(i+2)| / tolerance)) на пролет,
+    округленное вверх до 2^k + 1, чтобы при перетаскивании ручек таблицы базиса брались из кэша.
+    """
+    control = np.asarray(control, dtype=float)
+    segments = 1
+    if degree >= 2 and len(control) >= 3:
+        second = control[:-2] - 2 * control[1:-1] + control[2:]
+        length = np.sqrt((second ** 2).sum(axis=1)).max()
+        segments = max(1, math.ceil(math.sqrt(degree * (degree - 1) / 8 * length / tolerance)))
+    segments *= spans
+    return (1 << max(0, segments - 1).bit_length()) + 1
+
+
+def flatten_bezier(control, tolerance=FLATNESS_TOLERANCE, max_depth=MAX_SUBDIVISION_DEPTH):
+    """
+    Адаптивное разбиение кубической кривой Безье на отрезки (де Кастельжо).
+
+    Участок делится пополам, пока его внутренние контрольные точки отстоят от хорды
+    больше чем на tolerance: кривая лежит в выпуклой оболочке контрольных точек,
+    поэтому ломаная отклоняется от нее не больше чем на tolerance.
+
+    Args:
+        control: 4 контрольные точки [(x, y), ...].
+
+    Returns:
+        list[tuple[float, float]]: вершины ломаной от P0 до P3.
+    """
+    p0, p1, p2, p3 = [(float(x), float(y)) for x, y in control]
+    polyline = [p0]
+    stack = [(p0, p1, p2, p3, 0)]
+    while stack:
+        p0, p1, p2, p3, depth = stack.pop()
+        if depth >= max_depth or _is_flat(p0, p1, p2, p3, tolerance):
+            polyline.append(p3)
+            continue
+        # de Casteljau split at t = 1/2
+        p01 = ((p0[0] + p1[0]) / 2, (p0[1] + p1[1]) / 2)
+        p12 = ((p1[0] + p2[0]) / 2, (p1[1] + p2[1]) / 2)
+        p23 = ((p2[0] + p3[0]) / 2, (p2[1] + p3[1]) / 2)
+        p012 = ((p01[0] + p12[0]) / 2, (p01[1] + p12[1]) / 2)
+        p123 = ((p12[0] + p23[0]) / 2, (p12[1] + p23[1]) / 2)
+        mid = ((p012[0] + p123[0]) / 2, (p012[1] + p123[1]) / 2)
+        # Right half first: the stack pops the left half next
+        stack.append((mid, p123, p23, p3, depth + 1))
+        stack.append((p0, p01, p012, mid, depth + 1))
+    return polyline
+
+def _is_flat(p0, p1, p2, p3, tolerance):
+    """Обе внутренние контрольные точки не дальше tolerance от отрезка P0-P3."""
+    dx, dy = p3[0] - p0[0], p3[1] - p0[1]
+    chord2 = dx * dx + dy * dy
+    limit = tolerance * tolerance
+    for px, py in (p1, p2):
+        ex, ey = px - p0[0], py - p0[1]
+        # Distance to the segment, not the line: collinear control points
+        # beyond the chord ends mean the curve overshoots them
+        t = 0.0 if chord2 == 0 else min(1.0, max(0.0, (ex * dx + ey * dy) / chord2))
+        ex, ey = ex - t * dx, ey - t * dy
+        if ex * ex + ey * ey > limit:
+            return False
+    return True
+
+def render_polyline(polyline, canvas, tag, color='black'):
+    """
+    Выводит ломаную одним элементом: на Canvas - одним многоточечным create_line,
+    в FrameBuffer - одним проходом векторного Брезенхема по всем ее звеньям.
+    """
+    if isinstance(canvas, FrameBuffer):
+        vertices = np.rint(np.asarray(polyline, dtype=float))
+        segments = np.hstack([vertices[:-1], vertices[1:]])
+        pixels, intensities, _ = BresenhamStrategy().execute_many(segments)
+        render_array(pixels, intensities, canvas, tag)
+    else:
+        canvas.create_line(*np.asarray(polyline, dtype=float).ravel().tolist(), fill=color, tags=(tag, "curve_segment"))
+
+def wang_segments(control, tolerance=FLATNESS_TOLERANCE):
+    """
+    Число равных по t отрезков для кубических кривых Безье (формула Ванга):
+    n = ceil(sqrt(3/4 * max|P(i) - 2P(i+1) + P(i+2)| / tolerance)).
+
+    Args:
+        control: массив (S, 4, 2) контрольных точек.
+
+    Returns:
+        np.ndarray: (S,) число отрезков, не меньше 1.
+    """
+    control = np.asarray(control, dtype=float).reshape(-1, 4, 2)
+    second = control[:, :2] - 2 * control[:, 1:3] + control[:, 2:]
+    length = np.sqrt((second ** 2).sum(axis=2)).max(axis=1)
+    return np.maximum(1, np.ceil(np.sqrt(0.75 * length / tolerance))).astype(np.int64)
+
+def forward_differences(coefficients, segments):
+    """
+    Точки кубической кривой P(t) = a*t^3 + b*t^2 + c*t + d в segments + 1
+    равноотстоящих значениях t методом конечных разностей: после начальной
+    настройки - три сложения на точку и ни одного умножения.
+
+    Args:
+        coefficients: строки a, b, c, d (4, 2) - это M * G.
+        segments: число отрезков.
+
+    Returns:
+        list[tuple[float, float]]: вершины ломаной.
+    """
+    (ax, ay), (bx, by), (cx, cy), (x, y) = np.asarray(coefficients, dtype=float).tolist()
+    h = 1.0 / segments
+    h2, h3 = h * h, h * h * h
+    # First, second and third differences at t = 0
+    d1x, d1y = ax * h3 + bx * h2 + cx * h, ay * h3 + by * h2 + cy * h
+    d2x, d2y = 6 * ax * h3 + 2 * bx * h2, 6 * ay * h3 + 2 * by * h2
+    d3x, d3y = 6 * ax * h3, 6 * ay * h3
+    polyline = [(x, y)]
+    for _ in range(segments):
+        x += d1x; y += d1y
+        d1x += d2x; d1y += d2y
+        d2x += d3x; d2y += d3y
+        polyline.append((x, y))
+    return polyline
+
+def evaluate_segments(M, geometry, counts):
+    """
+    Общее векторное ядро для набора сегментов: сегмент i с геометрией geometry[i]
+    вычисляется в counts[i] + 1 равноотстоящих значениях t, все сегменты - за один проход.
+
+    Args:
+        M: базисная матрица (4, 4).
+        geometry: массив (S, 4, 2) векторов геометрии.
+        counts: массив (S,) числа отрезков на сегмент.
+
+    Returns:
+        list[np.ndarray]: ломаная (counts[i] + 1, 2) для каждого сегмента.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    sizes = counts + 1
+    index = np.repeat(np.arange(len(counts)), sizes)
+    starts = np.cumsum(sizes) - sizes
+    t = (np.arange(int(sizes.sum())) - np.repeat(starts, sizes)) / counts[index]
+    weights = np.stack([t ** 3, t ** 2, t, np.ones_like(t)], axis=1) @ M
+    points = np.einsum('kj,kjd->kd', weights, np.asarray(geometry, dtype=float)[index])
+    return np.split(points, starts[1:])
+
 
 class CurveStrategy(ABC):
+    M = M_BEZIER # Basis matrix of the curve
+    GEOMETRY_ORDER = (0, 1, 2, 3) # Input points -> rows of the geometry vector G
+    required_points = 4 # None - any number of points, input is finished by the right button
+    weighted = False # True - draw/polyline take per-point weights (weights=...)
+
+    def new_cache(self):
+        """Кэш элемента для быстрой перерисовки (передается в draw третьим аргументом) или None."""
+        return None
+
+    def polyline(self, points, cache=None):
+        """Ломаная кривой для попадания курсором (см. CurveIndex)."""
+        return self.flatten(points)
+
     @abstractmethod
     def draw(self, points, canvas):
         pass
 
-class HermiteCurve(CurveStrategy):
-    def draw(self, points, canvas):
+    def geometry(self, points):
+        """Вектор геометрии G (4, 2) в порядке, который ожидает матрица M."""
+        return np.asarray(points, dtype=float)[list(self.GEOMETRY_ORDER)]
+
+    def evaluate(self, points, samples=DEFAULT_SAMPLES):
+        """Точки кривой (samples, 2) при равномерном шаге t."""
+        return basis_table(type(self), samples) @ self.geometry(points)
+
+    def evaluate_many(self, controls, samples=DEFAULT_SAMPLES):
+        """
+        Пакетное вычисление N кривых одним матричным умножением.
+
+        Args:
+            controls: массив (N, 4, 2) управляющих точек в порядке ввода.
+            samples: число значений t на кривую.
+
+        Returns:
+            np.ndarray: точки кривых (N, samples, 2).
+        """
+        controls = np.asarray(controls, dtype=float).reshape(-1, 4, 2)
+        return basis_table(type(self), samples) @ controls[:, list(self.GEOMETRY_ORDER)]
+
+    def bezier_points(self, points):
+        """Те же кривые в форме Безье: контрольные точки inv(M_bezier) * M * G."""
+        return (M_BEZIER_INVERSE @ self.M @ self.geometry(points)).tolist()
+
+    def flatten(self, points, tolerance=FLATNESS_TOLERANCE):
+        """Ломаная, отклоняющаяся от кривой не больше чем на tolerance пикселей."""
+        return flatten_bezier(self.bezier_points(points), tolerance)
+
+    def forward_difference(self, points, tolerance=FLATNESS_TOLERANCE):
+        """Ломаная методом конечных разностей, число отрезков - по формуле Ванга."""
+        coefficients = self.M @ self.geometry(points)
+        segments = int(wang_segments(M_BEZIER_INVERSE @ coefficients, tolerance)[0])
+        return forward_differences(coefficients, segments)
+
+    def draw_preview(self, points, canvas, segments=None):
+        """Эскиз кривой при перетаскивании ручки (тег PREVIEW_TAG)."""
         if len(points) < 4: return None
-        shape_tag = f"curve_{time.time_ns()}" # Unique tag
+        render_polyline(self.forward_difference(points), canvas, PREVIEW_TAG)
+        return PREVIEW_TAG
 
-        M = np.array([
-            [2, -2, 1, 1],
-            [-3, 3, -2, -1],
-            [0, 0, 1, 0],
-            [1, 0, 0, 0]
-        ])
-
-        last_x, last_y = None, None
-        for t in np.arange(0, 1.01, 0.01): # Include endpoint t=1
-            T = np.array([t**3, t**2, t, 1])
-            x = np.dot(np.dot(T, M), [points[0][0], points[3][0], points[1][0], points[2][0]])
-            y = np.dot(np.dot(T, M), [points[0][1], points[3][1], points[1][1], points[2][1]])
-
-           
-            if last_x is not None:
-                canvas.create_line(last_x, last_y, x, y, fill='black', tags=(shape_tag, "curve_segment"))
-            last_x, last_y = x, y
-           
+    def _draw_polyline(self, points, canvas):
+        shape_tag = f"curve_{time.time_ns()}" # Unique tag
+        render_polyline(self.flatten(points), canvas, shape_tag)
         return shape_tag # Return the tag
 
-class BezierCurve(CurveStrategy):
+class HermiteCurve(CurveStrategy):
+    M = np.array([
+        [2, -2, 1, 1],
+        [-3, 3, -2, -1],
+        [0, 0, 1, 0],
+        [1, 0, 0, 0]
+    ])
+
+    GEOMETRY_ORDER = (0, 3, 1, 2) # Start point, end point and the two tangent vectors
+
     def draw(self, points, canvas):
         if len(points) < 4: return None
-        shape_tag = f"curve_{time.time_ns()}" # Unique tag
+        return self._draw_polyline(points, canvas)
 
-        M = np.array([
-            [-1, 3, -3, 1],
-            [3, -6, 3, 0],
-            [-3, 3, 0, 0],
-            [1, 0, 0, 0]
-        ])
-
-        last_x, last_y = None, None
-        for t in np.arange(0, 1.01, 0.01): # Include endpoint t=1
-            T = np.array([t**3, t**2, t, 1])
-            x = np.dot(np.dot(T, M), [p[0] for p in points])
-            y = np.dot(np.dot(T, M), [p[1] for p in points])
-
-            if last_x is not None:
-                canvas.create_line(last_x, last_y, x, y, fill='black', tags=(shape_tag, "curve_segment"))
-            last_x, last_y = x, y
-        
-        return shape_tag # Return the tag
+class BezierCurve(CurveStrategy):
+    M = M_BEZIER
 
-class BSplineCurve(CurveStrategy):
     def draw(self, points, canvas):
         if len(points) < 4: return None
-        shape_tag = f"curve_{time.time_ns()}" # Unique tag
+        return self._draw_polyline(points, canvas)
 
-        M = (1/6) * np.array([
-            [-1, 3, -3, 1],
-            [3, -6, 3, 0],
-            [-3, 0, 3, 0],
-            [1, 4, 1, 0]
-        ])
+class BSplineCurve(CurveStrategy):
+    M = (1/6) * np.array([
+        [-1, 3, -3, 1],
+        [3, -6, 3, 0],
+        [-3, 0, 3, 0],
+        [1, 4, 1, 0]
+    ])
 
-        last_x, last_y = None, None
+    def draw(self, points, canvas):
+        if len(points) < 4: return None
         # Note: B-spline parameter usually goes from 0 to N-3 segments
         # Simplified approach for single segment [0,1]
-        for t in np.arange(0, 1.01, 0.01): # Include endpoint t=1
-            T = np.array([t**3, t**2, t, 1])
-            x = np.dot(np.dot(T, M), [p[0] for p in points])
-            y = np.dot(np.dot(T, M), [p[1] for p in points])
+        return self._draw_polyline(points, canvas)
 
-            if last_x is not None:
-                 canvas.create_line(last_x, last_y, x, y, fill='black', tags=(shape_tag, "curve_segment"))
-            last_x, last_y = x, y
-            # Or keep ovals with tags:
-            # canvas.create_oval(x-1, y-1, x+1, y+1, fill='black', outline='black', tags=(shape_tag, "curve_point"))
+# --- Попадание курсором ---
 
-        return shape_tag # Return the tag
+class CurveIndex:
+    """
+    Ломаные нарисованных кривых для запросов "какая кривая под курсором" и
+    "ближайшая точка кривой". Для каждой кривой хранятся габариты всей ломаной
+    и каждого ее отрезка: запрос отбрасывает кривые и отрезки по габаритам,
+    а расстояние до оставшихся отрезков считает одним векторным выражением.
+    """
+    def __init__(self):
+        self._polylines = {} # key -> polyline (K, 2)
+        self._arrays = None # Concatenated segments of all curves, rebuilt after changes
+
+    def set(self, key, polyline):
+        """Добавляет или заменяет ломаную кривой key."""
+        polyline = np.asarray(polyline, dtype=float).reshape(-1, 2)
+        if len(polyline) == 1:
+            polyline = np.vstack([polyline, polyline]) # Degenerate curve: one zero-length segment
+        if len(polyline):
+            self._polylines[key] = polyline
+        else:
+            self._polylines.pop(key, None)
+        self._arrays = None
+
+    def remove(self, key):
+        if self._polylines.pop(key, None) is not None:
+            self._arrays = None
+
+    def clear(self):
+        self._polylines = {}
+        self._arrays = None
+
+    def _build(self):
+        keys = list(self._polylines)
+        starts = [polyline[:-1] for polyline in self._polylines.values()]
+        ends = [polyline[1:] for polyline in self._polylines.values()]
+        counts = np.array([len(part) for part in starts], dtype=np.int64)
+        a = np.concatenate(starts) if keys else np.zeros((0, 2))
+        b = np.concatenate(ends) if keys else np.zeros((0, 2))
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        curve_lo = np.array([polyline.min(axis=0) for polyline in self._polylines.values()]).reshape(-1, 2)
+        curve_hi = np.array([polyline.max(axis=0) for polyline in self._polylines.values()]).reshape(-1, 2)
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        # Bounding boxes as contiguous columns: the prefilter compares them with scalars
+        curve_boxes = tuple(np.ascontiguousarray(column) for column in (*curve_lo.T, *curve_hi.T))
+        segment_boxes = tuple(np.ascontiguousarray(column) for column in (*lo.T, *hi.T))
+        self._arrays = (keys, offsets, curve_boxes, segment_boxes, a, b - a)
+
+    def nearest(self, point, radius=math.inf):
+        """
+        Ближайшая к point точка среди всех кривых не дальше radius.
+
+        Returns:
+            tuple | None: (ключ кривой, расстояние, (x, y) ближайшей точки) или None.
+        """
+        if self._arrays is None:
+            self._build()
+        keys, offsets, curve_boxes, segment_boxes, a, d = self._arrays
+        if not keys:
+            return None
+        p = np.asarray(point, dtype=float)
+        x_min, y_min, x_max, y_max = p[0] - radius, p[1] - radius, p[0] + radius, p[1] + radius
+        x_lo, y_lo, x_hi, y_hi = curve_boxes
+        curves = np.flatnonzero((x_lo <= x_max) & (x_hi >= x_min) & (y_lo <= y_max) & (y_hi >= y_min))
+        if len(curves) == 0:
+            return None
+        # Segment ranges of the candidate curves, expanded without a Python loop
+        counts = offsets[curves + 1] - offsets[curves]
+        segments = np.arange(int(counts.sum())) + np.repeat(offsets[curves] - (np.cumsum(counts) - counts), counts)
+        x_lo, y_lo, x_hi, y_hi = (column[segments] for column in segment_boxes)
+        segments = segments[(x_lo <= x_max) & (x_hi >= x_min) & (y_lo <= y_max) & (y_hi >= y_min)]
+        if len(segments) == 0:
+            return None
+        a, d = a[segments], d[segments]
+        length2 = (d * d).sum(axis=1)
+        t = np.clip(np.divide(((p - a) * d).sum(axis=1), length2, out=np.zeros(len(segments)), where=length2 > 0), 0.0, 1.0)
+        closest = a + t[:, None] * d
+        distances = np.sqrt(((closest - p) ** 2).sum(axis=1))
+        best = int(np.argmin(distances))
+        if distances[best] > radius:
+            return None
+        owner = int(np.searchsorted(offsets, segments[best], side='right') - 1)
+        return keys[owner], float(distances[best]), tuple(closest[best].tolist())
+
+    def hit_test(self, point, radius):
+        """Ключ кривой, проходящей не дальше radius от point, или None."""
+        found = self.nearest(point, radius)
+        return found[0] if found else None
+
+# --- Составные сплайны ---
+
+class CompositeSpline(CurveStrategy):
+    """
+    Сплайн по управляющему многоугольнику произвольной длины: сегмент s строится
+    по точкам STRIDE * s .. STRIDE * s + 3 с базисной матрицей M.
+    Все сегменты вычисляются одним векторным ядром (evaluate_segments),
+    число отрезков на сегмент - по формуле Ванга для его формы Безье.
+    """
+    STRIDE = 1 # Shift of the control window between neighbouring segments
+    required_points = None
+    min_points = 4
+
+    def segment_count(self, n):
+        """Число сегментов для n управляющих точек (лишние точки в конце не используются)."""
+        return max(0, (n - 4) // self.STRIDE + 1)
+
+    def affected_segments(self, index, n):
+        """Сегменты (не больше 4), форма которых зависит от точки index."""
+        first = max(0, -(-(index - 3) // self.STRIDE))
+        last = min(self.segment_count(n) - 1, index // self.STRIDE)
+        return range(first, last + 1)
+
+    def evaluate_segments(self, points, segments, tolerance=FLATNESS_TOLERANCE):
+        """Ломаные для сегментов segments: список массивов (k, 2)."""
+        segments = np.asarray(segments, dtype=np.int64)
+        if len(segments) == 0:
+            return []
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        geometry = points[self.STRIDE * segments[:, None] + np.arange(4)]
+        counts = wang_segments(M_BEZIER_INVERSE @ self.M @ geometry, tolerance)
+        return evaluate_segments(self.M, geometry, counts)
+
+    def evaluate(self, points, samples=DEFAULT_SAMPLES):
+        """
+        Точки всего сплайна (samples, 2) при равномерном шаге общего параметра;
+        samples=None - адаптивная ломаная сегментов (как flatten).
+        """
+        if samples is None:
+            return self.flatten(points)
+        return self.evaluate_many(np.asarray(points, dtype=float)[None], samples)[0]
+
+    def evaluate_many(self, controls, samples=DEFAULT_SAMPLES):
+        """
+        Пакет N сплайнов с одинаковым числом точек K >= min_points:
+        (N, K, 2) -> (N, samples, 2), все сегменты каждого сплайна.
+        """
+        controls = np.asarray(controls, dtype=float)
+        count = self.segment_count(controls.shape[1])
+        if count == 0:
+            raise ValueError(f"Сплайну нужно не меньше {self.min_points} точек, получено {controls.shape[1]}")
+        index, weights = composite_table(type(self), count, samples)
+        return np.einsum('kj,nkjd->nkd', weights, controls[:, index])
+
+    def new_cache(self):
+        return SplineSegments(self)
+
+    def polyline(self, points, cache=None):
+        # The item's cache already holds the segments drawn last
+        if cache is None:
+            cache = SplineSegments(self)
+        return cache.update(points).polyline()
+
+    def flatten(self, points, tolerance=FLATNESS_TOLERANCE):
+        return SplineSegments(self, tolerance).update(points).polyline()
+
+    def draw_preview(self, points, canvas, segments=None):
+        if len(points) < self.min_points: return None
+        if segments is None:
+            segments = SplineSegments(self)
+        render_polyline(segments.update(points).polyline(), canvas, PREVIEW_TAG)
+        return PREVIEW_TAG
+
+    def draw(self, points, canvas, segments=None):
+        """
+        Рисует сплайн одной ломаной. segments - кэш SplineSegments элемента:
+        при повторной отрисовке пересчитываются только сегменты с измененными точками.
+        """
+        if len(points) < self.min_points: return None
+        if segments is None:
+            segments = SplineSegments(self)
+        shape_tag = f"spline_{time.time_ns()}" # Unique tag
+        render_polyline(segments.update(points).polyline(), canvas, shape_tag)
+        return shape_tag
+
+class CompositeBSpline(CompositeSpline):
+    M = BSplineCurve.M
+
+class CatmullRomSpline(CompositeSpline):
+    M = 0.5 * np.array([
+        [-1, 3, -3, 1],
+        [2, -5, 4, -1],
+        [-1, 0, 1, 0],
+        [0, 2, 0, 0]
+    ])
+
+class BezierChain(CompositeSpline):
+    M = M_BEZIER
+    STRIDE = 3 # Neighbouring segments share an end point
+
+class SplineSegments:
+    """
+    Ломаные сегментов одного составного сплайна. update(points) сравнивает точки
+    с предыдущими и пересчитывает только затронутые сегменты.
+    """
+    def __init__(self, strategy, tolerance=FLATNESS_TOLERANCE):
+        self.strategy = strategy
+        self.tolerance = tolerance
+        self.points = np.zeros((0, 2))
+        self.polylines = []
+        self.evaluated = 0 # Segments recomputed by the last update
+
+    def update(self, points):
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        count = self.strategy.segment_count(len(points))
+        if points.shape != self.points.shape:
+            self.polylines = [None] * count
+            dirty = list(range(count))
+        else:
+            changed = np.nonzero((points != self.points).any(axis=1))[0]
+            dirty = sorted({s for i in changed.tolist() for s in self.strategy.affected_segments(i, len(points))})
+        for segment, polyline in zip(dirty, self.strategy.evaluate_segments(points, dirty, self.tolerance)):
+            self.polylines[segment] = polyline
+        self.points = points.copy()
+        self.evaluated = len(dirty)
+        return self
+
+    def polyline(self):
+        """Вся ломаная: сегменты подряд, общие точки стыков не повторяются."""
+        if not self.polylines:
+            return np.zeros((0, 2))
+        return np.vstack([self.polylines[0]] + [polyline[1:] for polyline in self.polylines[1:]])
+
+# --- Кривые произвольной степени ---
+
+class BezierNCurve(CurveStrategy):
+    """Кривая Безье любой степени (число точек - 1) через кэшированную таблицу Бернштейна."""
+    required_points = None
+    min_points = 2
+
+    def evaluate(self, points, samples=None):
+        control = np.asarray(points, dtype=float)[:, :2]
+        if samples is None:
+            samples = sample_count(control, len(control) - 1)
+        return bernstein_table(len(control) - 1, samples) @ control
+
+    def evaluate_many(self, controls, samples=DEFAULT_SAMPLES):
+        """Пакет N кривых одной степени: (N, K, 2) -> (N, samples, 2)."""
+        controls = np.asarray(controls, dtype=float)
+        return bernstein_table(controls.shape[1] - 1, samples) @ controls
+
+    def flatten(self, points, tolerance=FLATNESS_TOLERANCE):
+        control = np.asarray(points, dtype=float)[:, :2]
+        return self.evaluate(control, sample_count(control, len(control) - 1, tolerance=tolerance))
+
+    def draw_preview(self, points, canvas, segments=None):
+        if len(points) < self.min_points: return None
+        render_polyline(self.evaluate(points), canvas, PREVIEW_TAG)
+        return PREVIEW_TAG
+
+    def draw(self, points, canvas, segments=None):
+        if len(points) < self.min_points: return None
+        shape_tag = f"bezier_{time.time_ns()}" # Unique tag
+        render_polyline(self.evaluate(points), canvas, shape_tag)
+        return shape_tag
+
+class NurbsCurve(CurveStrategy):
+    """
+    Рациональный B-сплайн (NURBS) степени DEGREE. Базис Кокса - де Бура кэшируется
+    по (узловой вектор, степень, число точек), поэтому перерисовка после сдвига
+    ручки - одно умножение базиса на однородные координаты [w*P, w].
+    Веса точек хранятся в элементе редактора и передаются в draw/polyline (weights).
+    """
+    DEGREE = 3
+    required_points = None
+    min_points = 2
+    weighted = True # The editor stores a weight per control point
+
+    def _degree(self, n):
+        return min(self.DEGREE, n - 1)
+
+    def _samples(self, control, weights, tolerance=FLATNESS_TOLERANCE):
+        """Число точек по формуле Ванга; для весов допуск уменьшается в min(w) / max(w) раз."""
+        if weights is not None:
+            weights = np.asarray(weights, dtype=float)
+            tolerance *= weights.min() / weights.max()
+        degree = self._degree(len(control))
+        return sample_count(control, degree, len(control) - degree, tolerance)
+
+    def evaluate(self, points, weights=None, knots=None, samples=None):
+        """
+        Точки кривой (samples, 2).
+
+        Args:
+            points: управляющие точки (n, 2).
+            weights: веса (n,); None - все 1 (обычный B-сплайн).
+            knots: узловой вектор из n + degree + 1 узлов; None - равномерный зажатый.
+            samples: число точек; None - по формуле Ванга.
+        """
+        control = np.asarray(points, dtype=float)[:, :2]
+        if samples is None:
+            samples = self._samples(control, weights)
+        return self.evaluate_many(control[None], samples, weights, knots)[0]
+
+    def evaluate_many(self, controls, samples=DEFAULT_SAMPLES, weights=None, knots=None):
+        """
+        Пакет N кривых с общими весами и узлами: (N, K, 2) -> (N, samples, 2).
+
+        Args:
+            weights: веса (K,); None - все 1.
+            knots: узловой вектор из K + degree + 1 узлов; None - равномерный зажатый.
+        """
+        controls = np.asarray(controls, dtype=float)
+        n = controls.shape[1]
+        degree = self._degree(n)
+        knots = clamped_knots(n, degree) if knots is None else tuple(float(k) for k in knots)
+        basis = bspline_basis(knots, degree, samples)
+        if weights is None:
+            return basis @ controls
+        weights = np.asarray(weights, dtype=float)
+        return (basis @ (controls * weights[:, None])) / (basis @ weights)[:, None]
+
+    def flatten(self, points, tolerance=FLATNESS_TOLERANCE, weights=None):
+        control = np.asarray(points, dtype=float)[:, :2]
+        return self.evaluate(control, weights, samples=self._samples(control, weights, tolerance))
+
+    def polyline(self, points, cache=None, weights=None):
+        return self.flatten(points, weights=weights)
+
+    def draw_preview(self, points, canvas, segments=None, weights=None):
+        if len(points) < self.min_points: return None
+        render_polyline(self.evaluate(points, weights), canvas, PREVIEW_TAG)
+        return PREVIEW_TAG
+
+    def draw(self, points, canvas, segments=None, weights=None):
+        if len(points) < self.min_points: return None
+        shape_tag = f"nurbs_{time.time_ns()}" # Unique tag
+        render_polyline(self.evaluate(points, weights), canvas, shape_tag)
+        return shape_tag
 
 class CurveContext:
     def __init__(self):
         self._strategy = None
-        
+
     def set_strategy(self, strategy):
         self._strategy = strategy
-        
+
     def get_strategy(self):
         return self._strategy
-        
+
     def execute_strategy(self, points, canvas):
         if self._strategy:
             # Now it returns the tag
             return self._strategy.draw(points, canvas)
         return None
-        
+
     def draw(self, points, canvas):
         if self._strategy:
-            self._strategy.draw(points, canvas) 
\ No newline at end of file
+            self._strategy.draw(points, canvas)
+
+    def evaluate_many(self, controls, samples=DEFAULT_SAMPLES):
+        """
+        Пакетное вычисление N кривых текущей стратегией без холста.
+
+        Args:
+            controls: массив (N, K, 2) управляющих точек (K = 4 для кубических кривых).
+            samples: число значений t на кривую.
+
+        Returns:
+            np.ndarray | None: точки кривых (N, samples, 2).
+        """
+        if self._strategy:
+            return self._strategy.evaluate_many(controls, samples)
+        return None
@@ -34,6 +34,89 @@ class FillStrategyInterface(ABC):
         return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
 # --- Алгоритм Edge Table + Active Edge List ---
+def scanline_spans(polygon_points: list, y_range=None, half_open_x=False):
+    """
+    Растровая развертка полигона с ET и AEL: генератор спанов (y, x_start, x_end),
+    x_end включительно. Закрашиваются пиксели с целыми координатами внутри полигона,
+    поэтому вершины могут быть и дробными. Строки берутся полуоткрыто
+    (y_min <= y < y_max), столбцы - включительно (x_left <= x <= x_right).
+
+    Args:
+        polygon_points: вершины полигона [(x, y), ...].
+        y_range: (y_min, y_max) - строки вне диапазона пропускаются без обхода.
+        half_open_x: правило "верх-лево" и на оси x (x_left <= x < x_right), как
+            на y: полоса ширины w занимает ровно w строк или w столбцов при любом
+            направлении (для толстых отрезков).
+    """
+    if not polygon_points or len(polygon_points) < 3:
+        return
+    # 1. Определить Y_min и Y_max полигона
+    min_y = math.ceil(min(p[1] for p in polygon_points))
+    max_y = math.floor(max(p[1] for p in polygon_points))
+    if y_range is not None:
+        min_y = max(min_y, math.ceil(y_range[0]))
+        max_y = min(max_y, math.floor(y_range[1]))
+
+    # 2. Создать Edge Table (ET)
+    edge_table = defaultdict(list)
+    n = len(polygon_points)
+    for i in range(n):
+        p1 = polygon_points[i]
+        p2 = polygon_points[(i + 1) % n]
+        y1, y2 = p1[1], p2[1]
+        x1, x2 = p1[0], p2[0]
+
+        # Игнорируем горизонтальные ребра
+        if y1 == y2:
+            continue
+
+        # Упорядочиваем точки по Y
+        if y1 > y2:
+            y1, y2 = y2, y1
+            x1, x2 = x2, x1
+
+        # Параметры ребра для AEL
+        slope_inv = (x2 - x1) / (y2 - y1)
+        # First scanline of the edge (clipped edges start at the first visible one)
+        y_start = max(math.ceil(y1), min_y)
+        if y_start >= y2:
+            continue
+        x_start = float(x1) if y_start == y1 else x1 + slope_inv * (y_start - y1)
+        edge_entry = {'y_max': y2, 'x_current': x_start, 'slope_inv': slope_inv}
+        edge_table[y_start].append(edge_entry)
+
+    # 3. Инициализировать Active Edge List (AEL)
+    active_edge_list = []
+
+    # 4. Цикл по строкам развертки (scanlines)
+    for y in range(min_y, max_y + 1):
+        # Удаляем ребра из AEL, для которых y >= y_max (строго > в оригинале, но >= безопаснее для горизонталей)
+        active_edge_list = [edge for edge in active_edge_list if edge['y_max'] > y]
+
+        # Добавляем ребра из ET в AEL, для которых y == y_min
+        if y in edge_table:
+            active_edge_list.extend(edge_table[y])
+
+        # Сортируем AEL по x_current
+        active_edge_list.sort(key=lambda edge: edge['x_current'])
+
+        # Спаны между парами ребер в AEL
+        for i in range(0, len(active_edge_list) - 1, 2):
+            # Округляем правильно: начало - ceil, конец - floor (включительно),
+            # или полуоткрыто, как строки: x_left <= x < x_right
+            x_start = math.ceil(active_edge_list[i]['x_current'])
+            if half_open_x:
+                x_end = math.ceil(active_edge_list[i + 1]['x_current']) - 1
+            else:
+                x_end = math.floor(active_edge_list[i + 1]['x_current'])
+            if x_start <= x_end:
+                yield y, x_start, x_end
+
+        # Обновляем x_current для следующей строки
+        for edge in active_edge_list:
+            edge['x_current'] += edge['slope_inv']
+
+
 class ET_AEL_FillStrategy(FillStrategyInterface):
     def __init__(self):
         self.name = "Растровая развертка с ET и AEL"
@@ -44,72 +127,10 @@ class ET_AEL_FillStrategy(FillStrategyInterface):
             return None
 
         fill_tag = f"fill_et_ael_{time.time_ns()}"
-        # 1. Определить Y_min и Y_max полигона
-        min_y = min(p[1] for p in polygon_points)
-        max_y = max(p[1] for p in polygon_points)
-
-        # 2. Создать Edge Table (ET)
-        edge_table = defaultdict(list)
-        n = len(polygon_points)
-        for i in range(n):
-            p1 = polygon_points[i]
-            p2 = polygon_points[(i + 1) % n]
-            y1, y2 = p1[1], p2[1]
-            x1, x2 = p1[0], p2[0]
-
-            # Игнорируем горизонтальные ребра
-            if y1 == y2:
-                continue
-
-            # Упорядочиваем точки по Y
-            if y1 > y2:
-                y1, y2 = y2, y1
-                x1, x2 = x2, x1
-
-            # Параметры ребра для AEL
-            # Проверяем деление на ноль явно
-            delta_y = y2 - y1
-            if delta_y == 0: continue # Повторная проверка, на всякий случай
-            slope_inv = (x2 - x1) / delta_y
-            edge_entry = {'y_max': y2, 'x_current': float(x1), 'slope_inv': slope_inv}
-            edge_table[y1].append(edge_entry)
-
-
-        # 3. Инициализировать Active Edge List (AEL)
-        active_edge_list = []
-
-        # 4. Цикл по строкам развертки (scanlines)
-        for y in range(min_y, max_y + 1):
-            # Удаляем ребра из AEL, для которых y >= y_max (строго > в оригинале, но >= безопаснее для горизонталей)
-            active_edge_list = [edge for edge in active_edge_list if edge['y_max'] > y]
-
-
-            # Добавляем ребра из ET в AEL, для которых y == y_min
-            if y in edge_table:
-                active_edge_list.extend(edge_table[y])
-
-            # Сортируем AEL по x_current
-            active_edge_list.sort(key=lambda edge: edge['x_current'])
-
-            # Заполняем пиксели между парами ребер в AEL
-            for i in range(0, len(active_edge_list), 2):
-                if i + 1 < len(active_edge_list):
-                    # Округляем правильно: начало - ceil, конец - floor
-                    x_start = math.ceil(active_edge_list[i]['x_current'])
-                    # Конец должен быть включительно, но range не включает верхнюю границу,
-                    # floor может дать тот же пиксель, что и ceil при малых наклонах
-                    x_end = math.floor(active_edge_list[i+1]['x_current'])
-                    for x in range(x_start, x_end + 1): # +1 чтобы включить x_end
-                         # Проверяем границы холста перед отрисовкой
-                         # canvas_width = canvas.winfo_width()
-                         # canvas_height = canvas.winfo_height()
-                         # if 0 <= x < canvas_width and 0 <= y < canvas_height:
-                         self._plot_pixel(canvas, x, y, fill_color, fill_tag)
-
-
-            # Обновляем x_current для следующей строки
-            for edge in active_edge_list:
-                edge['x_current'] += edge['slope_inv']
+        # Заполняем пиксели спанов из развертки ET + AEL
+        for y, x_start, x_end in scanline_spans(polygon_points):
+            for x in range(x_start, x_end + 1): # +1 чтобы включить x_end
+                self._plot_pixel(canvas, x, y, fill_color, fill_tag)
 
         return fill_tag
 
@@ -1,8 +1,105 @@
 from abc import ABC, abstractmethod
 from .baseLineContext import BaseLineContext
+from .clipping import liang_barsky
+from .pixelStream import render_pixels, render_array, render_spans, record_pixels
+from .algorithmsFill import scanline_spans
+from .rasterCache import RasterCache
+from model.framebuffer import FrameBuffer
+import numpy as np
+import math
 import time # Add time for unique tags
 
 
+# --- Вспомогательные функции для пакетной (векторной) растеризации ---
+_MAX_PADDED_CELLS = 1 << 22 # Limit for the padded (rows x steps) work arrays
+
+def _segment_steps(counts):
+    """Для N отрезков с counts[i] шагами возвращает (номер отрезка, номер шага) для каждого шага."""
+    counts = np.asarray(counts, dtype=np.int64)
+    index = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    steps = np.arange(int(counts.sum()), dtype=np.int64) - np.repeat(starts, counts)
+    return index, steps
+
+def _sequential_sums(starts, incs, counts):
+    """
+    Значения start, start+inc, (start+inc)+inc, ... (counts[i] штук) для каждого отрезка.
+    Сложение идет последовательно, как в циклах стратегий (x += x_inc),
+    поэтому результат совпадает с ними бит в бит.
+    """
+    starts = np.asarray(starts, dtype=float)
+    incs = np.asarray(incs, dtype=float)
+    counts = np.asarray(counts, dtype=np.int64)
+    result = np.empty(int(counts.sum()), dtype=float)
+    offsets = np.cumsum(counts) - counts
+    order = np.argsort(counts, kind="stable")
+    pos = 0
+    while pos < len(order):
+        # Group rows of similar length so the padded block stays small
+        end = pos + 1
+        while end < len(order) and (end - pos + 1) * counts[order[end]] <= _MAX_PADDED_CELLS:
+            end += 1
+        rows = order[pos:end]
+        width = int(counts[rows].max()) if len(rows) else 0
+        if width > 0:
+            block = np.repeat(incs[rows, None], width, axis=1)
+            block[:, 0] = starts[rows]
+            block = np.cumsum(block, axis=1) # add.accumulate is strictly sequential
+            mask = np.arange(width) < counts[rows, None]
+            dest = np.repeat(offsets[rows], counts[rows]) + _segment_steps(counts[rows])[1]
+            result[dest] = block[mask]
+        pos = end
+    return result
+
+
+def _unit(intensity):
+    """Ограничивает интенсивность диапазоном [0, 1]."""
+    return 0 if intensity < 0 else 1 if intensity > 1 else intensity
+
+
+def _advance(start, inc, n):
+    """
+    Значение start после n последовательных сложений x += inc.
+    Сложения выполняет NumPy (add.accumulate), поэтому результат совпадает
+    с циклом бит в бит, но без n итераций Python.
+    """
+    chunk = 1 << 20
+    value = float(start)
+    while n > 0:
+        count = min(n, chunk)
+        block = np.full(count + 1, inc, dtype=float)
+        block[0] = value
+        value = float(np.add.accumulate(block)[-1])
+        n -= count
+    return value
+
+
+def thick_line_polygon(a, b, width, cap="butt"):
+    """
+    Контур толстого отрезка a-b шириной width: четырехугольник ("butt")
+    или "стадион" с полукруглыми концами ("round"). Центры пикселей - целые точки.
+    """
+    x1, y1 = map(float, a)
+    x2, y2 = map(float, b)
+    half = width / 2
+    length = math.hypot(x2 - x1, y2 - y1)
+    # Unit direction; a zero-length line is drawn as a square or a disc
+    ux, uy = ((x2 - x1) / length, (y2 - y1) / length) if length else (1.0, 0.0)
+    nx, ny = -uy * half, ux * half # Normal scaled to half the width
+    if cap != "round":
+        return [(x1 + nx, y1 + ny), (x2 + nx, y2 + ny), (x2 - nx, y2 - ny), (x1 - nx, y1 - ny)] if length else \
+               [(x1 - half, y1 - half), (x1 + half, y1 - half), (x1 + half, y1 + half), (x1 - half, y1 + half)]
+    # Semicircles around both ends, sampled finely enough to stay within ~1/4 pixel
+    segments = max(4, math.ceil(math.pi / math.acos(max(-1.0, 1 - 0.25 / max(half, 0.25)))))
+    segments += segments % 2 # Even, so the arc has a vertex exactly on the line's axis
+    base = math.atan2(ny, nx)
+    points = []
+    for (cx, cy), start in (((x2, y2), base - math.pi), ((x1, y1), base)):
+        for i in range(segments + 1):
+            angle = start + math.pi * i / segments
+            points.append((cx + half * math.cos(angle), cy + half * math.sin(angle)))
+    return points
+
 
 class LineStrategyInterface(ABC):
     @abstractmethod
@@ -12,49 +109,142 @@ class LineStrategyInterface(ABC):
     def execute(self, a, b, canvas):
         pass
 
+    @abstractmethod
+    def iter_pixels(self, a, b, viewport=None):
+        """
+        Поток пикселей отрезка a-b: генератор кортежей (x, y, intensity)
+        в порядке шагов алгоритма. viewport отсекает невидимую часть.
+        """
+        pass
+
+    def _render(self, pixels, canvas, debugger, tag, merge_runs=False, blend=False):
+        """Отдает поток пикселей отладчику или выводит его на холст/в буфер кадра."""
+        if debugger:
+            record_pixels(pixels, debugger, "Линия")
+        elif canvas:
+            render_pixels(pixels, canvas, tag, merge_runs, blend)
+
     @abstractmethod
     def plot(self, canvas, x, y, color):
         pass
 
+    # Extra pixels around the viewport: rasterized pixels deviate from the ideal
+    # line by up to one pixel (Wu also draws the neighbour pixel)
+    VIEWPORT_MARGIN = 2
+    TAG_PREFIX = "line"
+    # Shifting both endpoints by an integer offset shifts the pixels by the same offset
+    # (RasterCache stores only such strategies; float algorithms leave it False)
+    translation_invariant = False
+
+    def _clip(self, a, b, viewport):
+        """Параметры [t0, t1] видимой в viewport (xmin, ymin, xmax, ymax) части отрезка a-b или None."""
+        if viewport is None:
+            return 0.0, 1.0
+        xmin, ymin, xmax, ymax = viewport
+        m = self.VIEWPORT_MARGIN
+        return liang_barsky(a, b, (xmin - m, ymin - m, xmax + m, ymax + m))
+
+    def _visible_steps(self, a, b, steps, viewport, scale=None):
+        """
+        Диапазон шагов [k_lo, k_hi] цикла растеризации (шаг k ~ параметр t = k / scale),
+        попадающих в viewport, или None, если отрезок целиком невидим.
+        """
+        clip = self._clip(a, b, viewport)
+        if clip is None:
+            return None
+        if viewport is None:
+            return 0, steps
+        scale = steps if scale is None else scale
+        t0, t1 = clip
+        return max(0, math.floor(t0 * scale)), min(steps, math.ceil(t1 * scale))
+
+    def execute_many(self, segments):
+        """
+        Растеризует N отрезков за один вызов без холста.
+
+        Args:
+            segments: массив (N, 4) концов отрезков [x1, y1, x2, y2].
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: пиксели (M, 2),
+            интенсивности (M,) и номер отрезка для каждого пикселя (M,).
+        """
+        # Generic fallback: consume the pixel stream once per segment
+        segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+        pixels, intensities, index = [], [], []
+        for i, (x1, y1, x2, y2) in enumerate(segments.tolist()):
+            for x, y, intensity in self.iter_pixels([x1, y1], [x2, y2]):
+                pixels.append((x, y))
+                intensities.append(intensity)
+                index.append(i)
+        return (np.array(pixels, dtype=np.int64).reshape(-1, 2),
+                np.array(intensities, dtype=float),
+                np.array(index, dtype=np.int64))
+
 class DDAStrategy(LineStrategyInterface):
     def __init__(self):
         self.name = 'ЦДА'
-    def execute(self, a, b, canvas, debugger=None):
-        shape_tag = f"line_{time.time_ns()}"
+        self.use_spans = True # Output runs of pixels instead of single pixels
+    def execute(self, a, b, canvas, debugger=None, viewport=None):
+        shape_tag = f"{self.TAG_PREFIX}_{time.time_ns()}"
+        self._render(self.iter_pixels(a, b, viewport), canvas, debugger, shape_tag, self.use_spans)
+        return shape_tag
+
+    def iter_pixels(self, a, b, viewport=None):
         x1, y1 = a
         x2, y2 = b
 
         dx = x2 - x1
         dy = y2 - y1
         length = max(abs(dx), abs(dy))
-        if length == 0: return shape_tag # Handle zero-length line
+        if length == 0: return # Handle zero-length line
+
+        visible = self._visible_steps(a, b, int(length), viewport, scale=length)
+        if visible is None: return # Entirely outside the viewport
+        k_lo, k_hi = visible
 
         x_inc = dx / length
         y_inc = dy / length
 
         x = x1 + 0.5 * (1 if dx > 0 else -1 if dx < 0 else 0)
         y = y1 + 0.5 * (1 if dy > 0 else -1 if dy < 0 else 0)
+        # Start from the first visible step with exactly the same sub-pixel position
+        x = _advance(x, x_inc, k_lo)
+        y = _advance(y, y_inc, k_lo)
 
-        # Use a helper to plot/record
-        self._plot_or_record(canvas, debugger, int(x), int(y), 1.0, shape_tag)
         last_plot_x, last_plot_y = int(x), int(y)
+        yield last_plot_x, last_plot_y, 1.0
 
-        for _ in range(int(length)):
+        for _ in range(k_hi - k_lo):
             x += x_inc
             y += y_inc
             plot_x, plot_y = int(x), int(y)
             if (plot_x, plot_y) != (last_plot_x, last_plot_y):
-                 self._plot_or_record(canvas, debugger, plot_x, plot_y, 1.0, shape_tag)
+                 yield plot_x, plot_y, 1.0
                  last_plot_x, last_plot_y = plot_x, plot_y
-        return shape_tag
 
-    def _plot_or_record(self, canvas, debugger, x, y, intensity, tag):
-        if debugger:
-            debugger.record_step(x, y, intensity, "Линия") # Assuming record_step takes intensity and mode
-        elif canvas:
-             # Intensity handling for DDA? Defaulting to black
-             color = "black"
-             canvas.create_rectangle(x, y, x + 1, y + 1, outline=color, fill=color, tags=tag)
+    def execute_many(self, segments):
+        """Векторная версия execute для массива отрезков (N, 4)."""
+        segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+        x1, y1, x2, y2 = segments.T
+        dx = x2 - x1
+        dy = y2 - y1
+        length = np.maximum(np.abs(dx), np.abs(dy))
+        safe_length = np.where(length == 0, 1.0, length)
+
+        # Zero-length lines produce no pixels, others int(length) + 1 samples
+        counts = np.where(length == 0, 0, length.astype(np.int64) + 1)
+        xs = _sequential_sums(x1 + 0.5 * np.sign(dx), dx / safe_length, counts)
+        ys = _sequential_sums(y1 + 0.5 * np.sign(dy), dy / safe_length, counts)
+        index, steps = _segment_steps(counts)
+        px = xs.astype(np.int64) # int() truncates toward zero, so does astype
+        py = ys.astype(np.int64)
+
+        # Skip samples that hit the same pixel as the previous one
+        keep = np.ones(len(px), dtype=bool)
+        keep[1:] = (steps[1:] == 0) | (px[1:] != px[:-1]) | (py[1:] != py[:-1])
+        pixels = np.stack([px[keep], py[keep]], axis=1)
+        return pixels, np.ones(len(pixels)), index[keep]
 
     # Keep plot for interface, though execute might not call it directly
     def plot(self, canvas, x, y, color="black"):
@@ -62,10 +252,17 @@ class DDAStrategy(LineStrategyInterface):
 
 
 class BresenhamStrategy(LineStrategyInterface):
+    translation_invariant = True # Integer algorithm on int() endpoints
+
     def __init__(self):
         self.name = 'Брезенхем'
-    def execute(self, a, b, canvas, debugger=None):
-        shape_tag = f"line_{time.time_ns()}"
+        self.use_spans = True # Output runs of pixels instead of single pixels
+    def execute(self, a, b, canvas, debugger=None, viewport=None):
+        shape_tag = f"{self.TAG_PREFIX}_{time.time_ns()}"
+        self._render(self.iter_pixels(a, b, viewport), canvas, debugger, shape_tag, self.use_spans)
+        return shape_tag
+
+    def iter_pixels(self, a, b, viewport=None):
         x1, y1 = map(int, a)
         x2, y2 = map(int, b)
 
@@ -75,52 +272,247 @@ class BresenhamStrategy(LineStrategyInterface):
         sx = 1 if x1 < x2 else -1
         sy = 1 if y1 < y2 else -1
 
-        # Plot the first point
-        self._plot_point(canvas, debugger, x1, y1, "black", shape_tag)
+        visible = self._visible_steps((x1, y1), (x2, y2), max(dx, dy), viewport)
+        if visible is None: return # Entirely outside the viewport
+        k_lo, k_hi = visible
 
         if dx > dy:
             e = 2 * dy - dx
-            while x1 != x2:
+            if k_lo:
+                # Jump to the first visible step: closed form of the error accumulation
+                m = (2 * dy * k_lo + dx) // (2 * dx)
+                x1 += sx * k_lo
+                y1 += sy * m
+                e += 2 * dy * k_lo - 2 * dx * m
+            # Plot the first point
+            yield x1, y1, 1.0
+            for _ in range(k_hi - k_lo):
                 if e >= 0:
                     y1 += sy
                     e -= 2 * dx
                 x1 += sx
                 e += 2 * dy
-                self._plot_point(canvas, debugger, x1, y1, "black", shape_tag)
+                yield x1, y1, 1.0
         else:
             e = 2 * dx - dy
-            while y1 != y2:
+            if k_lo:
+                m = (2 * dx * k_lo + dy) // (2 * dy)
+                y1 += sy * k_lo
+                x1 += sx * m
+                e += 2 * dx * k_lo - 2 * dy * m
+            # Plot the first point
+            yield x1, y1, 1.0
+            for _ in range(k_hi - k_lo):
                 if e >= 0:
                     x1 += sx
                     e -= 2 * dy
                 y1 += sy
                 e += 2 * dx
-                self._plot_point(canvas, debugger, x1, y1, "black", shape_tag)
-
-        return shape_tag
-
-    def _plot_point(self, canvas, debugger, x, y, color, tag):
-        if debugger:
-            debugger.record_step(x, y, 1.0, "Линия") # Assuming intensity 1.0
-        elif canvas:
-            canvas.create_rectangle(x, y, x + 1, y + 1, outline=color, fill=color, tags=tag)
+                yield x1, y1, 1.0
+
+    def execute_many(self, segments):
+        """
+        Векторная версия execute для массива отрезков (N, 4).
+
+        Смещение по второстепенной оси после k шагов равно
+        (2 * minor * k + major) // (2 * major) - это закрытая форма
+        накопления ошибки e в цикле execute (включая правило e >= 0).
+        """
+        segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+        x1, y1, x2, y2 = segments.astype(np.int64).T # Same truncation as map(int, ...)
+
+        dx = np.abs(x2 - x1)
+        dy = np.abs(y2 - y1)
+        sx = np.where(x1 < x2, 1, -1)
+        sy = np.where(y1 < y2, 1, -1)
+        steep = dx <= dy # The "else" branch of execute
+        major = np.where(steep, dy, dx)
+        minor = np.where(steep, dx, dy)
+
+        index, k = _segment_steps(major + 1)
+        maj = major[index]
+        m = (2 * minor[index] * k + maj) // np.maximum(2 * maj, 1)
+        st = steep[index]
+        px = x1[index] + sx[index] * np.where(st, m, k)
+        py = y1[index] + sy[index] * np.where(st, k, m)
+        pixels = np.stack([px, py], axis=1)
+        return pixels, np.ones(len(pixels)), index
 
     # Keep plot for interface
     def plot(self, canvas, x, y, color="black"):
         canvas.create_rectangle(int(x), int(y), int(x) + 1, int(y) + 1, outline=color, fill=color)
 
 
+class DoubleStepBresenhamStrategy(BresenhamStrategy):
+    """
+    Брезенхем с двойным шагом (шаблоны Ву) и симметричной генерацией.
+
+    За одну итерацию выбирается шаблон из двух пикселей: сдвиги по второстепенной
+    оси на первом и втором шаге (00, 01, 10 или 11). Вторая половина отрезка
+    получается отражением первой от дальнего конца, так что для целого отрезка
+    цикл проходит около n / 4 итераций. Пиксели (и их порядок) те же, что у BresenhamStrategy.
+
+    execute выводит массивы смещений без попиксельного потока: в буфер кадра - одним
+    plot_many, на Canvas - одним прямоугольником на прогон равных смещений. Отрезки
+    короче SHORT_LINE шагов идут обычным циклом Брезенхема (NumPy там дороже).
+    """
+    SHORT_LINE = 32
+    # Drawing from the offset arrays is faster than replaying cached pixels through runs
+    translation_invariant = False
+
+    def __init__(self):
+        super().__init__()
+        self.name = 'Брезенхем (двойной шаг)'
+
+    def execute(self, a, b, canvas, debugger=None, viewport=None):
+        shape_tag = f"{self.TAG_PREFIX}_{time.time_ns()}"
+        if debugger or not canvas or self._is_short(a, b):
+            self._render(self.iter_pixels(a, b, viewport), canvas, debugger, shape_tag, self.use_spans)
+            return shape_tag
+        # Fast path: the offsets are already arrays, no per-pixel stream
+        line = self._pixel_arrays(a, b, viewport)
+        if line is None:
+            return shape_tag
+        xs, ys, offsets = line
+        if isinstance(canvas, FrameBuffer):
+            canvas.plot_many(xs, ys, None, shape_tag)
+        elif self.use_spans:
+            # A run of equal minor offsets is one span along the major axis
+            starts = np.flatnonzero(np.diff(offsets, prepend=offsets[0] - 1))
+            ends = np.append(starts[1:], len(offsets)) - 1
+            x0, x1 = np.minimum(xs[starts], xs[ends]), np.maximum(xs[starts], xs[ends]) + 1
+            y0, y1 = np.minimum(ys[starts], ys[ends]), np.maximum(ys[starts], ys[ends]) + 1
+            for rect in zip(x0.tolist(), y0.tolist(), x1.tolist(), y1.tolist()):
+                canvas.create_rectangle(*rect, outline="black", fill="black", tags=shape_tag)
+        else:
+            render_array(np.stack([xs, ys], axis=1), None, canvas, shape_tag)
+        return shape_tag
+
+    def _is_short(self, a, b):
+        return max(abs(int(b[0]) - int(a[0])), abs(int(b[1]) - int(a[1]))) < self.SHORT_LINE
+
+    def iter_pixels(self, a, b, viewport=None):
+        if self._is_short(a, b):
+            yield from super().iter_pixels(a, b, viewport)
+            return
+        line = self._pixel_arrays(a, b, viewport)
+        if line is None: return
+        xs, ys, _ = line
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            yield x, y, 1.0
+
+    def _pixel_arrays(self, a, b, viewport=None):
+        """Пиксели отрезка массивами (xs, ys, смещения по второстепенной оси) или None."""
+        x1, y1 = map(int, a)
+        x2, y2 = map(int, b)
+
+        dx = abs(x2 - x1)
+        dy = abs(y2 - y1)
+
+        sx = 1 if x1 < x2 else -1
+        sy = 1 if y1 < y2 else -1
+
+        n = max(dx, dy)
+        visible = self._visible_steps((x1, y1), (x2, y2), n, viewport)
+        if visible is None: return None # Entirely outside the viewport
+        if n == 0:
+            return np.array([x1]), np.array([y1]), np.zeros(1, dtype=np.int64)
+        k_lo, k_hi = visible
+        major, minor = (dx, dy) if dx > dy else (dy, dx)
+
+        if k_lo == 0 and k_hi == n:
+            # Steps 0..n/2 directly, the rest mirrored from the far end:
+            # m[n - k] = minor - m[k] + (1 if the error term D[k] is 0 else 0)
+            half = n // 2
+            offsets = np.array(self._offsets(major, minor, 0, half + 1), dtype=np.int64)
+            k = np.arange(n - half)
+            ties = (2 * minor * k + major) % (2 * major) == 0
+            offsets = np.concatenate([offsets, (minor - offsets[k] + ties)[::-1]])
+        else:
+            # Clipped: double steps over the visible part only
+            offsets = np.array(self._offsets(major, minor, k_lo, k_hi - k_lo + 1), dtype=np.int64)
+
+        k = np.arange(k_lo, k_lo + len(offsets))
+        if dx > dy:
+            return x1 + sx * k, y1 + sy * offsets, offsets
+        return x1 + sx * offsets, y1 + sy * k, offsets
+
+    @staticmethod
+    def _offsets(major, minor, k0, count):
+        """
+        Смещения m[k] по второстепенной оси для шагов k0..k0+count-1, по два шага за итерацию.
+
+        Ошибка D[k] = 2 * minor * k + major - 2 * major * m[k], 0 <= D[k] < 2 * major.
+        """
+        two_major = 2 * major
+        step, step2 = 2 * minor, 4 * minor
+        m = (step * k0 + major) // two_major
+        d = step * k0 + major - two_major * m
+        offsets = []
+        add = offsets.append
+        if step <= major:
+            # At most one minor step per two steps: patterns 00, 01, 10
+            t00 = two_major - step2
+            t10 = two_major - step
+            for _ in range(count // 2):
+                if d < t00:
+                    add(m); add(m)
+                    d += step2
+                elif d >= t10:
+                    add(m); add(m + 1)
+                    m += 1
+                    d += step2 - two_major
+                else:
+                    add(m); add(m)
+                    m += 1
+                    d += step2 - two_major
+        else:
+            # At least one minor step per two steps: patterns 01, 10, 11
+            t10 = two_major - step
+            t11 = 2 * two_major - step2
+            for _ in range(count // 2):
+                if d >= t11:
+                    add(m); add(m + 1)
+                    m += 2
+                    d += step2 - 2 * two_major
+                elif d >= t10:
+                    add(m); add(m + 1)
+                    m += 1
+                    d += step2 - two_major
+                else:
+                    add(m); add(m)
+                    m += 1
+                    d += step2 - two_major
+        if count % 2:
+            add(m)
+        return offsets
+
+
 class WuStrategy(LineStrategyInterface):
     def __init__(self):
         self.name = 'Ву'
+        self.blend = True # In the framebuffer, accumulate coverage instead of overwriting pixels
     def plot(self, canvas, x, y, intensity=1.0, color=None):
         """Реализация абстрактного метода plot (игнорируем color, используем intensity)."""
-        # This plot method might not be directly called if _plot_wu is used internally,
-        # but it needs to exist to satisfy the interface.
-        self._plot_wu(canvas, None, int(x), int(y), intensity, tag=None) # Plot single point without tag
+        # Not used by execute (it renders the pixel stream), exists to satisfy the interface
+        render_pixels([(int(x), int(y), _unit(intensity))], canvas, None) # Single point without tag
+
+    def _major_range(self, a, b, viewport):
+        """Видимый диапазон координаты x отрезка a-b (x - главная ось) или None."""
+        clip = self._clip(a, b, viewport)
+        if clip is None:
+            return None
+        t0, t1 = clip
+        xa = a[0] + t0 * (b[0] - a[0])
+        xb = a[0] + t1 * (b[0] - a[0])
+        return math.floor(min(xa, xb)), math.ceil(max(xa, xb))
+
+    def execute(self, a, b, canvas, debugger=None, viewport=None):
+        shape_tag = f"{self.TAG_PREFIX}_{time.time_ns()}"
+        self._render(self.iter_pixels(a, b, viewport), canvas, debugger, shape_tag, blend=self.blend)
+        return shape_tag
 
-    def execute(self, a, b, canvas, debugger=None):
-        shape_tag = f"line_{time.time_ns()}"
+    def iter_pixels(self, a, b, viewport=None):
         x1, y1 = a
         x2, y2 = b
 
@@ -129,16 +521,22 @@ class WuStrategy(LineStrategyInterface):
 
         # Handle vertical/horizontal/single point cases without main loop
         if dx == 0 and dy == 0:
-            self._plot_wu(canvas, debugger, int(x1), int(y1), 1.0, shape_tag)
-            return shape_tag
+            if self._clip(a, b, viewport) is not None:
+                yield int(x1), int(y1), 1.0
+            return
         if dx == 0:
-            for y in range(min(int(y1), int(y2)), max(int(y1), int(y2)) + 1):
-                 self._plot_wu(canvas, debugger, int(x1), y, 1.0, shape_tag)
-            return shape_tag
+            visible = self._major_range((y1, x1), (y2, x2), None if viewport is None else
+                                        (viewport[1], viewport[0], viewport[3], viewport[2]))
+            if visible is None: return
+            for y in range(max(min(int(y1), int(y2)), visible[0]), min(max(int(y1), int(y2)), visible[1]) + 1):
+                 yield int(x1), y, 1.0
+            return
         if dy == 0:
-            for x in range(min(int(x1), int(x2)), max(int(x1), int(x2)) + 1):
-                 self._plot_wu(canvas, debugger, x, int(y1), 1.0, shape_tag)
-            return shape_tag
+            visible = self._major_range(a, b, viewport)
+            if visible is None: return
+            for x in range(max(min(int(x1), int(x2)), visible[0]), min(max(int(x1), int(x2)), visible[1]) + 1):
+                 yield x, int(y1), 1.0
+            return
 
         steep = abs(dy) > abs(dx)
         if steep:
@@ -154,18 +552,27 @@ class WuStrategy(LineStrategyInterface):
 
         gradient = dy / dx
 
+        # Visible range of the main axis (in the swapped frame for steep lines)
+        if viewport is not None and steep:
+            viewport = (viewport[1], viewport[0], viewport[3], viewport[2])
+        visible = self._major_range((x1, y1), (x2, y2), viewport)
+        if visible is None: return
+        x_lo, x_hi = visible
+
         # handle first endpoint
         xend = round(x1)
         yend = y1 + gradient * (xend - x1)
         xgap = 1 - ((x1 + 0.5) % 1) # fractional part from 0.5
         xpxl1 = int(xend)
         ypxl1 = int(yend)
-        if steep:
-            self._plot_wu(canvas, debugger, ypxl1,     xpxl1, (1 - (yend % 1)) * xgap, shape_tag)
-            self._plot_wu(canvas, debugger, ypxl1 + 1, xpxl1,    (yend % 1)  * xgap, shape_tag)
+        if not x_lo <= xpxl1 <= x_hi:
+            pass # Endpoint is outside the viewport
+        elif steep:
+            yield ypxl1, xpxl1, _unit((1 - (yend % 1)) * xgap)
+            yield ypxl1 + 1, xpxl1, _unit((yend % 1)  * xgap)
         else:
-            self._plot_wu(canvas, debugger, xpxl1, ypxl1,     (1 - (yend % 1)) * xgap, shape_tag)
-            self._plot_wu(canvas, debugger, xpxl1, ypxl1 + 1,    (yend % 1)  * xgap, shape_tag)
+            yield xpxl1, ypxl1, _unit((1 - (yend % 1)) * xgap)
+            yield xpxl1, ypxl1 + 1, _unit((yend % 1)  * xgap)
         intery = yend + gradient # first y-intersection for the main loop
 
         # handle second endpoint
@@ -174,42 +581,114 @@ class WuStrategy(LineStrategyInterface):
         xgap = (x2 + 0.5) % 1
         xpxl2 = int(xend)
         ypxl2 = int(yend)
-        if steep:
-            self._plot_wu(canvas, debugger, ypxl2,     xpxl2, (1 - (yend % 1)) * xgap, shape_tag)
-            self._plot_wu(canvas, debugger, ypxl2 + 1, xpxl2,    (yend % 1)  * xgap, shape_tag)
+        if not x_lo <= xpxl2 <= x_hi:
+            pass # Endpoint is outside the viewport
+        elif steep:
+            yield ypxl2, xpxl2, _unit((1 - (yend % 1)) * xgap)
+            yield ypxl2 + 1, xpxl2, _unit((yend % 1)  * xgap)
         else:
-            self._plot_wu(canvas, debugger, xpxl2, ypxl2,     (1 - (yend % 1)) * xgap, shape_tag)
-            self._plot_wu(canvas, debugger, xpxl2, ypxl2 + 1,    (yend % 1)  * xgap, shape_tag)
+            yield xpxl2, ypxl2, _unit((1 - (yend % 1)) * xgap)
+            yield xpxl2, ypxl2 + 1, _unit((yend % 1)  * xgap)
 
-        # main loop
+        # main loop (only over the visible part, intery advanced to its first column)
+        x_start = max(xpxl1 + 1, x_lo)
+        x_stop = min(xpxl2, x_hi + 1)
+        intery = _advance(intery, gradient, x_start - xpxl1 - 1)
         if steep:
-            for x in range(xpxl1 + 1, xpxl2):
-                self._plot_wu(canvas, debugger, int(intery),     x, 1 - (intery % 1), shape_tag)
-                self._plot_wu(canvas, debugger, int(intery) + 1, x,    (intery % 1), shape_tag)
+            for x in range(x_start, x_stop):
+                yield int(intery), x, _unit(1 - (intery % 1))
+                yield int(intery) + 1, x, _unit((intery % 1))
                 intery += gradient
         else:
-            for x in range(xpxl1 + 1, xpxl2):
-                self._plot_wu(canvas, debugger, x, int(intery),     1 - (intery % 1), shape_tag)
-                self._plot_wu(canvas, debugger, x, int(intery) + 1,    (intery % 1), shape_tag)
+            for x in range(x_start, x_stop):
+                yield x, int(intery), _unit(1 - (intery % 1))
+                yield x, int(intery) + 1, _unit((intery % 1))
                 intery += gradient
 
-        return shape_tag
-
-    def _plot_wu(self, canvas, debugger, x, y, intensity, tag):
-        if intensity < 0: intensity = 0
-        if intensity > 1: intensity = 1
-        if debugger:
-            debugger.record_step(x, y, intensity, "Линия") # Pass intensity
-        elif canvas:
-            grayscale = int(255 * (1 - intensity))
-            color = f"#{grayscale:02x}{grayscale:02x}{grayscale:02x}"
-            canvas.create_rectangle(x, y, x + 1, y + 1, outline=color, fill=color, tags=tag)
-
+    def execute_many(self, segments):
+        """Векторная версия execute для массива отрезков (N, 4), с интенсивностями."""
+        segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+        n = len(segments)
+        x1, y1, x2, y2 = segments.T
+        dx = x2 - x1
+        dy = y2 - y1
+        # (segment, order, x, y, intensity) pieces, sorted at the end into execute's order
+        parts = []
+
+        # --- Point / vertical / horizontal lines ---
+        point = (dx == 0) & (dy == 0)
+        vertical = (dx == 0) & ~point
+        horizontal = (dy == 0) & (dx != 0)
+        ids = np.nonzero(point)[0]
+        parts.append((ids, np.zeros(len(ids), dtype=np.int64),
+                      x1[ids].astype(np.int64), y1[ids].astype(np.int64), np.ones(len(ids))))
+        for mask, fixed, a1, a2, is_vertical in ((vertical, x1, y1, y2, True), (horizontal, y1, x1, x2, False)):
+            ids = np.nonzero(mask)[0]
+            lo = np.minimum(a1[ids].astype(np.int64), a2[ids].astype(np.int64))
+            hi = np.maximum(a1[ids].astype(np.int64), a2[ids].astype(np.int64))
+            rel, k = _segment_steps(hi - lo + 1)
+            seg = ids[rel]
+            run = lo[rel] + k
+            const = fixed[seg].astype(np.int64)
+            xs, ys = (const, run) if is_vertical else (run, const)
+            parts.append((seg, k, xs, ys, np.ones(len(seg))))
+
+        # --- General case ---
+        ids = np.nonzero((dx != 0) & (dy != 0))[0]
+        gx1, gy1, gx2, gy2 = x1[ids], y1[ids], x2[ids], y2[ids]
+        steep = np.abs(dy[ids]) > np.abs(dx[ids])
+        gx1, gy1 = np.where(steep, gy1, gx1), np.where(steep, gx1, gy1)
+        gx2, gy2 = np.where(steep, gy2, gx2), np.where(steep, gx2, gy2)
+        swap = gx1 > gx2
+        gx1, gx2 = np.where(swap, gx2, gx1), np.where(swap, gx1, gx2)
+        gy1, gy2 = np.where(swap, gy2, gy1), np.where(swap, gy1, gy2)
+        gradient = (gy2 - gy1) / (gx2 - gx1)
+
+        def plot_pair(xpxl, ypxl, frac, weight, order):
+            # Two pixels across the line: (ypxl, ypxl + 1) in the non-steep frame
+            for offset, intensity in ((0, (1 - frac) * weight), (1, frac * weight)):
+                xs = np.where(steep, ypxl + offset, xpxl)
+                ys = np.where(steep, xpxl, ypxl + offset)
+                parts.append((ids, np.full(len(ids), order + offset, dtype=np.int64), xs, ys, intensity))
+
+        # First endpoint (np.round rounds half to even, like round())
+        xend = np.round(gx1)
+        yend = gy1 + gradient * (xend - gx1)
+        xpxl1 = xend.astype(np.int64)
+        plot_pair(xpxl1, yend.astype(np.int64), yend % 1, 1 - ((gx1 + 0.5) % 1), 0)
+        intery = yend + gradient
+        # Second endpoint
+        xend = np.round(gx2)
+        yend = gy2 + gradient * (xend - gx2)
+        xpxl2 = xend.astype(np.int64)
+        plot_pair(xpxl2, yend.astype(np.int64), yend % 1, (gx2 + 0.5) % 1, 2)
+
+        # Main loop
+        counts = np.maximum(xpxl2 - xpxl1 - 1, 0)
+        inter = _sequential_sums(intery, gradient, counts)
+        rel, k = _segment_steps(counts)
+        seg = ids[rel]
+        xpxl = xpxl1[rel] + 1 + k
+        ypxl = inter.astype(np.int64)
+        frac = inter % 1
+        st = steep[rel]
+        for offset, intensity in ((0, 1 - frac), (1, frac)):
+            xs = np.where(st, ypxl + offset, xpxl)
+            ys = np.where(st, xpxl, ypxl + offset)
+            parts.append((seg, 4 + 2 * k + offset, xs, ys, intensity))
+
+        seg, order, xs, ys, intensity = (np.concatenate(column) for column in zip(*parts))
+        sort = np.lexsort((order, seg))
+        pixels = np.stack([xs[sort], ys[sort]], axis=1).astype(np.int64)
+        return pixels, np.clip(intensity[sort], 0, 1), seg[sort].astype(np.int64)
 
 
 class LineContext(BaseLineContext):
     def __init__(self):
         self.__strategy: LineStrategyInterface = None
+        self.cache = RasterCache() # Pixels of already rasterized lines (see execute_cached)
+        self.width = 1 # Line width in pixels; wider lines are filled as polygons
+        self.cap = "butt" # End caps of thick lines: "butt" or "round"
 
     def set_strategy(self, strategy: LineStrategyInterface):
         self.__strategy = strategy
@@ -217,8 +696,80 @@ class LineContext(BaseLineContext):
     def get_strategy(self):
         return self.__strategy
 
-    def execute_strategy(self, a, b, canvas, debugger=None):
+    def execute_strategy(self, a, b, canvas, debugger=None, viewport=None, width=None, cap=None):
+        if self.__strategy:
+            width = self.width if width is None else width
+            if width > 1 and not debugger:
+                return self.execute_thick(a, b, canvas, width, cap, viewport)
+            # Pass debugger if available, strategy should handle it.
+            # viewport (xmin, ymin, xmax, ymax) clips the line before rasterization
+            return self.__strategy.execute(a, b, canvas, debugger=debugger, viewport=viewport)
+        return None
+
+    def execute_thick(self, a, b, canvas, width=None, cap=None, viewport=None):
+        """
+        Толстый отрезок: контур из thick_line_polygon закрашивается разверткой ET + AEL
+        и выводится горизонтальными спанами (по одному элементу на строку).
+
+        Returns:
+            str: тег фигуры.
+        """
+        width = self.width if width is None else width
+        cap = self.cap if cap is None else cap
+        shape_tag = f"{LineStrategyInterface.TAG_PREFIX}_{time.time_ns()}"
+        polygon = thick_line_polygon(a, b, width, cap)
+        if viewport is not None:
+            xmin, ymin, xmax, ymax = viewport
+            m = LineStrategyInterface.VIEWPORT_MARGIN
+            spans = ((y, max(x_start, xmin - m), min(x_end, xmax + m))
+                     for y, x_start, x_end in scanline_spans(polygon, (ymin - m, ymax + m), half_open_x=True)
+                     if x_start <= xmax + m and x_end >= xmin - m)
+        else:
+            spans = scanline_spans(polygon, half_open_x=True)
+        render_spans(spans, canvas, shape_tag)
+        return shape_tag
+
+    def execute_cached(self, a, b, canvas, viewport=None, strategy=None, width=None, cap=None):
+        """
+        Рисует отрезок через кэш растеризации: отрезок, сдвинутый на целое число
+        пикселей относительно уже нарисованного, не растеризуется заново. Отрезок,
+        выходящий за viewport, при промахе рисуется с отсечением мимо кэша.
+
+        Args:
+            strategy: стратегия отрезка (по умолчанию текущая стратегия контекста).
+            width, cap: толщина и концы (по умолчанию из контекста); толстые
+                отрезки заливаются спанами без кэша.
+
+        Returns:
+            str | None: тег фигуры.
+        """
+        strategy = strategy or self.__strategy
+        if not strategy:
+            return None
+        width = self.width if width is None else width
+        if width > 1:
+            return self.execute_thick(a, b, canvas, width, cap, viewport)
+        bbox = (min(a[0], b[0]), min(a[1], b[1]), max(a[0], b[0]), max(a[1], b[1]))
+        cached = self.cache.lookup(strategy, (a, b), lambda points: strategy.iter_pixels(*points),
+                                   viewport, strategy.VIEWPORT_MARGIN, bbox)
+        if cached is None: # Not cacheable or off-screen: rasterize only the visible part
+            return strategy.execute(a, b, canvas, viewport=viewport)
+        shape_tag = f"{strategy.TAG_PREFIX}_{time.time_ns()}"
+        render_array(*cached, canvas, shape_tag,
+                     getattr(strategy, "use_spans", False), getattr(strategy, "blend", False))
+        return shape_tag
+
+    def execute_many(self, segments):
+        """
+        Пакетная растеризация N отрезков текущей стратегией без холста.
+
+        Args:
+            segments: массив (N, 4) концов отрезков [x1, y1, x2, y2].
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray] | None: пиксели (M, 2),
+            интенсивности (M,) и номер отрезка для каждого пикселя (M,).
+        """
         if self.__strategy:
-            # Pass debugger if available, strategy should handle it
-            return self.__strategy.execute(a, b, canvas, debugger=debugger)
+            return self.__strategy.execute_many(segments)
         return None
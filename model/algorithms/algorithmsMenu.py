@@ -1,9 +1,10 @@
 from typing import List
 import tkinter as tk
-from .algorithmsLine import LineStrategyInterface, LineContext, WuStrategy,DDAStrategy,BresenhamStrategy
-from .algorithmsSecondOrderLine import SecondOrderLineContext, BresenhamCircleStrategy,BresenhamEllipseStrategy, BresenhamParabolaStrategy,BresenhamHyperbolaStrategy
+from .algorithmsLine import LineStrategyInterface, LineContext, WuStrategy,DDAStrategy,BresenhamStrategy,DoubleStepBresenhamStrategy
+from .algorithmsSecondOrderLine import SecondOrderLineContext, BresenhamCircleStrategy,BresenhamEllipseStrategy, BresenhamParabolaStrategy,BresenhamHyperbolaStrategy, FilledCircleStrategy, FilledEllipseStrategy, \
+    WuCircleStrategy, WuEllipseStrategy
 from .baseLineContext import BaseLineContext
-from model.algorithms.algorithmsCurves import HermiteCurve, BezierCurve, BSplineCurve, CurveContext, CurveStrategy
+from model.algorithms.algorithmsCurves import HermiteCurve, BezierCurve, BSplineCurve, CompositeBSpline, CatmullRomSpline, BezierChain, BezierNCurve, NurbsCurve, CurveContext, CurveStrategy
 
 
 class BasicMenuClass:
@@ -47,7 +48,7 @@ class BasicMenuClass:
 
 class LineMenuClass(BasicMenuClass):
     def __init__(self, root,line_btn, context: LineContext,on_select):
-        super().__init__(root, line_btn, [DDAStrategy(),WuStrategy(),BresenhamStrategy()], context,on_select)
+        super().__init__(root, line_btn, [DDAStrategy(),WuStrategy(),BresenhamStrategy(),DoubleStepBresenhamStrategy()], context,on_select)
 
 
 class SecondOrderLineMenuClass(BasicMenuClass):
@@ -55,6 +56,10 @@ class SecondOrderLineMenuClass(BasicMenuClass):
         strategies = [
             BresenhamCircleStrategy(),
             BresenhamEllipseStrategy(),
+            FilledCircleStrategy(),
+            FilledEllipseStrategy(),
+            WuCircleStrategy(),
+            WuEllipseStrategy(),
             BresenhamHyperbolaStrategy(),
             BresenhamParabolaStrategy()
         ]
@@ -65,10 +70,20 @@ class CurveMenuClass(BasicMenuClass):
         strategies = [
             HermiteCurve(),
             BezierCurve(),
-            BSplineCurve()
+            BSplineCurve(),
+            CompositeBSpline(),
+            CatmullRomSpline(),
+            BezierChain(),
+            BezierNCurve(),
+            NurbsCurve()
         ]
         strategies[0].name = "Кривая Эрмита"
         strategies[1].name = "Кривая Безье"
         strategies[2].name = "B-сплайн"
+        strategies[3].name = "Составной B-сплайн"
+        strategies[4].name = "Сплайн Катмулла-Рома"
+        strategies[5].name = "Цепочка Безье"
+        strategies[6].name = "Кривая Безье (любой степени)"
+        strategies[7].name = "NURBS"
 
         super().__init__(root, button, strategies, context, on_select)
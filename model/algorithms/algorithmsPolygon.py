@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 import math
 import time
 from functools import cmp_to_key
+import itertools
+import numpy as np
 import tkinter as tk # Нужен импорт tk для меню
 
 class PolygonStrategyInterface(ABC):
@@ -244,14 +246,414 @@ class GrahamStrategy(PolygonStrategyInterface):
         return shape_tag, hull_stack
 
 
+# --- Вспомогательные функции для монотонной цепи ---
+
+def _as_array(points):
+    """Точки (список пар или массив) -> массив (n, 2) float без промежуточного списка списков."""
+    if isinstance(points, np.ndarray):
+        return points.reshape(-1, 2).astype(float, copy=False)
+    return np.fromiter(itertools.chain.from_iterable(points), dtype=float, count=2 * len(points)).reshape(-1, 2)
+
+def _akl_toussaint(xy):
+    """
+    Отсечение Акла - Туссена: точки строго внутри многоугольника из крайних точек
+    по x, y, x + y и x - y не могут быть вершинами оболочки.
+
+    Args:
+        xy (np.ndarray): массив (n, 2).
+
+    Returns:
+        np.ndarray: индексы оставшихся точек (по возрастанию).
+    """
+    x, y = xy[:, 0], xy[:, 1]
+    extremes = [f(key) for key in (x, y, x + y, x - y) for f in (np.argmin, np.argmax)]
+    corners = np.unique(xy[extremes], axis=0)
+    if len(corners) < 3:
+        return np.arange(len(xy))
+    # Extreme points are in convex position: the angle around their centroid orders them
+    center = corners.mean(axis=0)
+    corners = corners[np.argsort(np.arctan2(corners[:, 1] - center[1], corners[:, 0] - center[0]))]
+    inside = np.ones(len(xy), dtype=bool)
+    for (ax, ay), (bx, by) in zip(corners.tolist(), np.roll(corners, -1, axis=0).tolist()):
+        inside &= (bx - ax) * (y - ay) - (by - ay) * (x - ax) > 0
+    return np.flatnonzero(~inside)
+
+def _half_hull(xs, ys):
+    """
+    Один проход стека монотонной цепи по точкам, отсортированным по x (затем y).
+    Оставляет только левые повороты (ось y вверх), коллинеарные точки выбрасываются.
+
+    Returns:
+        list[int]: позиции вершин цепи в xs/ys.
+    """
+    chain = []
+    for i in range(len(xs)):
+        x, y = xs[i], ys[i]
+        while len(chain) >= 2:
+            o, j = chain[-2], chain[-1]
+            ox, oy = xs[o], ys[o]
+            if (xs[j] - ox) * (y - oy) - (ys[j] - oy) * (x - ox) > 0:
+                break
+            chain.pop()
+        chain.append(i)
+    return chain
+
+def monotone_chain(points):
+    """
+    Выпуклая оболочка алгоритмом Эндрю (монотонная цепь).
+
+    Внутренние точки отсекаются по Аклу - Туссену, оставшиеся сортируются один раз
+    (np.lexsort по x, затем y), и нижняя и верхняя цепи строятся двумя проходами
+    стека - каждый только по точкам со своей стороны прямой между крайними
+    левой и правой точками.
+
+    Args:
+        points: список или массив (n, 2) точек.
+
+    Returns:
+        list[int]: индексы вершин оболочки в points без коллинеарных точек, начиная
+        с самой левой (против часовой стрелки при оси y вверх); пустой список,
+        если оболочка вырождена.
+    """
+    if len(points) < 3:
+        return []
+    xy = _as_array(points)
+    candidates = _akl_toussaint(xy)
+    candidates = candidates[np.lexsort((xy[candidates, 1], xy[candidates, 0]))]
+    sorted_xy = xy[candidates]
+    # Duplicates are neighbours after the sort
+    keep = np.ones(len(candidates), dtype=bool)
+    keep[1:] = np.any(sorted_xy[1:] != sorted_xy[:-1], axis=1)
+    candidates, sorted_xy = candidates[keep], sorted_xy[keep]
+    if len(candidates) < 3:
+        return []
+    (lx, ly), (rx, ry) = sorted_xy[0], sorted_xy[-1]
+    side = (rx - lx) * (sorted_xy[:, 1] - ly) - (ry - ly) * (sorted_xy[:, 0] - lx)
+    hull = []
+    # Lower chain left to right, upper chain right to left; both include the end points (side == 0)
+    for mask, step in ((side <= 0, 1), (side >= 0, -1)):
+        ids = candidates[mask][::step]
+        chain = _half_hull(xy[ids, 0].tolist(), xy[ids, 1].tolist())
+        hull.extend(ids[chain[:-1]].tolist())
+    return hull if len(hull) >= 3 else []
+
+class MonotoneChainStrategy(PolygonStrategyInterface):
+    """Реализация алгоритма Эндрю (монотонная цепь) с сортировкой NumPy."""
+    def __init__(self):
+        self.name = "Монотонная цепь"
+
+    def execute(self, points, canvas):
+        shape_tag = f"hull_monotone_{time.time_ns()}"
+        if len(points) < 3:
+            print("Недостаточно точек для построения оболочки (< 3)")
+            return shape_tag, []
+
+        hull = [points[i] for i in monotone_chain(points)]
+        if not hull:
+            print("Все точки коллинеарны, оболочка вырождена")
+            return shape_tag, []
+
+        # Отрисовка оболочки на холсте
+        if canvas:
+            flat_hull = [coord for point in hull for coord in point]
+            canvas.create_polygon(flat_hull, outline='green', fill='', width=2, tags=(shape_tag, "hull"))
+
+        return shape_tag, hull
+
+
+HULL_SAMPLE_SIZE = 1024 # Points in the smaller sample used by estimate_hull_size
+AUTO_SMALL_INPUT = 4096 # Below this size the automatic choice is always the monotone chain
+AUTO_OUTPUT_RATIO = 64 # h * ratio >= n: output-heavy input, sort-based monotone chain wins
+
+def estimate_hull_size(points, sample=HULL_SAMPLE_SIZE, seed=0):
+    """
+    Оценка числа вершин оболочки h по двум случайным выборкам (k и 4k точек):
+    h(n) ~ h(k) * (n / k)^beta, показатель beta - по росту h между выборками
+    (около 0 для гауссова облака и квадрата, 1/3 для круга, 1 для точек на окружности).
+    """
+    xy = _as_array(points)
+    n = len(xy)
+    if n <= 4 * sample:
+        return max(len(monotone_chain(xy)), 1)
+    rng = np.random.default_rng(seed)
+    picked = xy[rng.choice(n, 4 * sample, replace=False)]
+    small = max(len(monotone_chain(picked[:sample])), 1)
+    large = max(len(monotone_chain(picked)), 1)
+    beta = min(1.0, max(0.0, math.log(large / small) / math.log(4)))
+    return min(n, math.ceil(large * (n / (4 * sample)) ** beta))
+
+# --- Quickhull ---
+
+def quickhull(points):
+    """
+    Выпуклая оболочка алгоритмом Quickhull.
+
+    На каждом шаге для отрезка (a, b) и точек справа от него одной векторной
+    операцией находится самая дальняя точка f, а оставшиеся точки делятся на
+    лежащие справа от (a, f) и от (f, b); точки внутри треугольника (a, f, b)
+    отбрасываются сразу все.
+
+    Args:
+        points: список или массив (n, 2) точек.
+
+    Returns:
+        list[int]: индексы вершин оболочки в том же порядке, что и monotone_chain.
+    """
+    if len(points) < 3:
+        return []
+    xy = _as_array(points)
+    x, y = xy[:, 0], xy[:, 1]
+    # Leftmost-lowest and rightmost-highest points are hull vertices
+    column = np.flatnonzero(x == x.min())
+    left = int(column[np.argmin(y[column])])
+    column = np.flatnonzero(x == x.max())
+    right = int(column[np.argmax(y[column])])
+    if x[left] == x[right] and y[left] == y[right]:
+        return []
+    everything = np.arange(len(xy))
+    side = (x[right] - x[left]) * (y - y[left]) - (y[right] - y[left]) * (x - x[left])
+    hull = [left]
+    # Work items: ("segment", a, b, indices right of a->b) or ("point", index); lower chain first
+    stack = [("segment", right, left, everything[side > 0]), ("point", right),
+             ("segment", left, right, everything[side < 0])]
+    while stack:
+        task = stack.pop()
+        if task[0] == "point":
+            hull.append(task[1])
+            continue
+        _, a, b, ids = task
+        if len(ids) == 0:
+            continue
+        px, py = x[ids], y[ids]
+        ax, ay, bx, by = x[a], y[a], x[b], y[b]
+        distance = (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+        ties = np.flatnonzero(distance == distance.min())
+        # Farthest points on one line: only the ends of that run are vertices, take the one nearest to a
+        along = (px[ties] - ax) * (bx - ax) + (py[ties] - ay) * (by - ay)
+        far = int(ids[ties[np.argmin(along)]])
+        fx, fy = x[far], y[far]
+        right_of_af = (fx - ax) * (py - ay) - (fy - ay) * (px - ax) < 0
+        right_of_fb = (bx - fx) * (py - fy) - (by - fy) * (px - fx) < 0
+        stack.append(("segment", far, b, ids[right_of_fb]))
+        stack.append(("point", far))
+        stack.append(("segment", a, far, ids[right_of_af]))
+    return hull if len(hull) >= 3 else []
+
+class QuickhullStrategy(PolygonStrategyInterface):
+    """Реализация алгоритма Quickhull с векторным поиском дальней точки и разбиением."""
+    def __init__(self):
+        self.name = "Quickhull"
+
+    def execute(self, points, canvas):
+        shape_tag = f"hull_quickhull_{time.time_ns()}"
+        if len(points) < 3:
+            print("Недостаточно точек для построения оболочки (< 3)")
+            return shape_tag, []
+
+        hull = [points[i] for i in quickhull(points)]
+        if not hull:
+            print("Все точки коллинеарны, оболочка вырождена")
+            return shape_tag, []
+
+        # Отрисовка оболочки на холсте
+        if canvas:
+            flat_hull = [coord for point in hull for coord in point]
+            canvas.create_polygon(flat_hull, outline='darkorange', fill='', width=2, tags=(shape_tag, "hull"))
+
+        return shape_tag, hull
+
+
+# --- Алгоритм Чана ---
+
+def _turn(p, q, r):
+    """Знак поворота p -> q -> r: 1 - влево (против часовой при оси y вверх), -1 - вправо, 0 - коллинеарны."""
+    val = (q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0])
+    return 1 if val > 0 else (-1 if val < 0 else 0)
+
+def _first_true(lo, hi, predicate):
+    """Первый индекс в [lo, hi), для которого монотонный (F..F T..T) предикат истинен, или hi."""
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if predicate(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+def _tangent(hull, p):
+    """
+    Касательная из внешней точки p к выпуклому многоугольнику hull (против часовой
+    стрелки) за O(log m): индекс вершины q, для которой весь hull лежит слева от p -> q
+    (из коллинеарных с p - самой дальней).
+
+    Угол вершин, видимых из p, вдоль hull сначала растет, потом убывает; искомая
+    вершина - минимум. Положение вершины относительно луча p -> hull[0] делит обход
+    на две монотонные части, и в нужной части минимум находится вторым бинарным поиском.
+    """
+    n = len(hull)
+    v0 = hull[0]
+    def rising(i): # Angle grows from vertex i to vertex i + 1
+        return _turn(p, hull[i], hull[(i + 1) % n]) >= 0
+    if rising(0):
+        if not rising(n - 1):
+            best = 0 # Previous vertex is not below v0: v0 is the minimum
+        else:
+            # Vertices below the ray p -> v0 form a suffix; the minimum is the first rising one
+            below = _first_true(1, n, lambda i: _turn(p, v0, hull[i]) < 0)
+            best = _first_true(below, n, rising) % n
+    else:
+        # Vertices above the ray p -> v0 form a suffix; the minimum is before it
+        above = _first_true(1, n, lambda i: _turn(p, v0, hull[i]) > 0)
+        best = _first_true(1, above, rising) % n
+    following = hull[(best + 1) % n]
+    if _turn(p, hull[best], following) == 0 and _dist_sq(p, following) > _dist_sq(p, hull[best]):
+        best = (best + 1) % n
+    return best
+
+def _group_hulls(xy, ids, size):
+    """Мини-оболочки групп по size точек (монотонная цепь, одна сортировка на все группы)."""
+    groups = np.arange(len(ids)) // size
+    order = np.lexsort((xy[ids, 1], xy[ids, 0], groups))
+    ids, groups = ids[order], groups[order]
+    bounds = np.flatnonzero(np.diff(groups)) + 1
+    hulls = []
+    for part in np.split(ids, bounds):
+        if len(part) <= 2:
+            hulls.append([tuple(point) for point in xy[part].tolist()])
+            continue
+        xs, ys = xy[part, 0].tolist(), xy[part, 1].tolist()
+        lower = _half_hull(xs, ys)
+        upper = _half_hull(xs[::-1], ys[::-1])
+        chain = lower[:-1] + [len(xs) - 1 - i for i in upper[:-1]]
+        hulls.append([(xs[i], ys[i]) for i in chain])
+    return hulls
+
+def chan(points):
+    """
+    Выпуклая оболочка алгоритмом Чана за O(n log h).
+
+    Для m = 2^(2^t) точки делятся на группы по m, для каждой строится мини-оболочка,
+    затем заворачивание Джарвиса идет по мини-оболочкам: следующая вершина - лучшая
+    из касательных, найденных бинарным поиском. Если за m шагов оболочка не замкнулась,
+    t увеличивается. Перед этим внутренние точки отсекаются по Аклу - Туссену,
+    а начальное t берется по оценке h (estimate_hull_size).
+
+    Args:
+        points: список или массив (n, 2) точек.
+
+    Returns:
+        list[int]: индексы вершин оболочки в том же порядке, что и monotone_chain.
+    """
+    if len(points) < 3:
+        return []
+    xy = _as_array(points)
+    ids = _akl_toussaint(xy)
+    ids = ids[np.lexsort((xy[ids, 1], xy[ids, 0]))]
+    keep = np.ones(len(ids), dtype=bool)
+    keep[1:] = np.any(xy[ids[1:]] != xy[ids[:-1]], axis=1)
+    ids = ids[keep]
+    if len(ids) < 3:
+        return []
+    index = {tuple(point): int(i) for point, i in zip(xy[ids].tolist(), ids.tolist())}
+    start = tuple(xy[ids[0]].tolist()) # Leftmost-lowest point is a hull vertex
+    # Small m only costs extra rounds: start from the first m that fits the estimated h
+    t = 1
+    estimate = estimate_hull_size(xy[ids])
+    while 2 ** (2 ** t) < estimate and 2 ** (2 ** t) < len(ids):
+        t += 1
+    while True:
+        m = min(2 ** (2 ** t), len(ids))
+        hulls = _group_hulls(xy, ids, m)
+        hull = [start]
+        for _ in range(m):
+            p = hull[-1]
+            best = None
+            for group in hulls:
+                if len(group) == 1:
+                    q = group[0]
+                else:
+                    q = group[_tangent(group, p)]
+                    if q == p: # p is a vertex of this mini-hull: take its successor
+                        q = group[(group.index(p) + 1) % len(group)]
+                if q == p:
+                    continue
+                if best is None:
+                    best = q
+                    continue
+                turn = _turn(p, best, q)
+                if turn == -1 or (turn == 0 and _dist_sq(p, q) > _dist_sq(p, best)):
+                    best = q
+            if best is None or best == start:
+                return [index[point] for point in hull] if len(hull) >= 3 else []
+            hull.append(best)
+        t += 1
+
+class ChanStrategy(PolygonStrategyInterface):
+    """Реализация алгоритма Чана (O(n log h))."""
+    def __init__(self):
+        self.name = "Чан"
+
+    def execute(self, points, canvas):
+        shape_tag = f"hull_chan_{time.time_ns()}"
+        if len(points) < 3:
+            print("Недостаточно точек для построения оболочки (< 3)")
+            return shape_tag, []
+
+        hull = [points[i] for i in chan(points)]
+        if not hull:
+            print("Все точки коллинеарны, оболочка вырождена")
+            return shape_tag, []
+
+        # Отрисовка оболочки на холсте
+        if canvas:
+            flat_hull = [coord for point in hull for coord in point]
+            canvas.create_polygon(flat_hull, outline='brown', fill='', width=2, tags=(shape_tag, "hull"))
+
+        return shape_tag, hull
+
+
+# --- Автоматический выбор ---
+
+class AutoHullStrategy(PolygonStrategyInterface):
+    """
+    Выбирает алгоритм по числу точек n и оценке числа вершин оболочки h
+    (estimate_hull_size). Пошаговая анимация Грэхема никогда не выбирается.
+    Стратегия, выбранная последним execute, хранится в last_choice.
+    """
+    def __init__(self, monotone_chain_strategy, quickhull_strategy):
+        self.name = "Авто"
+        self.monotone_chain = monotone_chain_strategy
+        self.quickhull = quickhull_strategy
+        self.last_choice = None # Strategy that built the last hull (its color is used on redraws)
+
+    def choose(self, points):
+        """Стратегия для данного набора точек."""
+        n = len(points)
+        if n < AUTO_SMALL_INPUT:
+            return self.monotone_chain
+        # Most points on the hull: per-vertex steps of Quickhull / Chan cost more than one sort
+        if estimate_hull_size(points) * AUTO_OUTPUT_RATIO >= n:
+            return self.monotone_chain
+        return self.quickhull
+
+    def execute(self, points, canvas):
+        strategy = self.last_choice = self.choose(points)
+        print(f"Авто: выбран алгоритм '{strategy.name}' для {len(points)} точек.")
+        return strategy.execute(points, canvas)
+
+
 class PolygonContext:
     """Контекст для выбора и выполнения стратегии построения полигона."""
     def __init__(self):
         self.__strategy: PolygonStrategyInterface = None
         self.strategies = {
             "Джарвис": JarvisStrategy(),
-            "Грэхем": GrahamStrategy()
+            "Грэхем": GrahamStrategy(),
+            "Монотонная цепь": MonotoneChainStrategy(),
+            "Quickhull": QuickhullStrategy(),
+            "Чан": ChanStrategy()
         }
+        self.strategies["Авто"] = AutoHullStrategy(self.strategies["Монотонная цепь"], self.strategies["Quickhull"])
         # Устанавливаем стратегию по умолчанию
         self.set_strategy("Джарвис")
 
@@ -1,16 +1,33 @@
 from abc import ABC, abstractmethod
 from .baseLineContext import BaseLineContext
+from .pixelStream import render_pixels, render_array, render_spans, record_pixels
+from .rasterCache import RasterCache
+from .conicTracer import (conic_frame, iter_ellipse, iter_ellipse_spans, iter_hyperbola, iter_parabola,
+                          ANGLE_QUANTUM)
+from functools import lru_cache
+import math
 import numpy as np
 import time # Add time for unique tags
 
 
 class SecondOrderLineStrategyInterface(ABC):
+    TAG_PREFIX = "shape"
+    # Shifting all points by an integer offset shifts the pixels by the same offset
+    # (the conics truncate their points with int() first, like the RasterCache key)
+    translation_invariant = True
+    required_points = 3 # Clicks needed in the editor: center, point2, point3
+    filled = False # Filled shapes are drawn as spans, not through the pixel cache
+    rotatable = False # Defines iter_rotated_pixels(center, point2, point3, angle, viewport) for rotated curves
+                      # (filled strategies also iter_rotated_spans)
+    bounded = True # The curve lies within max |point - center| of the center (unbounded ones are clipped)
+    VIEWPORT_MARGIN = 2 # Unbounded curves are traced this many pixels past the viewport
+
     @abstractmethod
     def __init__(self):
         self.name = None
 
     @abstractmethod
-    def execute(self, center, point2, point3=None, canvas=None, debugger=None):
+    def execute(self, center, point2, point3=None, canvas=None, debugger=None, viewport=None):
         pass
 
     @abstractmethod
@@ -18,219 +35,649 @@ class SecondOrderLineStrategyInterface(ABC):
         """Отображение точки на холсте."""
         pass
 
+    @abstractmethod
+    def iter_pixels(self, center, point2, point3=None):
+        """Поток пикселей кривой: генератор кортежей (x, y, intensity)."""
+        pass
+
+    def _render(self, pixels, canvas, debugger, tag, blend=False):
+        """Отдает поток пикселей отладчику или выводит его на холст/в буфер кадра."""
+        if debugger:
+            record_pixels(pixels, debugger, "Второй порядок")
+        elif canvas:
+            render_pixels(pixels, canvas, tag, blend=blend)
+
+    def execute_many(self, centers, radii):
+        """
+        Растеризует N фигур за один вызов без холста.
+
+        Общий вариант: поток пикселей каждой фигуры с точками из _batch_points
+        (по умолчанию point2 = (cx + rx, cy) и point3 = (cx, cy + ry)).
+
+        Args:
+            centers: массив (N, 2) центров.
+            radii: массив (N,) радиусов или (N, 2) полуосей (rx, ry).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: пиксели (M, 2),
+            интенсивности (M,) и номер фигуры для каждого пикселя (M,).
+        """
+        centers, radii = _batch_arguments(centers, radii)
+        pixels, intensities, index = [], [], []
+        for i, ((cx, cy), (rx, ry)) in enumerate(zip(centers.tolist(), radii.tolist())):
+            point2, point3 = self._batch_points(cx, cy, rx, ry)
+            for x, y, intensity in self.iter_pixels([cx, cy], point2, point3):
+                pixels.append((x, y))
+                intensities.append(intensity)
+                index.append(i)
+        return (np.array(pixels, dtype=np.int64).reshape(-1, 2),
+                np.array(intensities, dtype=float),
+                np.array(index, dtype=np.int64))
+
+    def _batch_points(self, cx, cy, rx, ry):
+        """Точки point2 и point3 фигуры execute_many с центром (cx, cy) и полуосями (rx, ry)."""
+        return [cx + rx, cy], [cx, cy + ry]
+
+
+CIRCLE_OFFSETS_CACHE_SIZE = 512 # Distinct radii kept by circle_offsets
+ELLIPSE_OFFSETS_CACHE_SIZE = 512 # Distinct (rx, ry) pairs kept by ellipse_offsets
+
+def _batch_arguments(centers, radii):
+    """Приводит аргументы execute_many к целым массивам: центры (N, 2) и полуоси (N, 2)."""
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2).astype(np.int64) # Same truncation as map(int, ...)
+    radii = np.asarray(radii, dtype=float)
+    if radii.ndim == 1:
+        radii = np.stack([radii, radii], axis=1)
+    return centers, np.abs(radii.reshape(-1, 2)).astype(np.int64)
+
+def _unique_in_order(offsets):
+    """Убирает повторы строк (K, 2), сохраняя порядок первых вхождений; результат только для чтения."""
+    _, first = np.unique(offsets, axis=0, return_index=True)
+    offsets = offsets[np.sort(first)]
+    offsets.flags.writeable = False
+    return offsets
+
+def _place_offsets(centers, keys, offsets_for):
+    """
+    Пиксели N фигур: offsets_for(key) + center, сгруппированные по одинаковым ключам
+    (радиусам) - по одной операции NumPy на группу, а не цикл на фигуру.
+    offsets_for возвращает смещения (K, 2) или пару (смещения, интенсивности (K,)).
+    """
+    pixels, intensities, index = [], [], []
+    unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    for group, key in enumerate(unique_keys.tolist()):
+        ids = np.nonzero(inverse == group)[0]
+        table = offsets_for(*key) if isinstance(key, list) else offsets_for(key)
+        offsets, weights = table if isinstance(table, tuple) else (table, np.ones(len(table)))
+        if not len(offsets):
+            continue
+        pixels.append((centers[ids, None, :] + offsets[None, :, :]).reshape(-1, 2))
+        intensities.append(np.tile(weights, len(ids)))
+        index.append(np.repeat(ids, len(offsets)))
+    if not pixels:
+        return np.zeros((0, 2), dtype=np.int64), np.zeros(0), np.zeros(0, dtype=np.int64)
+    pixels, intensities, index = np.concatenate(pixels), np.concatenate(intensities), np.concatenate(index)
+    order = np.argsort(index, kind="stable") # Shape by shape, as the scalar strategy would draw them
+    return pixels[order], intensities[order], index[order]
+
+def _midpoint_circle_octant(radius):
+    """Точки (x, y) одного октанта окружности (0 <= x <= y) по алгоритму Брезенхема."""
+    x, y = 0, radius
+    d = 3 - 2 * radius
+
+    while x <= y:
+        yield x, y
+        if d < 0:
+            d += 4 * x + 6
+        else:
+            d += 4 * (x - y) + 10
+            y -= 1
+        x += 1
+
+@lru_cache(maxsize=CIRCLE_OFFSETS_CACHE_SIZE)
+def circle_offsets(radius):
+    """
+    Смещения пикселей окружности радиуса radius от центра: массив (K, 2) только для чтения.
+
+    Восьмикратная симметрия раскрыта, совпадающие пиксели (на осях и диагоналях)
+    удалены, порядок - как у цикла алгоритма.
+    """
+    octant = np.array(list(_midpoint_circle_octant(radius)), dtype=np.int64).reshape(-1, 2)
+    x, y = octant[:, 0:1], octant[:, 1:2]
+    # Same eight points per step, in the same order as _symmetric_circle
+    offsets = np.stack([np.hstack(pair) for pair in ((x, y), (-x, y), (x, -y), (-x, -y),
+                                                     (y, x), (-y, x), (y, -x), (-y, -x))], axis=1).reshape(-1, 2)
+    return _unique_in_order(offsets)
+
+def _half_widths(quadrant, height):
+    """
+    Полуширина заливки для каждой строки |dy| = 0..height: наибольший |x| пикселя
+    контура в этой строке. Точки quadrant - (x, y) с x, y >= 0.
+    """
+    half = np.full(height + 1, -1, dtype=np.int64)
+    np.maximum.at(half, quadrant[:, 1], quadrant[:, 0])
+    half.flags.writeable = False
+    return half
+
+def _span_offsets(half):
+    """Пиксели заливки по полуширинам строк: (K, 2) от центра, строка за строкой сверху вниз."""
+    dy = np.arange(-(len(half) - 1), len(half))
+    widths = half[np.abs(dy)]
+    rows = np.repeat(dy, 2 * widths + 1)
+    starts = np.repeat(np.cumsum(2 * widths + 1) - (2 * widths + 1), 2 * widths + 1)
+    xs = np.arange(len(rows)) - starts - np.repeat(widths, 2 * widths + 1)
+    offsets = np.stack([xs, rows], axis=1)
+    offsets.flags.writeable = False
+    return offsets
+
+@lru_cache(maxsize=CIRCLE_OFFSETS_CACHE_SIZE)
+def circle_half_widths(radius):
+    """Полуширины строк круга радиуса radius (массив radius + 1) из решений алгоритма Брезенхема."""
+    octant = np.array(list(_midpoint_circle_octant(radius)), dtype=np.int64).reshape(-1, 2)
+    # Each octant point (x, y) also gives (y, x): row x reaches out to y
+    return _half_widths(np.concatenate([octant, octant[:, ::-1]]), radius)
+
+@lru_cache(maxsize=CIRCLE_OFFSETS_CACHE_SIZE)
+def disc_offsets(radius):
+    """Смещения пикселей круга (заливки) от центра: (K, 2) только для чтения."""
+    return _span_offsets(circle_half_widths(radius))
+
+def _symmetric_spans(cx, cy, half):
+    """Горизонтальные спаны (y, x_start, x_end) фигуры, симметричной относительно центра."""
+    height = len(half) - 1
+    for dy in range(-height, height + 1):
+        width = int(half[abs(dy)])
+        yield cy + dy, cx - width, cx + width
+
 
 class BresenhamCircleStrategy(SecondOrderLineStrategyInterface):
+    TAG_PREFIX = "circle"
+    required_points = 2
+
     def __init__(self):
         self.name = "Окружность"
 
-    def execute(self, center, point2, point3=None, canvas=None, debugger=None):
-        shape_tag = f"circle_{time.time_ns()}"
-        cx, cy = map(int, center)
-        px, py = map(int, point2)
-        radius = int(((px - cx) ** 2 + (py - cy) ** 2) ** 0.5)
-
-        x, y = 0, radius
-        d = 3 - 2 * radius
-
-        while x <= y:
-            self._plot_symmetric_circle(canvas, center, x, y, shape_tag, debugger)
-            if d < 0:
-                d += 4 * x + 6
-            else:
-                d += 4 * (x - y) + 10
-                y -= 1
-            x += 1
+    def execute(self, center, point2, point3=None, canvas=None, debugger=None, viewport=None):
+        shape_tag = f"{self.TAG_PREFIX}_{time.time_ns()}"
+        if debugger or not canvas:
+            # Step by step for the debugger
+            self._render(self.iter_pixels(center, point2, point3), canvas, debugger, shape_tag)
+            return shape_tag
+        # The pixel pattern depends only on the radius: cached offsets + center
+        cx, cy, radius = self._center_radius(center, point2)
+        render_array(circle_offsets(radius) + (cx, cy), None, canvas, shape_tag)
         return shape_tag
 
-    def _plot_symmetric_circle(self, canvas, center, x, y, tag, debugger=None):
+    def execute_many(self, centers, radii):
+        """Векторная версия execute: N окружностей с центрами (N, 2) и радиусами (N,)."""
+        centers, radii = _batch_arguments(centers, radii)
+        return _place_offsets(centers, radii[:, 0], circle_offsets)
+
+    def _center_radius(self, center, point2):
         cx, cy = map(int, center)
+        px, py = map(int, point2)
+        return cx, cy, int(((px - cx) ** 2 + (py - cy) ** 2) ** 0.5)
+
+    def iter_pixels(self, center, point2, point3=None):
+        cx, cy, radius = self._center_radius(center, point2)
+        for x, y in _midpoint_circle_octant(radius):
+            yield from self._symmetric_circle(cx, cy, x, y)
+
+    def _symmetric_circle(self, cx, cy, x, y):
         points_to_plot = [
             (cx + x, cy + y), (cx - x, cy + y),
             (cx + x, cy - y), (cx - x, cy - y),
             (cx + y, cy + x), (cx - y, cy + x),
             (cx + y, cy - x), (cx - y, cy - x)
         ]
-        self._plot_points(canvas, debugger, points_to_plot, tag)
-
-    def _plot_points(self, canvas, debugger, points, tag, color="black"):
-         if debugger:
-            for px, py in points:
-                debugger.record_step(px, py, 1.0, "Второй порядок")
-         elif canvas:
-            for px, py in points:
-                 canvas.create_rectangle(px, py, px + 1, py + 1, outline=color, fill=color, tags=tag)
+        for px, py in points_to_plot:
+            yield px, py, 1.0
 
     def plot(self, canvas, x, y, color="black"):
         """Реализация абстрактного метода plot."""
         canvas.create_rectangle(int(x), int(y), int(x) + 1, int(y) + 1, outline=color, fill=color)
 
 
+def _midpoint_ellipse_quadrant(rx, ry):
+    """Точки (x, y) одной четверти эллипса (x, y >= 0) по алгоритму средней точки."""
+    x, y = 0, ry
+    rx2, ry2 = rx * rx, ry * ry
+    d1 = ry2 - rx2 * ry + 0.25 * rx2
+
+    # Region 1
+    while ry2 * x < rx2 * y:
+        yield x, y
+        if d1 < 0:
+            d1 += ry2 * (2 * x + 3)
+        else:
+            d1 += ry2 * (2 * x + 3) + rx2 * (-2 * y + 2)
+            y -= 1
+        x += 1
+
+    # Region 2
+    d2 = ry2 * (x + 0.5)**2 + rx2 * (y - 1)**2 - rx2 * ry2
+    while y >= 0:
+        yield x, y
+        if d2 > 0:
+            d2 += rx2 * (-2 * y + 3)
+        else:
+            d2 += ry2 * (2 * x + 2) + rx2 * (-2 * y + 3)
+            x += 1
+        y -= 1
+
+@lru_cache(maxsize=ELLIPSE_OFFSETS_CACHE_SIZE)
+def ellipse_half_widths(rx, ry):
+    """Полуширины строк эллипса (массив ry + 1) из решений алгоритма средней точки."""
+    quadrant = np.array(list(_midpoint_ellipse_quadrant(rx, ry)), dtype=np.int64).reshape(-1, 2)
+    return _half_widths(quadrant, ry)
+
+@lru_cache(maxsize=ELLIPSE_OFFSETS_CACHE_SIZE)
+def filled_ellipse_offsets(rx, ry):
+    """Смещения пикселей заливки эллипса от центра: (K, 2) только для чтения."""
+    if rx == 0 or ry == 0:
+        return _unique_in_order(np.zeros((0, 2), dtype=np.int64))
+    return _span_offsets(ellipse_half_widths(rx, ry))
+
+@lru_cache(maxsize=ELLIPSE_OFFSETS_CACHE_SIZE)
+def ellipse_offsets(rx, ry):
+    """Смещения пикселей эллипса с полуосями (rx, ry) от центра: (K, 2) без повторов, только для чтения."""
+    if rx == 0 or ry == 0:
+        return _unique_in_order(np.zeros((0, 2), dtype=np.int64))
+    quadrant = np.array(list(_midpoint_ellipse_quadrant(rx, ry)), dtype=np.int64).reshape(-1, 2)
+    x, y = quadrant[:, 0:1], quadrant[:, 1:2]
+    # Same four points per step, in the same order as _symmetric_ellipse
+    offsets = np.stack([np.hstack(pair) for pair in ((x, y), (-x, y), (x, -y), (-x, -y))], axis=1).reshape(-1, 2)
+    return _unique_in_order(offsets)
+
+
 class BresenhamEllipseStrategy(SecondOrderLineStrategyInterface):
+    TAG_PREFIX = "ellipse"
+    rotatable = True
+
     def __init__(self):
         self.name = "Эллипс"
 
-    def execute(self, center, point2, point3=None, canvas=None, debugger=None):
-        shape_tag = f"ellipse_{time.time_ns()}"
+    def execute(self, center, point2, point3=None, canvas=None, debugger=None, viewport=None):
+        shape_tag = f"{self.TAG_PREFIX}_{time.time_ns()}"
+        self._render(self.iter_pixels(center, point2, point3), canvas, debugger, shape_tag)
+        return shape_tag
+
+    def iter_pixels(self, center, point2, point3=None):
         cx, cy = map(int, center)
         px, py = map(int, point2)
         qx, qy = map(int, point3)
 
         rx = abs(px - cx)
         ry = abs(qy - cy)
-        if rx == 0 or ry == 0: return shape_tag # Handle degenerate case
-
-        x, y = 0, ry
-        rx2, ry2 = rx * rx, ry * ry
-        d1 = ry2 - rx2 * ry + 0.25 * rx2
-
-        # Region 1
-        while ry2 * x < rx2 * y:
-            self._plot_symmetric_ellipse(canvas, cx, cy, x, y, shape_tag, debugger)
-            if d1 < 0:
-                d1 += ry2 * (2 * x + 3)
-            else:
-                d1 += ry2 * (2 * x + 3) + rx2 * (-2 * y + 2)
-                y -= 1
-            x += 1
-
-        # Region 2
-        d2 = ry2 * (x + 0.5)**2 + rx2 * (y - 1)**2 - rx2 * ry2
-        while y >= 0:
-            self._plot_symmetric_ellipse(canvas, cx, cy, x, y, shape_tag, debugger)
-            if d2 > 0:
-                d2 += rx2 * (-2 * y + 3)
-            else:
-                d2 += ry2 * (2 * x + 2) + rx2 * (-2 * y + 3)
-                x += 1
-            y -= 1
-        return shape_tag
-
-    def _plot_symmetric_ellipse(self, canvas, cx, cy, x, y, tag, debugger=None):
+        if rx == 0 or ry == 0: return # Handle degenerate case
+
+        for x, y in _midpoint_ellipse_quadrant(rx, ry):
+            yield from self._symmetric_ellipse(cx, cy, x, y)
+
+    def execute_many(self, centers, radii):
+        """Векторная версия execute: N эллипсов с центрами (N, 2) и полуосями (N, 2) или (N,)."""
+        centers, radii = _batch_arguments(centers, radii)
+        return _place_offsets(centers, radii, ellipse_offsets)
+
+    def iter_rotated_pixels(self, center, point2, point3, angle, viewport=None):
+        """
+        Поток пикселей эллипса, оси которого повернуты на angle градусов (как в rotate_2d);
+        точки - уже повернутые управляющие точки. При повороте на k * 90 градусов
+        берутся кэшированные смещения осевого эллипса, иначе - контур conicTracer.
+        """
+        rx, ry, axis_aligned = self._rotated_semi_axes(center, point2, point3, angle)
+        if axis_aligned:
+            return self._iter_offsets(center, ellipse_offsets(round(rx), round(ry)), viewport)
+        return iter_ellipse(center, rx, ry, angle, viewport, self.VIEWPORT_MARGIN)
+
+    def _rotated_semi_axes(self, center, point2, point3, angle):
+        """
+        Полуоси (rx, ry) эллипса, повернутого на angle градусов, и признак того, что
+        оси снова идут вдоль x и y (k * 90 градусов; после нечетного k rx и ry меняются местами).
+        """
+        u, v = conic_frame(angle)
+        rx = abs((point2[0] - center[0]) * u[0] + (point2[1] - center[1]) * u[1])
+        ry = abs((point3[0] - center[0]) * v[0] + (point3[1] - center[1]) * v[1])
+        quarter_turns = round(angle / 90)
+        if abs(angle - 90 * quarter_turns) >= ANGLE_QUANTUM / 2: # Same key as k * 90 degrees in conicTracer
+            return rx, ry, False
+        return (ry, rx, True) if quarter_turns % 2 else (rx, ry, True)
+
+    def _viewport_bounds(self, viewport):
+        """Viewport с запасом VIEWPORT_MARGIN (без viewport - вся плоскость)."""
+        if viewport is None:
+            return -math.inf, -math.inf, math.inf, math.inf
+        m = self.VIEWPORT_MARGIN
+        return viewport[0] - m, viewport[1] - m, viewport[2] + m, viewport[3] + m
+
+    def _iter_offsets(self, center, offsets, viewport):
+        """Пиксели center + offsets (центр округляется, как в iter_ellipse) внутри viewport с запасом."""
+        cx, cy = round(float(center[0])), round(float(center[1]))
+        xmin, ymin, xmax, ymax = self._viewport_bounds(viewport)
+        for x, y in offsets.tolist():
+            if xmin <= cx + x <= xmax and ymin <= cy + y <= ymax:
+                yield cx + x, cy + y, 1.0
+
+    def _symmetric_ellipse(self, cx, cy, x, y):
         points_to_plot = [(cx + x, cy + y), (cx - x, cy + y), (cx + x, cy - y), (cx - x, cy - y)]
-        self._plot_points(canvas, debugger, points_to_plot, tag)
-
-    def _plot_points(self, canvas, debugger, points, tag, color="black"):
-         if debugger:
-            for px, py in points:
-                 debugger.record_step(px, py, 1.0, "Второй порядок")
-         elif canvas:
-            for px, py in points:
-                 canvas.create_rectangle(px, py, px + 1, py + 1, outline=color, fill=color, tags=tag)
+        for px, py in points_to_plot:
+            yield px, py, 1.0
 
     def plot(self, canvas, x, y, color="black"):
         """Реализация абстрактного метода plot."""
         canvas.create_rectangle(int(x), int(y), int(x) + 1, int(y) + 1, outline=color, fill=color)
 
 
-class BresenhamHyperbolaStrategy(SecondOrderLineStrategyInterface):
+class FilledCircleStrategy(BresenhamCircleStrategy):
+    """
+    Круг: заливка окружности Брезенхема одним горизонтальным спаном на строку.
+    Полуширины строк берутся из тех же решений алгоритма, что и контур,
+    поэтому заливка точно покрывает пиксели окружности.
+    """
+    TAG_PREFIX = "disc"
+    filled = True
+
     def __init__(self):
-        self.name = "Гипербола"
+        self.name = "Круг"
+
+    def execute(self, center, point2, point3=None, canvas=None, debugger=None, viewport=None):
+        shape_tag = f"{self.TAG_PREFIX}_{time.time_ns()}"
+        if debugger or not canvas:
+            self._render(self.iter_pixels(center, point2, point3), canvas, debugger, shape_tag)
+        else:
+            render_spans(self.iter_spans(center, point2, point3), canvas, shape_tag)
+        return shape_tag
+
+    def execute_many(self, centers, radii):
+        """Векторная версия execute: пиксели N кругов."""
+        centers, radii = _batch_arguments(centers, radii)
+        return _place_offsets(centers, radii[:, 0], disc_offsets)
+
+    def iter_spans(self, center, point2, point3=None):
+        """Спаны (y, x_start, x_end) круга, x_end включительно."""
+        cx, cy, radius = self._center_radius(center, point2)
+        return _symmetric_spans(cx, cy, circle_half_widths(radius))
+
+    def iter_pixels(self, center, point2, point3=None):
+        for y, x_start, x_end in self.iter_spans(center, point2, point3):
+            for x in range(x_start, x_end + 1):
+                yield x, y, 1.0
 
-    def execute(self, center, point2, point3, canvas=None, debugger=None):
-        shape_tag = f"hyperbola_{time.time_ns()}"
-        cx, cy = map(int, center)
-        px, py = map(int, point2)
-        qx, qy = map(int, point3)
 
-        a = abs(px - cx)
-        b = abs(qy - cy)
-        if a == 0 or b == 0: return shape_tag # Degenerate
-
-        a2, b2 = a * a, b * b
-        limit = 2 * cx # Limit drawing range based on center x? Needs adjustment
-
-        # Branch 1: x starting from a, moving right
-        x, y = a, 0
-        d = 2 * a2 * y + a2 - b2 * (2 * a - 1)
-        while y <= limit: # Limiting condition needs review
-             self._plot_symmetric_hyperbola(canvas, cx, cy, x, y, shape_tag, debugger)
-             if d < 0:
-                 d += a2 * (2 * y + 3)
-             else:
-                 d += a2 * (2 * y + 3) - b2 * (2 * x + 2)
-                 x += 1
-             y += 1
-
-        # Branch 2: y starting from limit, moving up? (Original logic seems complex, needs review)
-        # The standard Bresenham-like hyperbola needs careful state transition.
-        # For simplicity here, we only draw one part based on the standard algorithm
-        # derivation approach which usually focuses on dy/dx vs dx/dy changes.
-        # A full implementation might need separate loops or state.
-        print("Warning: Hyperbola drawing might be incomplete or use a simplified algorithm.")
+class FilledEllipseStrategy(BresenhamEllipseStrategy):
+    """
+    Заливка эллипса средней точки одним горизонтальным спаном на строку (см. FilledCircleStrategy).
+    Повернутый эллипс закрашивается спанами из хорд строк (conicTracer.ellipse_spans).
+    """
+    TAG_PREFIX = "filled_ellipse"
+    filled = True
 
+    def __init__(self):
+        self.name = "Эллипс (заливка)"
+
+    def execute(self, center, point2, point3=None, canvas=None, debugger=None, viewport=None):
+        shape_tag = f"{self.TAG_PREFIX}_{time.time_ns()}"
+        if debugger or not canvas:
+            self._render(self.iter_pixels(center, point2, point3), canvas, debugger, shape_tag)
+        else:
+            render_spans(self.iter_spans(center, point2, point3), canvas, shape_tag)
         return shape_tag
 
-    def _plot_symmetric_hyperbola(self, canvas, cx, cy, x, y, tag, debugger=None):
-        points_to_plot = [
-            (cx + x, cy + y), (cx - x, cy + y),
-            (cx + x, cy - y), (cx - x, cy - y)
-        ]
-        self._plot_points(canvas, debugger, points_to_plot, tag)
+    def execute_many(self, centers, radii):
+        """Векторная версия execute: пиксели N закрашенных эллипсов."""
+        centers, radii = _batch_arguments(centers, radii)
+        return _place_offsets(centers, radii, filled_ellipse_offsets)
+
+    def iter_spans(self, center, point2, point3=None):
+        """Спаны (y, x_start, x_end) эллипса, x_end включительно."""
+        cx, cy = map(int, center)
+        rx = abs(int(point2[0]) - cx)
+        ry = abs(int(point3[1]) - cy)
+        if rx == 0 or ry == 0: return # Handle degenerate case
+        yield from _symmetric_spans(cx, cy, ellipse_half_widths(rx, ry))
+
+    def iter_pixels(self, center, point2, point3=None):
+        for y, x_start, x_end in self.iter_spans(center, point2, point3):
+            for x in range(x_start, x_end + 1):
+                yield x, y, 1.0
+
+    def iter_rotated_spans(self, center, point2, point3, angle, viewport=None):
+        """Спаны (y, x_start, x_end) эллипса, повернутого на angle градусов, внутри viewport с запасом."""
+        rx, ry, axis_aligned = self._rotated_semi_axes(center, point2, point3, angle)
+        if not axis_aligned:
+            yield from iter_ellipse_spans(center, rx, ry, angle, viewport, self.VIEWPORT_MARGIN)
+            return
+        rx, ry = round(rx), round(ry)
+        if rx == 0 or ry == 0: return
+        xmin, ymin, xmax, ymax = self._viewport_bounds(viewport)
+        cx, cy = round(float(center[0])), round(float(center[1]))
+        for y, x_start, x_end in _symmetric_spans(cx, cy, ellipse_half_widths(rx, ry)):
+            x_start, x_end = max(x_start, xmin), min(x_end, xmax)
+            if ymin <= y <= ymax and x_start <= x_end:
+                yield y, x_start, x_end
+
+    def iter_rotated_pixels(self, center, point2, point3, angle, viewport=None):
+        for y, x_start, x_end in self.iter_rotated_spans(center, point2, point3, angle, viewport):
+            for x in range(x_start, x_end + 1):
+                yield x, y, 1.0
+
+
+def _wu_circle_octant(radius):
+    """
+    Пары пикселей Ву одного октанта окружности (0 <= x <= y): для каждого x точное
+    y = sqrt(r^2 - x^2) делится между пикселями y0 и y0 + 1 пропорционально дробной части.
+    """
+    x = 0
+    while x * x * 2 <= radius * radius:
+        y = math.sqrt(radius * radius - x * x)
+        y0 = math.floor(y)
+        fraction = y - y0
+        yield x, y0, 1.0 - fraction
+        if fraction > 0:
+            yield x, y0 + 1, fraction
+        x += 1
+
+def _wu_ellipse_quadrant(rx, ry):
+    """
+    Пары пикселей Ву одной четверти эллипса: до точки с наклоном 1 шаг по x
+    (пара по вертикали), дальше - шаг по y (пара по горизонтали).
+    """
+    rx2, ry2 = rx * rx, ry * ry
+    # Region 1: |dy/dx| <= 1
+    x = 0
+    while True:
+        y = ry * math.sqrt(max(0.0, 1.0 - x * x / rx2))
+        if ry2 * x > rx2 * y:
+            break
+        y0 = math.floor(y)
+        yield x, y0, 1.0 - (y - y0)
+        if y > y0:
+            yield x, y0 + 1, y - y0
+        x += 1
+    # Region 2: |dy/dx| > 1, from the x axis up to the same point
+    y = 0
+    while True:
+        x = rx * math.sqrt(max(0.0, 1.0 - y * y / ry2))
+        if rx2 * y >= ry2 * x:
+            break
+        x0 = math.floor(x)
+        yield x0, y, 1.0 - (x - x0)
+        if x > x0:
+            yield x0 + 1, y, x - x0
+        y += 1
+
+def _wu_table(pixels, swap):
+    """
+    Раскрывает симметрию пар Ву: каждое вычисленное (x, y, intensity) дает 4 точки
+    (и еще 4 с переставленными x, y при swap). Совпадающие пиксели оставлены один раз,
+    чтобы покрытие на осях и диагоналях не накладывалось само на себя.
+    """
+    table = {}
+    for x, y, intensity in pixels:
+        mirrors = [(x, y), (-x, y), (x, -y), (-x, -y)]
+        if swap:
+            mirrors += [(y, x), (-y, x), (y, -x), (-y, -x)]
+        for point in mirrors:
+            table.setdefault(point, intensity)
+    offsets = np.array(list(table.keys()), dtype=np.int64).reshape(-1, 2)
+    intensities = np.array(list(table.values()), dtype=float)
+    offsets.flags.writeable = False
+    intensities.flags.writeable = False
+    return offsets, intensities
+
+@lru_cache(maxsize=CIRCLE_OFFSETS_CACHE_SIZE)
+def wu_circle_pixels(radius):
+    """Смещения (K, 2) и интенсивности (K,) окружности Ву радиуса radius, только для чтения."""
+    return _wu_table(_wu_circle_octant(radius), swap=True)
+
+@lru_cache(maxsize=ELLIPSE_OFFSETS_CACHE_SIZE)
+def wu_ellipse_pixels(rx, ry):
+    """Смещения (K, 2) и интенсивности (K,) эллипса Ву с полуосями (rx, ry), только для чтения."""
+    if rx == 0 or ry == 0:
+        return _wu_table([], swap=False)
+    return _wu_table(_wu_ellipse_quadrant(rx, ry), swap=False)
+
+
+class WuCircleStrategy(BresenhamCircleStrategy):
+    """
+    Сглаженная окружность (Ву): интенсивность каждой пары пикселей считается
+    один раз на октант и переносится в остальные семь по симметрии.
+    """
+    TAG_PREFIX = "wu_circle"
 
-    def _plot_points(self, canvas, debugger, points, tag, color="black"):
-         if debugger:
-            for px, py in points:
-                debugger.record_step(px, py, 1.0, "Второй порядок")
-         elif canvas:
-            for px, py in points:
-                 canvas.create_rectangle(px, py, px + 1, py + 1, outline=color, fill=color, tags=tag)
+    def __init__(self):
+        self.name = "Окружность (Ву)"
+        self.blend = True # In the framebuffer, accumulate coverage instead of overwriting pixels
+
+    def execute(self, center, point2, point3=None, canvas=None, debugger=None, viewport=None):
+        shape_tag = f"{self.TAG_PREFIX}_{time.time_ns()}"
+        if debugger or not canvas:
+            self._render(self.iter_pixels(center, point2, point3), canvas, debugger, shape_tag)
+            return shape_tag
+        cx, cy, radius = self._center_radius(center, point2)
+        offsets, intensities = wu_circle_pixels(radius)
+        render_array(offsets + (cx, cy), intensities, canvas, shape_tag, blend=self.blend)
+        return shape_tag
 
-    def plot(self, canvas, x, y, color="black"):
-        """Реализация абстрактного метода plot."""
-        canvas.create_rectangle(int(x), int(y), int(x) + 1, int(y) + 1, outline=color, fill=color)
+    def execute_many(self, centers, radii):
+        """Векторная версия execute: N сглаженных окружностей."""
+        centers, radii = _batch_arguments(centers, radii)
+        return _place_offsets(centers, radii[:, 0], wu_circle_pixels)
 
+    def iter_pixels(self, center, point2, point3=None):
+        cx, cy, radius = self._center_radius(center, point2)
+        offsets, intensities = wu_circle_pixels(radius)
+        for (x, y), intensity in zip(offsets.tolist(), intensities.tolist()):
+            yield cx + x, cy + y, intensity
+
+
+class WuEllipseStrategy(BresenhamEllipseStrategy):
+    """
+    Сглаженный эллипс (Ву) с четырехкратной симметрией (см. WuCircleStrategy).
+
+    Поворот не поддерживается: сглаженного трассировщика повернутых кривых нет,
+    и повернутый эллипс Ву рисуется осевым по полуосям из повернутых точек.
+    """
+    TAG_PREFIX = "wu_ellipse"
+    rotatable = False # No anti-aliased rotated tracer (see the class docstring)
 
-class BresenhamParabolaStrategy(SecondOrderLineStrategyInterface):
     def __init__(self):
-        self.name = "Парабола"
+        self.name = "Эллипс (Ву)"
+        self.blend = True # In the framebuffer, accumulate coverage instead of overwriting pixels
+
+    def execute(self, center, point2, point3=None, canvas=None, debugger=None, viewport=None):
+        shape_tag = f"{self.TAG_PREFIX}_{time.time_ns()}"
+        self._render(self.iter_pixels(center, point2, point3), canvas, debugger, shape_tag, blend=self.blend)
+        return shape_tag
 
-    def execute(self, center, focus, point3, canvas=None, debugger=None):
-        shape_tag = f"parabola_{time.time_ns()}"
+    def execute_many(self, centers, radii):
+        """Векторная версия execute: N сглаженных эллипсов."""
+        centers, radii = _batch_arguments(centers, radii)
+        return _place_offsets(centers, radii, wu_ellipse_pixels)
+
+    def iter_pixels(self, center, point2, point3=None):
         cx, cy = map(int, center)
-        fx, fy = map(int, focus)
-        px, py = map(int, point3) # Used to determine width/direction?
+        rx = abs(int(point2[0]) - cx)
+        ry = abs(int(point3[1]) - cy)
+        offsets, intensities = wu_ellipse_pixels(rx, ry)
+        for (x, y), intensity in zip(offsets.tolist(), intensities.tolist()):
+            yield cx + x, cy + y, intensity
+
+
+class BresenhamHyperbolaStrategy(SecondOrderLineStrategyInterface):
+    """
+    Гипербола U^2/a^2 - V^2/b^2 = 1 с центром center: a - проекция point2 - center
+    на ось u, b - проекция point3 - center на ось v.
+
+    Осевой и повернутый варианты - одна и та же кривая: iter_pixels - это
+    iter_rotated_pixels с углом 0 (трассировщик conicTracer). С viewport ветви
+    трассируются от входа до выхода из области видимости, без viewport - до
+    |V| = 4 * (a + b).
+    """
+    TAG_PREFIX = "hyperbola"
+    rotatable = True
+    bounded = False
+    translation_invariant = False # The drawn extent depends on the center and the viewport
+
+    def __init__(self):
+        self.name = "Гипербола"
+
+    def execute(self, center, point2, point3, canvas=None, debugger=None, viewport=None):
+        shape_tag = f"{self.TAG_PREFIX}_{time.time_ns()}"
+        self._render(self.iter_pixels(center, point2, point3, viewport), canvas, debugger, shape_tag)
+        return shape_tag
 
-        p = abs(fy - cy) # Parameter p (distance vertex to focus/directrix)
-        if p == 0: return shape_tag # Degenerate
+    def iter_pixels(self, center, point2, point3=None, viewport=None):
+        return self.iter_rotated_pixels(center, point2, point3, 0, viewport)
 
-        limit = 2 * p + abs(px-cx) # Heuristic limit
-        direction = 1 if fy > cy else -1
+    def iter_rotated_pixels(self, center, point2, point3, angle, viewport=None):
+        u, v = conic_frame(angle)
+        a = abs((point2[0] - center[0]) * u[0] + (point2[1] - center[1]) * u[1])
+        b = abs((point3[0] - center[0]) * v[0] + (point3[1] - center[1]) * v[1])
+        return iter_hyperbola(center, a, b, angle, viewport, self.VIEWPORT_MARGIN)
 
-        # Bresenham derivation for parabola y^2 = 4ax or x^2 = 4ay
-        # Assume x^2 = 4py variation: x^2 = 4*p*(y-cy) + cx -> (x-cx)^2 = 4p(y-cy)
-        # Let X = x-cx, Y = y-cy. X^2 = 4pY
+    def plot(self, canvas, x, y, color="black"):
+        """Реализация абстрактного метода plot."""
+        canvas.create_rectangle(int(x), int(y), int(x) + 1, int(y) + 1, outline=color, fill=color)
 
-        x, y = 0, 0
-        d = 1 - 2 * p # Decision parameter for x^2 = 4py
 
-        while y * direction <= limit: # Limiting based on y relative to vertex
-            # Transform back: plot (X+cx, Y+cy)
-            self._plot_symmetric_parabola(canvas, cx, cy, x, y * direction, shape_tag, debugger)
+class BresenhamParabolaStrategy(SecondOrderLineStrategyInterface):
+    """
+    Парабола U^2 = 4pV с вершиной center и фокусом focus на оси v (p - проекция
+    focus - center на v). point3 задает ширину: без viewport ветви строятся до
+    V = 2|p| + |U(point3)|.
+
+    Осевой и повернутый варианты - одна и та же кривая: iter_pixels - это
+    iter_rotated_pixels с углом 0 (трассировщик conicTracer). С viewport ветви
+    трассируются от входа до выхода из области видимости.
+    """
+    TAG_PREFIX = "parabola"
+    rotatable = True
+    bounded = False
+    translation_invariant = False # The drawn extent depends on the viewport
 
-            if d < 0:
-                # Move vertically (change Y) more easily
-                d += 2 * y + 3
-            else:
-                # Move diagonally (change X and Y)
-                d += 2 * y + 3 - 4 * p
-                x += 1 # Should be x+=1 for X^2=4pY
-            y += 1 # Always increment y (or Y)
+    def __init__(self):
+        self.name = "Парабола"
 
-        print("Warning: Parabola drawing uses simplified algorithm and limit.")
+    def execute(self, center, focus, point3, canvas=None, debugger=None, viewport=None):
+        shape_tag = f"{self.TAG_PREFIX}_{time.time_ns()}"
+        self._render(self.iter_pixels(center, focus, point3, viewport), canvas, debugger, shape_tag)
         return shape_tag
 
-    def _plot_symmetric_parabola(self, canvas, cx, cy, x, y, tag, debugger=None):
-         # For (x-cx)^2 = 4p(y-cy) -> plots (cx+x, cy+y) and (cx-x, cy+y)
-        points_to_plot = [(cx + x, cy + y), (cx - x, cy + y)]
-        self._plot_points(canvas, debugger, points_to_plot, tag)
+    def iter_pixels(self, center, focus, point3=None, viewport=None):
+        return self.iter_rotated_pixels(center, focus, point3 or center, 0, viewport)
+
+    def _batch_points(self, cx, cy, rx, ry):
+        """В execute_many center - вершина, ry - фокусное расстояние p, rx - полуширина."""
+        return [cx, cy + ry], [cx + rx, cy]
 
-    def _plot_points(self, canvas, debugger, points, tag, color="black"):
-         if debugger:
-            for px, py in points:
-                debugger.record_step(px, py, 1.0, "Второй порядок")
-         elif canvas:
-            for px, py in points:
-                 canvas.create_rectangle(px, py, px + 1, py + 1, outline=color, fill=color, tags=tag)
+    def iter_rotated_pixels(self, center, focus, point3, angle, viewport=None):
+        """Поток пикселей параболы, оси которой повернуты на angle градусов (как в rotate_2d)."""
+        u, v = conic_frame(angle)
+        p = (focus[0] - center[0]) * v[0] + (focus[1] - center[1]) * v[1]
+        width = abs((point3[0] - center[0]) * u[0] + (point3[1] - center[1]) * u[1])
+        return iter_parabola(center, p, angle, viewport, self.VIEWPORT_MARGIN, extent=2 * abs(p) + width)
 
     def plot(self, canvas, x, y, color="black"):
         """Реализация абстрактного метода plot."""
@@ -240,6 +687,7 @@ class BresenhamParabolaStrategy(SecondOrderLineStrategyInterface):
 class SecondOrderLineContext(BaseLineContext):
     def __init__(self):
         self.__strategy: SecondOrderLineStrategyInterface = None
+        self.cache = RasterCache() # Pixels of already rasterized shapes (see execute_cached)
 
     def set_strategy(self, strategy: SecondOrderLineStrategyInterface):
         self.__strategy = strategy
@@ -252,91 +700,66 @@ class SecondOrderLineContext(BaseLineContext):
             return self.__strategy.execute(center, point2, point3, canvas, debugger)
         return None
 
+    def execute_many(self, centers, radii):
+        """
+        Пакетная растеризация N окружностей/эллипсов текущей стратегией без холста.
 
-class CurveStrategyInterface(ABC):
-    @abstractmethod
-    def draw(self, points, canvas):
-        pass
+        Args:
+            centers: массив (N, 2) центров.
+            radii: массив (N,) радиусов или (N, 2) полуосей (rx, ry).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray] | None: пиксели (M, 2),
+            интенсивности (M,) и номер фигуры для каждого пикселя (M,).
+        """
+        if self.__strategy:
+            return self.__strategy.execute_many(centers, radii)
+        return None
+
+    def execute_rotated(self, points, angle, canvas, strategy=None, viewport=None):
+        """
+        Рисует кривую, повернутую на angle градусов: управляющие точки уже повернуты,
+        а оси кривой восстанавливаются по накопленному углу (см. conicTracer).
+        Закрашенные кривые выводятся спанами (iter_rotated_spans). Без поворота или
+        для стратегий с rotatable = False (эллипс Ву) - как execute_cached.
+
+        Returns:
+            str | None: тег фигуры.
+        """
+        strategy = strategy or self.__strategy
+        if not strategy:
+            return None
+        if not strategy.rotatable or angle % 360 == 0:
+            return self.execute_cached(points, canvas, strategy, viewport)
+        shape_tag = f"{strategy.TAG_PREFIX}_{time.time_ns()}"
+        if strategy.filled:
+            render_spans(strategy.iter_rotated_spans(*points, angle, viewport), canvas, shape_tag)
+        else:
+            render_pixels(strategy.iter_rotated_pixels(*points, angle, viewport), canvas, shape_tag)
+        return shape_tag
+
+    def execute_cached(self, points, canvas, strategy=None, viewport=None):
+        """
+        Рисует кривую по точкам [center, point2(, point3)] через кэш растеризации.
+
+        Args:
+            strategy: стратегия кривой (по умолчанию текущая стратегия контекста).
+            viewport: (xmin, ymin, xmax, ymax) - видимая область для незамкнутых
+                кривых (гипербола, парабола), которые кэш не хранит.
+
+        Returns:
+            str | None: тег фигуры.
+        """
+        strategy = strategy or self.__strategy
+        if not strategy:
+            return None
+        if strategy.filled:
+            # O(radius) spans are cheaper than O(area) cached pixels
+            return strategy.execute(*(list(points) + [None] * (3 - len(points))), canvas)
+        cached = self.cache.lookup(strategy, points, lambda points: strategy.iter_pixels(*points))
+        if cached is None:
+            return strategy.execute(*(list(points) + [None] * (3 - len(points))), canvas, viewport=viewport)
+        shape_tag = f"{strategy.TAG_PREFIX}_{time.time_ns()}"
+        render_array(*cached, canvas, shape_tag, blend=getattr(strategy, "blend", False))
+        return shape_tag
 
-class HermiteCurve(CurveStrategyInterface):
-    def draw(self, points, canvas):
-        if len(points) < 4:
-            return
-        
-        # Hermite basis matrix
-        M = np.array([
-            [2, -2, 1, 1],
-            [-3, 3, -2, -1],
-            [0, 0, 1, 0],
-            [1, 0, 0, 0]
-        ])
-        
-        # Generate points along the curve
-        for t in np.arange(0, 1, 0.01):
-            T = np.array([t**3, t**2, t, 1])
-            
-            # Calculate x and y coordinates
-            x = np.dot(np.dot(T, M), [points[0][0], points[3][0], points[1][0], points[2][0]])
-            y = np.dot(np.dot(T, M), [points[0][1], points[3][1], points[1][1], points[2][1]])
-            
-            canvas.create_oval(x-1, y-1, x+1, y+1, fill='black')
-
-class BezierCurve(CurveStrategyInterface):
-    def draw(self, points, canvas):
-        if len(points) < 4:
-            return
-            
-        # Bezier basis matrix
-        M = np.array([
-            [-1, 3, -3, 1],
-            [3, -6, 3, 0],
-            [-3, 3, 0, 0],
-            [1, 0, 0, 0]
-        ])
-        
-        # Generate points along the curve
-        for t in np.arange(0, 1, 0.01):
-            T = np.array([t**3, t**2, t, 1])
-            
-            # Calculate x and y coordinates
-            x = np.dot(np.dot(T, M), [p[0] for p in points])
-            y = np.dot(np.dot(T, M), [p[1] for p in points])
-            
-            canvas.create_oval(x-1, y-1, x+1, y+1, fill='black')
-
-class BSplineCurve(CurveStrategyInterface):
-    def draw(self, points, canvas):
-        if len(points) < 4:
-            return
-            
-        # B-spline basis matrix
-        M = (1/6) * np.array([
-            [-1, 3, -3, 1],
-            [3, -6, 3, 0],
-            [-3, 0, 3, 0],
-            [1, 4, 1, 0]
-        ])
-        
-        # Generate points along the curve
-        for t in np.arange(0, 1, 0.01):
-            T = np.array([t**3, t**2, t, 1])
-            
-            # Calculate x and y coordinates
-            x = np.dot(np.dot(T, M), [p[0] for p in points])
-            y = np.dot(np.dot(T, M), [p[1] for p in points])
-            
-            canvas.create_oval(x-1, y-1, x+1, y+1, fill='black')
-
-class CurveContext:
-    def __init__(self):
-        self._strategy = None
-        
-    def set_strategy(self, strategy):
-        self._strategy = strategy
-        
-    def get_strategy(self):
-        return self._strategy
-        
-    def execute_strategy(self, points, canvas):
-        if self._strategy:
-            self._strategy.draw(points, canvas)
@@ -0,0 +1,32 @@
+def liang_barsky(a, b, viewport):
+    """
+    Отсечение отрезка a-b прямоугольником (алгоритм Лианга-Барски).
+
+    Args:
+        a, b: концы отрезка (x, y).
+        viewport: прямоугольник (xmin, ymin, xmax, ymax).
+
+    Returns:
+        tuple[float, float] | None: параметры [t0, t1] видимой части
+        (точка отрезка = a + t * (b - a)) или None, если отрезок невидим.
+    """
+    x1, y1 = a
+    x2, y2 = b
+    xmin, ymin, xmax, ymax = viewport
+    dx = x2 - x1
+    dy = y2 - y1
+
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, x1 - xmin), (dx, xmax - x1), (-dy, y1 - ymin), (dy, ymax - y1)):
+        if p == 0:
+            if q < 0: # Parallel to this edge and outside of it
+                return None
+            continue
+        r = q / p
+        if p < 0:
+            t0 = max(t0, r) # Entering
+        else:
+            t1 = min(t1, r) # Leaving
+        if t0 > t1:
+            return None
+    return t0, t1
@@ -0,0 +1,388 @@
+"""
+Трассировка произвольно повернутых кривых второго порядка.
+
+Кривая задается уравнением F(x, y) = Ax^2 + Bxy + Cy^2 + Dx + Ey + F = 0 с целыми
+коэффициентами (относительно целочисленного начала рядом с центром кривой).
+Трассировщик идет от пикселя к соседнему пикселю (алгоритм Питтвея): касательная
+(-dF/dy, dF/dx) задает октант, то есть пару кандидатов - осевой и диагональный шаг,
+из которых берется шаг с меньшим |F|. Значение F и градиент обновляются приращениями
+в целых числах, поэтому внутренний цикл не содержит ни умножений координат, ни
+вещественной арифметики.
+
+Эллипс трассируется по замкнутому контуру, ветви гиперболы и параболы - от ближайшей
+к вершине видимой точки до аналитически найденного выхода из viewport. Концы кривой
+острее пикселя трассировщик не различает: такие узкие эллипсы строятся по точкам.
+"""
+from functools import lru_cache
+import math
+
+COEFFICIENT_BITS = 24 # Largest quadratic coefficient after scaling to integers
+PARAMETER_BITS = 16   # Fixed-point precision of the along-branch stop test
+SLIVER_TIP_RADIUS = 0.25 # Ellipses with sharper ends are sampled instead of traced
+LENGTH_QUANTUM = 1 / 16 # Cache keys: lengths and sub-pixel positions are rounded to this many pixels
+ANGLE_QUANTUM = 0.1     # Cache keys: angles are rounded to this many degrees
+ELLIPSE_OUTLINE_CACHE_SIZE = 512 # Traced ellipse outlines kept by quantized (rx, ry, angle)
+BRANCH_CACHE_SIZE = 64 # Traced hyperbola and parabola branches (one entry per shape and viewport)
+
+
+def quantize_length(value):
+    """Длина (или дробный сдвиг), округленная до LENGTH_QUANTUM: ключ кэша без шума вычислений."""
+    return round(value / LENGTH_QUANTUM) * LENGTH_QUANTUM
+
+def quantize_angle(angle_degrees):
+    """Угол в [0, 360), округленный до ANGLE_QUANTUM градусов."""
+    return round(angle_degrees / ANGLE_QUANTUM) % round(360 / ANGLE_QUANTUM) * ANGLE_QUANTUM
+
+def conic_frame(angle_degrees):
+    """Оси повернутой системы координат: u - образ оси x, v - образ оси y (как в rotate_2d)."""
+    angle = math.radians(angle_degrees)
+    u = (math.cos(angle), math.sin(angle))
+    return u, (-u[1], u[0])
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1]
+
+def _integer_form(center, u, v, k_uu, k_vv, k_u, k_v, k0):
+    """
+    Целые коэффициенты k_uu*U^2 + k_vv*V^2 + k_u*U + k_v*V + k0, где U, V - координаты
+    точки в осях (u, v) с началом center, записанные через целые пиксели (x, y) от origin.
+
+    Returns:
+        tuple: (origin (ox, oy), (A, B, C, D, E, F)).
+    """
+    origin = (round(center[0]), round(center[1]))
+    shift = (origin[0] - center[0], origin[1] - center[1])
+    coefficients = [0.0] * 6
+    for axis, square, linear in ((u, k_uu, k_u), (v, k_vv, k_v)):
+        ax, ay = axis
+        c = _dot(shift, axis) # U = ax * x + ay * y + c
+        for i, value in enumerate((square * ax * ax, 2 * square * ax * ay, square * ay * ay,
+                                   2 * square * ax * c + linear * ax, 2 * square * ay * c + linear * ay,
+                                   square * c * c + linear * c)):
+            coefficients[i] += value
+    coefficients[5] += k0
+    largest = max(abs(coefficients[0]), abs(coefficients[1]), abs(coefficients[2]))
+    scale = (1 << COEFFICIENT_BITS) / largest
+    return origin, tuple(round(value * scale) for value in coefficients)
+
+def _trace(coefficients, x, y, turn, max_steps, stop=None, end=None):
+    """
+    Пиксели (x, y) кривой от стартового пикселя в направлении turn (+1/-1 вдоль касательной).
+
+    Args:
+        stop: None - замкнутая кривая, конец рядом с пикселем end (по умолчанию - стартом);
+            иначе (wx, wy, t, t_end): параметр вдоль ветви t (фиксированная точка) растет
+            на wx/wy при шаге по x/y, трассировка заканчивается, когда t > t_end.
+    """
+    A, B, C, D, E, F0 = coefficients
+    f = A * x * x + B * x * y + C * y * y + D * x + E * y + F0
+    gx = 2 * A * x + B * y + D # dF/dx
+    gy = B * x + 2 * C * y + E # dF/dy
+    x0, y0 = (x, y) if end is None else end
+    left = False # The closed contour has moved away from the end pixel
+    if stop is not None:
+        wx, wy, t, t_end = stop
+    for _ in range(max_steps):
+        yield x, y
+        if stop is None:
+            near = abs(x - x0) <= 1 and abs(y - y0) <= 1
+            if left and near:
+                return # Next to the end pixel: the contour is closed
+            left = left or not near
+        # Octant of the tangent: one axial and one diagonal candidate
+        tx, ty = -turn * gy, turn * gx
+        sx = 1 if tx > 0 else -1
+        sy = 1 if ty > 0 else -1
+        f_x = f + sx * gx + A               # F after a step along x
+        f_d = f_x + sy * (gy + B * sx) + C  # F after a diagonal step
+        if abs(tx) >= abs(ty):
+            step_x, step_y = True, abs(f_d) < abs(f_x)
+        else:
+            f_y = f + sy * gy + C           # F after a step along y
+            step_x, step_y = abs(f_d) < abs(f_y), True
+        if step_x:
+            f += sx * gx + A
+            gx += 2 * A * sx
+            gy += B * sx
+            x += sx
+        if step_y:
+            f += sy * gy + C
+            gx += B * sy
+            gy += 2 * C * sy
+            y += sy
+        if stop is not None:
+            t += (wx * sx if step_x else 0) + (wy * sy if step_y else 0)
+            if t > t_end:
+                return
+
+def _window(center, u, v, viewport, margin):
+    """Диапазоны координат viewport (с запасом) в осях (u, v) с началом center."""
+    xmin, ymin, xmax, ymax = viewport
+    corners = [(x - center[0], y - center[1]) for x in (xmin - margin, xmax + margin)
+               for y in (ymin - margin, ymax + margin)]
+    us = [_dot(corner, u) for corner in corners]
+    vs = [_dot(corner, v) for corner in corners]
+    return (min(us), max(us)), (min(vs), max(vs))
+
+def _bounds(viewport, margin):
+    """Границы viewport с запасом (без viewport - вся плоскость)."""
+    if viewport is None:
+        return -math.inf, -math.inf, math.inf, math.inf
+    xmin, ymin, xmax, ymax = viewport
+    return xmin - margin, ymin - margin, xmax + margin, ymax + margin
+
+
+def _ranges(across_range, along_range, h_min, t_of_h):
+    """
+    Видимые участки половин ветви center + tau * t * along + h(t) * across (t >= 0):
+    словарь tau -> (t_start, t_end) из проекций viewport на оси ветви.
+    """
+    h_lo, h_hi = across_range
+    if h_hi < h_min:
+        return {}
+    t_out = t_of_h(h_hi)                         # Beyond it the branch is past the far side
+    t_in = t_of_h(h_lo) if h_lo > h_min else 0.0 # Before it the branch is short of the near side
+    ranges = {}
+    for tau in (1, -1):
+        lo, hi = along_range if tau == 1 else (-along_range[1], -along_range[0])
+        t_start, t_end = max(t_in, lo, 0.0), min(t_out, hi)
+        if t_start <= t_end:
+            ranges[tau] = (t_start, t_end)
+    return ranges
+
+def _trace_half(center, along, across, tau, t_start, t_end, h_of_t, coefficients, origin, margin):
+    """Пиксели (x, y) от origin на половине ветви tau, от t_start до выхода за t_end."""
+    ox, oy = origin
+    A, B, C, D, E, F0 = coefficients
+    scale = 1 << PARAMETER_BITS
+    h = h_of_t(t_start)
+    x = round(center[0] + tau * t_start * along[0] + h * across[0]) - ox
+    y = round(center[1] + tau * t_start * along[1] + h * across[1]) - oy
+    # Follow the tangent in the direction of growing t
+    gx = 2 * A * x + B * y + D
+    gy = B * x + 2 * C * y + E
+    turn = 1 if tau * (-gy * along[0] + gx * along[1]) > 0 else -1
+    wx, wy = round(tau * along[0] * scale), round(tau * along[1] * scale)
+    t = round(tau * _dot((ox + x - center[0], oy + y - center[1]), along) * scale)
+    # The half-branch is monotone in t and h: steps <= |dx| + |dy| <= 2 * (dt + dh)
+    max_steps = 2 * math.ceil(t_end - t_start + h_of_t(t_end) - h + 4 * margin) + 16
+    return _trace(coefficients, x, y, turn, max_steps, (wx, wy, t, round((t_end + 1) * scale)))
+
+def _relative(viewport, origin):
+    """Viewport в координатах от целого пикселя origin (кортеж - часть ключа кэша) или None."""
+    if viewport is None:
+        return None
+    xmin, ymin, xmax, ymax = viewport
+    return (xmin - origin[0], ymin - origin[1], xmax - origin[0], ymax - origin[1])
+
+def _emit(pixels, origin, bounds, mirror=False):
+    """Пиксели от origin в координатах холста (и их отражения относительно origin при mirror) внутри bounds."""
+    ox, oy = origin
+    xmin, ymin, xmax, ymax = bounds
+    for x, y in pixels:
+        px, py = ox + x, oy + y
+        if xmin <= px <= xmax and ymin <= py <= ymax:
+            yield px, py, 1.0
+        if mirror:
+            px, py = ox - x, oy - y
+            if xmin <= px <= xmax and ymin <= py <= ymax:
+                yield px, py, 1.0
+
+
+def iter_ellipse(center, rx, ry, angle_degrees, viewport=None, margin=2):
+    """
+    Поток пикселей (x, y, intensity) эллипса с полуосями rx (вдоль u) и ry (вдоль v).
+
+    Центр округляется до пикселя (как у осевых стратегий), поэтому контур зависит
+    только от (rx, ry, angle) и берется из кэша ellipse_outline. Полуоси и угол
+    округляются до LENGTH_QUANTUM и ANGLE_QUANTUM: точки, восстановленные после
+    поворотов и сдвигов, дают тот же ключ.
+    """
+    rx, ry, angle_degrees = quantize_length(rx), quantize_length(ry), quantize_angle(angle_degrees)
+    if rx <= 0 or ry <= 0:
+        return
+    center = (round(float(center[0])), round(float(center[1])))
+    if viewport is not None:
+        # Bounding box of the rotated ellipse
+        u, v = conic_frame(angle_degrees)
+        ex = math.hypot(rx * u[0], ry * v[0])
+        ey = math.hypot(rx * u[1], ry * v[1])
+        xmin, ymin, xmax, ymax = viewport
+        if (center[0] + ex < xmin - margin or center[0] - ex > xmax + margin or
+                center[1] + ey < ymin - margin or center[1] - ey > ymax + margin):
+            return
+    yield from _emit(ellipse_outline(rx, ry, angle_degrees), center, _bounds(viewport, margin))
+
+@lru_cache(maxsize=ELLIPSE_OUTLINE_CACHE_SIZE)
+def ellipse_outline(rx, ry, angle_degrees):
+    """
+    Пиксели (x, y) контура повернутого эллипса от его центра, без повторов.
+
+    Контур центрально симметричен на сетке: трассируется половина, вторая - ее отражение.
+    """
+    u, v = conic_frame(angle_degrees)
+    if min(rx, ry) ** 2 < SLIVER_TIP_RADIUS * max(rx, ry):
+        # Both sides of the sharp ends fall into the same pixels, the tracer cannot tell them apart
+        return tuple(_sample_ellipse(rx, ry, u, v))
+    _, coefficients = _integer_form((0, 0), u, v, ry * ry, rx * rx, 0, 0, -rx * rx * ry * ry)
+    # Start at the end of the u semi-axis
+    x = round(rx * u[0])
+    y = round(rx * u[1])
+    max_steps = 4 * math.ceil(rx + ry) + 16
+    if abs(x) <= 1 and abs(y) <= 1:
+        return tuple(_trace(coefficients, x, y, 1, max_steps)) # Too small to halve
+    half = list(_trace(coefficients, x, y, 1, max_steps, end=(-x, -y)))
+    traced = set(half)
+    return tuple(half + [(-x, -y) for x, y in half if (-x, -y) not in traced])
+
+def iter_ellipse_spans(center, rx, ry, angle_degrees, viewport=None, margin=2):
+    """
+    Спаны (y, x_start, x_end) закрашенного повернутого эллипса, x_end включительно.
+    Центр, полуоси и угол округляются так же, как в iter_ellipse.
+    """
+    rx, ry, angle_degrees = quantize_length(rx), quantize_length(ry), quantize_angle(angle_degrees)
+    if rx <= 0 or ry <= 0:
+        return
+    cx, cy = round(float(center[0])), round(float(center[1]))
+    xmin, ymin, xmax, ymax = _bounds(viewport, margin)
+    for y, x_start, x_end in ellipse_spans(rx, ry, angle_degrees):
+        y, x_start, x_end = cy + y, max(cx + x_start, xmin), min(cx + x_end, xmax)
+        if ymin <= y <= ymax and x_start <= x_end:
+            yield y, x_start, x_end
+
+@lru_cache(maxsize=ELLIPSE_OUTLINE_CACHE_SIZE)
+def ellipse_spans(rx, ry, angle_degrees):
+    """
+    Спаны (y, x_start, x_end) повернутого эллипса от его центра: в строке y - пиксели,
+    центры которых ближе половины пикселя к хорде U^2/rx^2 + V^2/ry^2 <= 1.
+    """
+    u, v = conic_frame(angle_degrees)
+    # U^2/rx^2 + V^2/ry^2 = A x^2 + B x y + C y^2
+    A = u[0] ** 2 / rx ** 2 + v[0] ** 2 / ry ** 2
+    B = 2 * (u[0] * u[1] / rx ** 2 + v[0] * v[1] / ry ** 2)
+    C = u[1] ** 2 / rx ** 2 + v[1] ** 2 / ry ** 2
+    extent = math.ceil(math.hypot(rx * u[1], ry * v[1]))
+    spans = []
+    for y in range(-extent, extent + 1):
+        discriminant = (B * y) ** 2 - 4 * A * (C * y * y - 1)
+        if discriminant < 0:
+            continue
+        root = math.sqrt(discriminant)
+        x_start, x_end = round((-B * y - root) / (2 * A)), round((-B * y + root) / (2 * A))
+        if x_start <= x_end:
+            spans.append((y, x_start, x_end))
+    return tuple(spans)
+
+def _sample_ellipse(rx, ry, u, v):
+    """
+    Пиксели (x, y) очень узкого эллипса без повторов. Соседние точки отстоят не больше
+    чем на пиксель (дуга шага <= max(rx, ry) * 2pi / steps <= 1), поэтому после округления
+    каждая координата меняется не больше чем на 1 - контур 8-связный.
+    """
+    steps = math.ceil(2 * math.pi * max(rx, ry)) + 4
+    seen = set()
+    for k in range(steps):
+        angle = 2 * math.pi * k / steps
+        a, b = rx * math.cos(angle), ry * math.sin(angle)
+        pixel = (round(a * u[0] + b * v[0]), round(a * u[1] + b * v[1]))
+        if pixel not in seen:
+            seen.add(pixel)
+            yield pixel
+
+def iter_hyperbola(center, a, b, angle_degrees, viewport=None, margin=2):
+    """
+    Поток пикселей гиперболы U^2/a^2 - V^2/b^2 = 1 (действительная ось вдоль u).
+    Без viewport ветви строятся до |V| = 4 * (a + b).
+
+    Центр округляется до пикселя, поэтому пиксели зависят только от формы и
+    положения viewport относительно центра и берутся из кэша hyperbola_branches.
+    """
+    a, b, angle_degrees = quantize_length(a), quantize_length(b), quantize_angle(angle_degrees)
+    if a <= 0 or b <= 0:
+        return
+    center = (round(float(center[0])), round(float(center[1])))
+    yield from _emit(hyperbola_branches(a, b, angle_degrees, _relative(viewport, center), margin),
+                     center, _bounds(None, 0))
+
+@lru_cache(maxsize=BRANCH_CACHE_SIZE)
+def hyperbola_branches(a, b, angle_degrees, window=None, margin=2):
+    """
+    Пиксели (x, y) обеих ветвей от центра гиперболы внутри window (viewport от центра).
+
+    Вторая ветвь - центральное отражение первой, поэтому трассируется одна ветвь
+    на объединении видимых участков обеих.
+    """
+    u, v = conic_frame(angle_degrees)
+    center = origin = (0, 0)
+    _, coefficients = _integer_form(center, u, v, b * b, -a * a, 0, 0, -a * a * b * b)
+    h_of_t = lambda t: a * math.sqrt(1 + (t / b) ** 2)
+    t_of_h = lambda h: b * math.sqrt(max(0.0, (h / a) ** 2 - 1))
+    if window is None:
+        limit = 4 * (a + b)
+        near = far = _ranges((a, h_of_t(limit)), (-limit, limit), a, t_of_h)
+    else:
+        # One more pixel: the pixels of the outermost rows and columns lie up to a pixel off the curve
+        (u_lo, u_hi), along_range = _window(center, u, v, window, margin + 1)
+        near = _ranges((u_lo, u_hi), along_range, a, t_of_h)   # Branch along +u
+        far = _ranges((-u_hi, -u_lo), along_range, a, t_of_h)  # Branch along -u
+    bounds = _bounds(window, margin)
+    pixels = []
+    previous_start = None
+    for tau in (1, -1):
+        # Half tau of the +u branch mirrors half -tau of the -u branch
+        parts = [part for part in (near.get(tau), far.get(-tau)) if part]
+        if not parts:
+            continue
+        t_start, t_end = min(p[0] for p in parts), max(p[1] for p in parts)
+        half = _trace_half(center, v, u, tau, t_start, t_end, h_of_t, coefficients, origin, margin)
+        first = next(half, None)
+        if first is not None and first != previous_start:
+            pixels.extend(_emit([first], origin, bounds, mirror=True))
+        previous_start = first # Both halves start at the vertex when it is visible: draw it once
+        pixels.extend(_emit(half, origin, bounds, mirror=True))
+    return tuple((x, y) for x, y, _ in pixels)
+
+def iter_parabola(vertex, p, angle_degrees, viewport=None, margin=2, extent=None):
+    """
+    Поток пикселей параболы U^2 = 4pV с вершиной vertex; p < 0 - ветви в сторону -v.
+    Без viewport парабола строится до V = extent (по умолчанию 4|p|).
+
+    Вершина делится на целый пиксель и дробный сдвиг (до LENGTH_QUANTUM), ветви
+    от этого пикселя берутся из кэша parabola_branches.
+    """
+    p, angle_degrees = quantize_length(p), quantize_angle(angle_degrees)
+    if p == 0:
+        return
+    extent = 4 * abs(p) if extent is None else quantize_length(extent)
+    origin = (round(float(vertex[0])), round(float(vertex[1])))
+    shift = (quantize_length(vertex[0] - origin[0]), quantize_length(vertex[1] - origin[1]))
+    yield from _emit(parabola_branches(shift, p, angle_degrees, _relative(viewport, origin), margin, extent),
+                     origin, _bounds(None, 0))
+
+@lru_cache(maxsize=BRANCH_CACHE_SIZE)
+def parabola_branches(vertex, p, angle_degrees, window=None, margin=2, extent=None):
+    """Пиксели (x, y) от начала координат параболы с вершиной vertex (|vertex| <= 1/2) внутри window."""
+    u, v = conic_frame(angle_degrees)
+    if p < 0:
+        v = (-v[0], -v[1])
+        p = -p
+    origin, coefficients = _integer_form(vertex, u, v, 1.0, 0.0, 0.0, -4.0 * p, 0.0)
+    h_of_t = lambda t: t * t / (4 * p)
+    t_of_h = lambda h: math.sqrt(4 * p * max(0.0, h))
+    if window is None:
+        extent = 4 * p if extent is None else extent
+        ranges = _ranges((0.0, extent), (-t_of_h(extent), t_of_h(extent)), 0.0, t_of_h)
+    else:
+        along_range, across_range = _window(vertex, u, v, window, margin + 1) # See hyperbola_branches
+        ranges = _ranges(across_range, along_range, 0.0, t_of_h)
+    bounds = _bounds(window, margin)
+    pixels = []
+    previous_start = None
+    for tau, (t_start, t_end) in ranges.items():
+        half = _trace_half(vertex, u, v, tau, t_start, t_end, h_of_t, coefficients, origin, margin)
+        first = next(half, None)
+        if first is not None and first != previous_start:
+            pixels.extend(_emit([first], origin, bounds))
+        previous_start = first # Both halves start at the vertex when it is visible: draw it once
+        pixels.extend(_emit(half, origin, bounds))
+    return tuple((x, y) for x, y, _ in pixels)
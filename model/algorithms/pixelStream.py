@@ -0,0 +1,134 @@
+"""
+Потоки пикселей: общий протокол вывода для стратегий растеризации.
+
+Стратегия отдает ленивый итератор iter_pixels(...) кортежей (x, y, intensity),
+а потребители ниже выводят его на Canvas, в буфер кадра, в отладчик или
+собирают в массивы NumPy. Поток можно прервать в любой момент, а собранный
+результат - переиспользовать для нескольких потребителей без повторного расчета.
+"""
+import itertools
+import numpy as np
+from model.framebuffer import FrameBuffer
+
+
+# Canvas colors for the 256 gray levels, index = int(255 * (1 - intensity))
+GRAY_PALETTE = tuple(f"#{level:02x}{level:02x}{level:02x}" for level in range(256))
+
+
+class _SpanEmitter:
+    """
+    Склеивает подряд идущие пиксели одной строки (или одного столбца) в прогоны
+    и выводит каждый прогон одним элементом Canvas или одним срезом буфера кадра.
+    Набор закрашенных пикселей тот же, что и при попиксельном выводе.
+    """
+    def __init__(self, canvas, tag, color="black"):
+        self.canvas = canvas
+        self.tag = tag
+        self.color = color
+        self.run = None # [x0, y0, last_x, last_y]
+
+    def add(self, x, y):
+        run = self.run
+        if run is not None:
+            x0, y0, lx, ly = run
+            if (y == ly == y0 and abs(x - lx) == 1) or (x == lx == x0 and abs(y - ly) == 1):
+                run[2], run[3] = x, y
+                return
+            self.flush()
+        self.run = [x, y, x, y]
+
+    def flush(self):
+        if self.run is None:
+            return
+        x0, y0, x1, y1 = self.run
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        if isinstance(self.canvas, FrameBuffer):
+            self.canvas.fill_rect(x0, y0, x1, y1, 1.0, self.tag)
+        else:
+            self.canvas.create_rectangle(x0, y0, x1 + 1, y1 + 1, outline=self.color, fill=self.color, tags=self.tag)
+        self.run = None
+
+
+# --- Потребители потока ---
+
+def render_pixels(pixels, canvas, tag, merge_runs=False, blend=False):
+    """
+    Выводит поток пикселей на Canvas или в FrameBuffer.
+
+    Args:
+        pixels: итератор (x, y, intensity).
+        canvas: tk.Canvas или FrameBuffer.
+        tag: тег фигуры.
+        merge_runs: склеивать непрерывные прогоны (только для непрозрачных пикселей).
+        blend: интенсивность - покрытие пикселя, смешивается с фоном и другими
+            фигурами (только FrameBuffer; Canvas рисует серые квадраты из палитры).
+    """
+    if merge_runs:
+        spans = _SpanEmitter(canvas, tag)
+        for x, y, intensity in pixels:
+            spans.add(x, y)
+        spans.flush()
+    elif isinstance(canvas, FrameBuffer):
+        for coords, intensities in iter_chunks(pixels):
+            canvas.plot_many(coords[:, 0], coords[:, 1], intensities, tag, blend=blend)
+    else:
+        palette = GRAY_PALETTE
+        for x, y, intensity in pixels:
+            color = palette[int(255 * (1 - intensity))]
+            canvas.create_rectangle(x, y, x + 1, y + 1, outline=color, fill=color, tags=tag)
+
+def render_array(coords, intensities, canvas, tag, merge_runs=False, blend=False):
+    """
+    Выводит готовые массивы пикселей: в FrameBuffer - одним вызовом plot_many,
+    на Canvas - как поток (см. render_pixels).
+
+    Args:
+        coords: массив (M, 2) координат.
+        intensities: массив (M,) или None (все пиксели непрозрачные).
+    """
+    if isinstance(canvas, FrameBuffer) and not merge_runs:
+        canvas.plot_many(coords[:, 0], coords[:, 1], intensities, tag, blend=blend)
+        return
+    if intensities is None:
+        intensities = np.ones(len(coords))
+    render_pixels(iter_collected(coords, intensities), canvas, tag, merge_runs, blend)
+
+def render_spans(spans, canvas, tag, color="black"):
+    """
+    Выводит горизонтальные спаны (y, x_start, x_end) - x_end включительно -
+    одним прямоугольником Canvas или одним срезом буфера кадра на спан.
+    """
+    if isinstance(canvas, FrameBuffer):
+        for y, x_start, x_end in spans:
+            canvas.fill_span(x_start, x_end, y, 1.0, tag)
+    else:
+        for y, x_start, x_end in spans:
+            canvas.create_rectangle(x_start, y, x_end + 1, y + 1, outline=color, fill=color, tags=tag)
+
+def record_pixels(pixels, debugger, mode="Линия"):
+    """Записывает поток пикселей в отладчик как шаги алгоритма."""
+    for x, y, intensity in pixels:
+        debugger.record_step(x, y, intensity, mode)
+
+def iter_chunks(pixels, size=4096):
+    """Разбивает поток на блоки массивов: ((k, 2) координаты, (k,) интенсивности)."""
+    pixels = iter(pixels)
+    while True:
+        chunk = list(itertools.islice(pixels, size))
+        if not chunk:
+            return
+        data = np.array(chunk, dtype=float).reshape(-1, 3)
+        yield data[:, :2].astype(np.int64), data[:, 2]
+
+def collect_pixels(pixels):
+    """Собирает весь поток в массивы: ((M, 2) координаты, (M,) интенсивности)."""
+    chunks = list(iter_chunks(pixels))
+    if not chunks:
+        return np.zeros((0, 2), dtype=np.int64), np.zeros(0)
+    coords, intensities = zip(*chunks)
+    return np.concatenate(coords), np.concatenate(intensities)
+
+def iter_collected(coords, intensities):
+    """Снова превращает собранные массивы в поток (x, y, intensity) - для повторного вывода."""
+    return zip(coords[:, 0].tolist(), coords[:, 1].tolist(), np.asarray(intensities, dtype=float).tolist())
@@ -0,0 +1,129 @@
+"""
+LRU-кэш результатов растеризации.
+
+Ключ - (класс стратегии, точки фигуры относительно целочисленного начала).
+Точки округляются так же, как их округляет растеризатор (int(), к нулю), начало -
+первая округленная точка, поэтому фигура, сдвинутая на целое число пикселей,
+дает тот же ключ: кэшированные пиксели просто сдвигаются, алгоритм не запускается.
+"""
+from collections import OrderedDict
+import itertools
+import numpy as np
+from .pixelStream import iter_chunks
+
+
+class RasterCache:
+    """
+    Кэш пикселей фигур с ограничениями по числу записей и по суммарному числу пикселей.
+
+    Кэшируются только стратегии с translation_invariant = True: целочисленные
+    алгоритмы (Брезенхем, окружность, эллипс), которые сначала округляют точки
+    через int(). ЦДА и Ву считают в плавающей точке и при сдвиге дают другие
+    пиксели, поэтому кэш их не хранит.
+    """
+
+    def __init__(self, max_entries=512, max_pixels=1 << 21, max_item_pixels=1 << 16):
+        self.max_entries = max_entries          # Maximum number of cached shapes
+        self.max_pixels = max_pixels            # Maximum pixels stored over all entries
+        self.max_item_pixels = max_item_pixels  # Larger shapes are not cached at all
+        self._entries = OrderedDict() # key -> (coords (M, 2) int32, intensities (M,) float or None)
+        self._pixels = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, strategy, points):
+        # The rasterizers see only int(x), int(y) (truncation toward zero, not floor):
+        # equal truncated points relative to the first one give the same pixels
+        snapped = [(int(x), int(y)) for x, y in points]
+        ox, oy = snapped[0]
+        relative = tuple((x - ox, y - oy) for x, y in snapped)
+        return (type(strategy), relative), np.array([ox, oy], dtype=np.int64)
+
+    def lookup(self, strategy, points, compute, viewport=None, margin=0, bbox=None):
+        """
+        Пиксели фигуры из кэша или из compute(points).
+
+        Args:
+            strategy: стратегия растеризации (часть ключа).
+            points: точки фигуры [(x, y), ...].
+            compute: функция points -> поток (x, y, intensity) без отсечения.
+            viewport: (xmin, ymin, xmax, ymax) - пиксели вне него отбрасываются.
+            margin: запас вокруг viewport в пикселях.
+            bbox: (xmin, ymin, xmax, ymax) фигуры. Если фигура выходит за viewport с
+                запасом, при промахе она не растеризуется целиком: возвращается None,
+                и вызывающий рисует ее с отсечением.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray] | None: координаты (M, 2) и интенсивности (M,)
+            или None, если фигура слишком велика для кэша или выходит за viewport.
+        """
+        if not getattr(strategy, "translation_invariant", False):
+            return None
+        key, origin = self._key(strategy, points)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        else:
+            self.misses += 1
+            if viewport is not None and bbox is not None and not self._within(bbox, viewport, margin):
+                return None # Off-screen pixels would be rasterized only to be thrown away
+            entry = self._compute(compute, points, origin)
+            if entry is None:
+                return None
+            self._store(key, entry)
+
+        relative, intensities = entry
+        coords = relative + origin
+        intensities = np.ones(len(coords)) if intensities is None else intensities
+        if viewport is not None:
+            xmin, ymin, xmax, ymax = viewport
+            inside = ((coords[:, 0] >= xmin - margin) & (coords[:, 0] <= xmax + margin) &
+                      (coords[:, 1] >= ymin - margin) & (coords[:, 1] <= ymax + margin))
+            coords, intensities = coords[inside], intensities[inside]
+        return coords, intensities
+
+    @staticmethod
+    def _within(bbox, viewport, margin):
+        xmin, ymin, xmax, ymax = viewport
+        return (bbox[0] >= xmin - margin and bbox[1] >= ymin - margin and
+                bbox[2] <= xmax + margin and bbox[3] <= ymax + margin)
+
+    def _compute(self, compute, points, origin):
+        # Stop reading the stream as soon as the shape is known to be too large
+        limit = self.max_item_pixels
+        chunks = list(iter_chunks(itertools.islice(compute(points), limit + 1)))
+        count = sum(len(coords) for coords, _ in chunks)
+        if count > limit:
+            return None
+        if chunks:
+            coords = np.concatenate([c for c, _ in chunks])
+            intensities = np.concatenate([i for _, i in chunks])
+        else:
+            coords, intensities = np.zeros((0, 2), dtype=np.int64), np.zeros(0)
+        relative = (coords - origin).astype(np.int32)
+        relative.flags.writeable = False
+        if np.all(intensities == 1.0):
+            intensities = None # Solid shapes do not need the intensity array
+        else:
+            intensities.flags.writeable = False
+        return relative, intensities
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._pixels += len(entry[0])
+        while self._entries and (len(self._entries) > self.max_entries or self._pixels > self.max_pixels):
+            _, (relative, _) = self._entries.popitem(last=False)
+            self._pixels -= len(relative)
+            self.evictions += 1
+
+    def clear(self):
+        """Очищает кэш (счетчики сохраняются)."""
+        self._entries.clear()
+        self._pixels = 0
+
+    def stats(self):
+        """Счетчики кэша: попадания, промахи, вытеснения, число записей и пикселей."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self._entries), "pixels": self._pixels}
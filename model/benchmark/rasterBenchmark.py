@@ -0,0 +1,254 @@
+"""
+Бенчмарк стратегий растеризации без окна Tk.
+
+Каждая стратегия прогоняется на стандартных нагрузках через записывающую
+заглушку Canvas, через буфер кадра (FrameBuffer) и, для отрезков, окружностей
+и эллипсов, через пакетный execute_many. Для каждого прогона выводятся
+пиксели в секунду, число созданных элементов Canvas и пиковая память (tracemalloc).
+
+Запуск:
+    python -m model.benchmark.rasterBenchmark
+    python -m model.benchmark.rasterBenchmark --save baseline.json
+    python -m model.benchmark.rasterBenchmark --compare baseline.json
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import numpy as np
+from model.algorithms.algorithmsLine import DDAStrategy, BresenhamStrategy, DoubleStepBresenhamStrategy, WuStrategy
+from model.algorithms.algorithmsSecondOrderLine import (BresenhamCircleStrategy, BresenhamEllipseStrategy,
+                                                        BresenhamHyperbolaStrategy, BresenhamParabolaStrategy)
+from model.framebuffer import FrameBuffer
+
+WIDTH, HEIGHT = 800, 600 # Size of the imaginary canvas
+
+
+class RecordingCanvas:
+    """Заглушка tk.Canvas: считает созданные элементы вместо рисования."""
+    def __init__(self):
+        self.items = 0
+        self.tags = set()
+
+    def _create(self, *args, **kwargs):
+        self.items += 1
+        tags = kwargs.get("tags")
+        if tags:
+            self.tags.update([tags] if isinstance(tags, str) else tags)
+        return self.items
+
+    create_rectangle = create_line = create_oval = create_polygon = _create
+
+    def delete(self, *args):
+        pass
+
+
+# --- Нагрузки ---
+
+def _line_workloads(rng):
+    """Наборы отрезков [(a, b), ...] по именам нагрузок."""
+    def random_point():
+        return [rng.randint(0, WIDTH - 1), rng.randint(0, HEIGHT - 1)]
+
+    short_lines = []
+    for _ in range(1000):
+        a = random_point()
+        short_lines.append((a, [a[0] + rng.randint(-8, 8), a[1] + rng.randint(-8, 8)]))
+
+    long_lines = [([rng.randint(0, 50), rng.randint(0, HEIGHT - 1)],
+                   [rng.randint(WIDTH - 50, WIDTH - 1), rng.randint(0, HEIGHT - 1)]) for _ in range(100)]
+
+    # 16 directions per octant around the canvas center
+    center = [WIDTH // 2, HEIGHT // 2]
+    octants = []
+    for i in range(8 * 16):
+        angle = 2 * math.pi * (i + 0.5) / (8 * 16)
+        octants.append((center, [round(center[0] + 280 * math.cos(angle)), round(center[1] + 280 * math.sin(angle))]))
+
+    random_segments = [(random_point(), random_point()) for _ in range(1000)]
+    return {"short_lines": short_lines, "long_lines": long_lines,
+            "octants": octants, "random_segments": random_segments}
+
+def _curve_workloads():
+    """Наборы точек кривых второго порядка по именам нагрузок."""
+    cx, cy = WIDTH // 2, HEIGHT // 2
+    circles = [([cx, cy], [cx + r, cy], None) for r in range(1, 281, 2)]
+    ellipses = [([cx, cy], [cx + r, cy], [cx, cy + r // 2 + 1]) for r in range(1, 281, 4)]
+    hyperbolas = [([cx, cy], [cx + r, cy], [cx, cy + r // 2 + 1]) for r in range(5, 100, 5)]
+    # Vertex, focus above/below it, and a point that sets the width
+    parabolas = [([cx, cy], [cx, cy + r // 4 + 1], [cx + r, cy]) for r in range(5, 200, 5)]
+    return {"circles": circles, "ellipses": ellipses, "hyperbolas": hyperbolas, "parabolas": parabolas}
+
+LINE_STRATEGIES = [DDAStrategy, BresenhamStrategy, DoubleStepBresenhamStrategy, WuStrategy]
+CURVE_STRATEGIES = {
+    BresenhamCircleStrategy: "circles",
+    BresenhamEllipseStrategy: "ellipses",
+    BresenhamHyperbolaStrategy: "hyperbolas",
+    BresenhamParabolaStrategy: "parabolas",
+}
+BATCH_CURVES = ("circles", "ellipses") # Workloads with a vectorized execute_many
+
+
+# --- Прогоны ---
+
+def _run_lines(strategy, lines, target):
+    """Один прогон отрезков; возвращает число созданных элементов Canvas."""
+    if target == "batch":
+        strategy.execute_many(np.array([a + b for a, b in lines], dtype=float))
+        return 0
+    canvas = RecordingCanvas() if target == "canvas" else FrameBuffer(WIDTH, HEIGHT)
+    viewport = (0, 0, WIDTH, HEIGHT)
+    for a, b in lines:
+        strategy.execute(a, b, canvas, viewport=viewport)
+    if target == "canvas":
+        return canvas.items
+    canvas.render()
+    return 0
+
+def _run_curves(strategy, shapes, target):
+    if target == "batch":
+        centers = np.array([center for center, _, _ in shapes], dtype=float)
+        # Circles have no third point: ry = rx
+        radii = np.array([[abs(p2[0] - c[0]), abs(p3[1] - c[1]) if p3 else abs(p2[0] - c[0])]
+                          for c, p2, p3 in shapes], dtype=float)
+        strategy.execute_many(centers, radii)
+        return 0
+    canvas = RecordingCanvas() if target == "canvas" else FrameBuffer(WIDTH, HEIGHT)
+    for center, point2, point3 in shapes:
+        strategy.execute(center, point2, point3, canvas)
+    if target == "canvas":
+        return canvas.items
+    canvas.render()
+    return 0
+
+def _measure(run, repeat):
+    """Лучшее время из repeat прогонов, число элементов и пиковая память (отдельный прогон)."""
+    best = float("inf")
+    items = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = run()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, items, peak
+
+def run_benchmarks(repeat=3, seed=0, quick=False):
+    """
+    Прогоняет все стратегии на всех нагрузках.
+
+    Args:
+        repeat: число повторов (берется лучшее время).
+        seed: зерно генератора нагрузок.
+        quick: уменьшенные нагрузки (в 10 раз меньше фигур).
+
+    Returns:
+        dict: "стратегия/нагрузка/цель" -> {"seconds", "pixels", "pixels_per_sec", "items", "peak_bytes"}.
+    """
+    rng = random.Random(seed)
+    line_workloads = _line_workloads(rng)
+    curve_workloads = _curve_workloads()
+    if quick:
+        line_workloads = {name: lines[::10] or lines for name, lines in line_workloads.items()}
+        curve_workloads = {name: shapes[::10] or shapes for name, shapes in curve_workloads.items()}
+
+    results = {}
+    for strategy_class in LINE_STRATEGIES:
+        strategy = strategy_class()
+        for name, lines in line_workloads.items():
+            viewport = (0, 0, WIDTH, HEIGHT)
+            pixels = sum(1 for a, b in lines for _ in strategy.iter_pixels(a, b, viewport))
+            for target in ("canvas", "framebuffer", "batch"):
+                seconds, items, peak = _measure(lambda: _run_lines(strategy, lines, target), repeat)
+                results[f"{strategy_class.__name__}/{name}/{target}"] = _result(seconds, pixels, items, peak)
+
+    for strategy_class, name in CURVE_STRATEGIES.items():
+        strategy = strategy_class()
+        shapes = curve_workloads[name]
+        pixels = sum(1 for shape in shapes for _ in strategy.iter_pixels(*shape))
+        targets = ("canvas", "framebuffer", "batch") if name in BATCH_CURVES else ("canvas", "framebuffer")
+        for target in targets:
+            seconds, items, peak = _measure(lambda: _run_curves(strategy, shapes, target), repeat)
+            results[f"{strategy_class.__name__}/{name}/{target}"] = _result(seconds, pixels, items, peak)
+    return results
+
+def _result(seconds, pixels, items, peak):
+    return {"seconds": seconds, "pixels": pixels,
+            "pixels_per_sec": pixels / seconds if seconds > 0 else float("inf"),
+            "items": items, "peak_bytes": peak}
+
+
+# --- Отчет и базовые значения ---
+
+def print_report(results, baseline=None):
+    """Печатает таблицу результатов (и отношение к базовым значениям, если они есть)."""
+    header = f"{'benchmark':58} {'Mpix/s':>9} {'items':>9} {'peak KiB':>10}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    for key, result in results.items():
+        line = (f"{key:58} {result['pixels_per_sec'] / 1e6:9.3f} {result['items']:9d} "
+                f"{result['peak_bytes'] / 1024:10.1f}")
+        if baseline and baseline.get(key, {}).get("pixels_per_sec"):
+            line += f" {result['pixels_per_sec'] / baseline[key]['pixels_per_sec']:7.2f}x"
+        print(line)
+
+def compare(results, baseline, tolerance=0.10):
+    """
+    Сравнивает с базовыми значениями. Возвращает список регрессий:
+    скорость упала больше чем на tolerance или элементов Canvas стало больше.
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None or base["pixels"] != result["pixels"]:
+            continue # New benchmark or a different workload (e.g. --quick against a full baseline)
+        if result["pixels_per_sec"] < base["pixels_per_sec"] * (1 - tolerance):
+            regressions.append(f"{key}: {base['pixels_per_sec'] / 1e6:.3f} -> {result['pixels_per_sec'] / 1e6:.3f} Mpix/s")
+        if result["items"] > base["items"]:
+            regressions.append(f"{key}: {base['items']} -> {result['items']} canvas items")
+    return regressions
+
+def save_baseline(results, path):
+    data = {"meta": {"python": platform.python_version(), "numpy": np.__version__,
+                     "machine": platform.machine(), "created": time.strftime("%Y-%m-%d %H:%M:%S")},
+            "results": results}
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)["results"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк стратегий растеризации")
+    parser.add_argument("--save", metavar="JSON", help="сохранить результаты как базовые значения")
+    parser.add_argument("--compare", metavar="JSON", help="сравнить с базовыми значениями")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="допустимое замедление (доля)")
+    parser.add_argument("--repeat", type=int, default=3, help="число повторов каждого прогона")
+    parser.add_argument("--quick", action="store_true", help="уменьшенные нагрузки")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(repeat=args.repeat, quick=args.quick)
+    baseline = load_baseline(args.compare) if args.compare else None
+    print_report(results, baseline)
+    if args.save:
+        save_baseline(results, args.save)
+        print(f"Базовые значения сохранены: {args.save}")
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"РЕГРЕССИЯ: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
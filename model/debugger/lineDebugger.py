@@ -1,11 +1,21 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from model.algorithms.algorithmsLine import DDAStrategy, BresenhamStrategy, WuStrategy
+from model.algorithms.algorithmsLine import DDAStrategy, BresenhamStrategy, DoubleStepBresenhamStrategy, WuStrategy
 from model.algorithms.algorithmsSecondOrderLine import (
     BresenhamEllipseStrategy, BresenhamCircleStrategy,
-    BresenhamParabolaStrategy, BresenhamHyperbolaStrategy
+    BresenhamParabolaStrategy, BresenhamHyperbolaStrategy,
+    WuCircleStrategy, WuEllipseStrategy
 )
 
+SECOND_ORDER_STRATEGIES = {
+    "Окружность": BresenhamCircleStrategy,
+    "Эллипс": BresenhamEllipseStrategy,
+    "Окружность (Ву)": WuCircleStrategy,
+    "Эллипс (Ву)": WuEllipseStrategy,
+    "Парабола": BresenhamParabolaStrategy,
+    "Гипербола": BresenhamHyperbolaStrategy
+}
+
 
 class Debugger:
     def __init__(self, root):
@@ -61,7 +71,7 @@ class Debugger:
         frame.pack(fill=tk.X, padx=10, pady=5)
 
         tk.Label(frame, text="Алгоритм:").grid(row=0, column=0, sticky="w")
-        algorithm_menu = ttk.Combobox(frame, values=self.get_algorithm_list(mode))
+        algorithm_menu = ttk.Combobox(frame, values=self.get_algorithm_list(mode), state="readonly")
         algorithm_menu.current(0)
         algorithm_menu.grid(row=0, column=1, padx=5)
         algorithm_menu.bind("<<ComboboxSelected>>", lambda event: self.set_algorithm(event, mode))
@@ -83,7 +93,7 @@ class Debugger:
             self.second_step_button = step_button
 
     def get_algorithm_list(self, mode):
-        return ["ЦДА", "Брезенхем", "Ву"] if mode == "Линия" else ["Окружность", "Эллипс", "Парабола", "Гипербола"]
+        return ["ЦДА", "Брезенхем", "Брезенхем (двойной шаг)", "Ву"] if mode == "Линия" else list(SECOND_ORDER_STRATEGIES)
 
     def create_coordinate_inputs(self, frame, mode):
         labels = ["X1", "Y1", "X2", "Y2"] if mode == "Линия" else ["X1", "Y1", "X2", "Y2", "X3", "Y3"]
@@ -108,8 +118,11 @@ class Debugger:
             self.line_algorithm = self.line_algorithm_menu.get()
         else:
             self.second_algorithm = self.second_algorithm_menu.get()
+            strategy_class = SECOND_ORDER_STRATEGIES.get(self.second_algorithm)
+            if strategy_class is None:
+                return
 
-            if self.second_algorithm == "Окружность":
+            if strategy_class.required_points == 2:
                 self.second_inputs["X3"].grid_remove()
                 self.second_inputs["Y3"].grid_remove()
             else:
@@ -129,7 +142,8 @@ class Debugger:
             messagebox.showerror("Ошибка", "Введите корректные числовые значения!")
             return
 
-        strategy_class = {"ЦДА": DDAStrategy, "Брезенхем": BresenhamStrategy, "Ву": WuStrategy}.get(self.line_algorithm)
+        strategy_class = {"ЦДА": DDAStrategy, "Брезенхем": BresenhamStrategy,
+                          "Брезенхем (двойной шаг)": DoubleStepBresenhamStrategy, "Ву": WuStrategy}.get(self.line_algorithm)
         if strategy_class:
             strategy = strategy_class()
             strategy.execute([x1, y1], [x2, y2], canvas=None, debugger=self)
@@ -143,30 +157,27 @@ class Debugger:
         self.second_steps = []
         self.second_step_index = 0
 
+        strategy_class = SECOND_ORDER_STRATEGIES.get(self.second_algorithm)
+        if strategy_class is None:
+            messagebox.showerror("Ошибка", f"Неизвестный алгоритм: {self.second_algorithm}")
+            return
+
         try:
             point1 = (int(self.second_inputs["X1"].get()), int(self.second_inputs["Y1"].get()))
             point2 = (int(self.second_inputs["X2"].get()), int(self.second_inputs["Y2"].get()))
             point3 = None
-            if self.second_algorithm != "Окружность":
+            if strategy_class.required_points == 3:
                 point3 = (int(self.second_inputs["X3"].get()), int(self.second_inputs["Y3"].get()))
         except ValueError:
             messagebox.showerror("Ошибка", "Введите корректные числовые значения!")
             return
 
-        strategy_class = {
-            "Окружность": BresenhamCircleStrategy,
-            "Эллипс": BresenhamEllipseStrategy,
-            "Парабола": BresenhamParabolaStrategy,
-            "Гипербола": BresenhamHyperbolaStrategy
-        }.get(self.second_algorithm)
-
-        if strategy_class:
-            strategy = strategy_class()
-            strategy.execute(point1, point2, point3, canvas=None, debugger=self)
-            if self.second_steps:
-                self.second_step_button.config(state=tk.NORMAL)
-            else:
-                self.second_step_button.config(state=tk.DISABLED)
+        strategy = strategy_class()
+        strategy.execute(point1, point2, point3, canvas=None, debugger=self)
+        if self.second_steps:
+            self.second_step_button.config(state=tk.NORMAL)
+        else:
+            self.second_step_button.config(state=tk.DISABLED)
 
     def draw_grid(self, canvas):
         for x in range(0, self.canvas_size, self.cell_size):
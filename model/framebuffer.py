@@ -0,0 +1,203 @@
+import numpy as np
+
+
+class FrameBuffer:
+    """Растровый буфер кадра на NumPy (RGB + альфа, uint8).
+
+    Стратегии растеризации пишут сюда пиксели вместо create_rectangle,
+    а на холст кадр выводится одним изображением (см. CanvasView.blit).
+    Пиксели хранятся по тегам фигур, поэтому delete(tag) работает так же,
+    как canvas.delete(tag).
+
+    Непрозрачные пиксели при наложении берут самый темный тон (как элементы Canvas),
+    а пиксели покрытия (blend=True, сглаженные линии Ву) смешиваются:
+    покрытие накапливается в float-буфере пропускания и накладывается один раз за кадр.
+
+    Слои, пережившие хотя бы один кадр, сведены в кэшированную основу, поэтому кадр
+    с превью (нарисовать - удалить - нарисовать снова) пересобирает только новые слои.
+    """
+
+    def __init__(self, width, height, background=(255, 255, 255)):
+        self.width = max(1, int(width))
+        self.height = max(1, int(height))
+        self.background = np.array(background, dtype=np.uint8)
+        self.pixels = np.zeros((self.height, self.width, 4), dtype=np.uint8) # RGB + alpha
+        self._layers = {} # tag -> {"xs": [...], "ys": [...], "alpha": [...], "chunks": [...], "rects": [...], "coverage": [...]}
+        self._dirty = True
+        # Composite of the settled layers: opaque alpha (H, W) and coverage transmittance (H, W) or None
+        self._base_alpha = None # None - rebuild on the next render
+        self._base_transmittance = None
+        self._base_tags = set() # Layers included in the base
+        self._fresh = set() # Layers changed since the last render (kept out of the base)
+
+    # --- Запись пикселей ---
+
+    def _layer(self, tag):
+        """Слой тега для записи: он становится свежим (а основа с ним - устаревшей)."""
+        self._touch(tag)
+        layer = self._layers.get(tag)
+        if layer is None:
+            layer = {"xs": [], "ys": [], "alpha": [], "chunks": [], "rects": [], "coverage": []}
+            self._layers[tag] = layer
+        return layer
+
+    def _touch(self, tag):
+        if tag in self._base_tags:
+            self._base_alpha = None # Changed pixels of a settled layer: rebuild the base without it
+        self._fresh.add(tag)
+        self._dirty = True
+
+    def plot(self, x, y, intensity=1.0, tag=None):
+        """Записывает один пиксель. intensity=1.0 - черный, 0.0 - прозрачный."""
+        layer = self._layer(tag)
+        layer["xs"].append(int(x))
+        layer["ys"].append(int(y))
+        # Same gray level as the canvas path: int(255 * (1 - intensity))
+        layer["alpha"].append(255 - int(255 * (1 - intensity)))
+        self._dirty = True
+
+    def plot_many(self, xs, ys, intensities=None, tag=None, blend=False):
+        """
+        Записывает массив пикселей за один вызов.
+
+        blend=True - интенсивности считаются покрытием пикселя и смешиваются
+        с остальными фигурами (1 - (1 - c1) * (1 - c2) ...), а не перекрывают их.
+        """
+        xs = np.asarray(xs, dtype=np.int64).ravel()
+        ys = np.asarray(ys, dtype=np.int64).ravel()
+        if blend:
+            coverage = np.ones(xs.shape) if intensities is None else np.asarray(intensities, dtype=float).ravel()
+            self._layer(tag)["coverage"].append((xs, ys, np.clip(coverage, 0.0, 1.0)))
+            self._dirty = True
+            return
+        if intensities is None:
+            alpha = np.full(xs.shape, 255, dtype=np.uint8)
+        else:
+            intensities = np.clip(np.asarray(intensities, dtype=float).ravel(), 0.0, 1.0)
+            alpha = (255 - (255 * (1 - intensities)).astype(np.int64)).astype(np.uint8)
+        self._layer(tag)["chunks"].append((xs, ys, alpha))
+        self._dirty = True
+
+    def fill_rect(self, x0, y0, x1, y1, intensity=1.0, tag=None):
+        """Закрашивает прямоугольник пикселей [x0..x1] x [y0..y1] (включительно) - прогон/спан."""
+        x0, x1 = sorted((int(x0), int(x1)))
+        y0, y1 = sorted((int(y0), int(y1)))
+        self._layer(tag)["rects"].append((x0, y0, x1, y1, 255 - int(255 * (1 - intensity))))
+        self._dirty = True
+
+    def fill_span(self, x_start, x_end, y, intensity=1.0, tag=None):
+        """Закрашивает горизонтальный спан (x_start..x_end, y)."""
+        self.fill_rect(x_start, y, x_end, y, intensity, tag)
+
+    def delete(self, tag):
+        """Удаляет все пиксели фигуры с тегом tag."""
+        if self._layers.pop(tag, None) is not None:
+            if tag in self._base_tags:
+                self._base_alpha = None
+            self._fresh.discard(tag) # A preview deleted before the next frame never reaches the base
+            self._dirty = True
+
+    def clear(self):
+        """Очищает буфер полностью."""
+        self._layers = {}
+        self._fresh = set()
+        self._base_alpha = None
+        self._dirty = True
+
+    def resize(self, width, height):
+        """Меняет размер буфера, сохраняя нарисованные фигуры."""
+        width, height = max(1, int(width)), max(1, int(height))
+        if (width, height) == (self.width, self.height):
+            return
+        self.width, self.height = width, height
+        self.pixels = np.zeros((height, width, 4), dtype=np.uint8)
+        self._base_alpha = None
+        self._dirty = True
+
+    # --- Сборка кадра ---
+
+    def _layer_arrays(self, layer):
+        """Сводит отложенные списки слоя в один набор массивов."""
+        if layer["xs"]:
+            layer["chunks"].append((np.array(layer["xs"], dtype=np.int64),
+                                    np.array(layer["ys"], dtype=np.int64),
+                                    np.array(layer["alpha"], dtype=np.uint8)))
+            layer["xs"], layer["ys"], layer["alpha"] = [], [], []
+        if len(layer["chunks"]) > 1:
+            xs, ys, alpha = zip(*layer["chunks"])
+            layer["chunks"] = [(np.concatenate(xs), np.concatenate(ys), np.concatenate(alpha))]
+        return layer["chunks"][0] if layer["chunks"] else None
+
+    def render(self):
+        """
+        Собирает RGBA-кадр (только если что-то изменилось): свежие слои накладываются
+        на кэшированную основу, слои предыдущего кадра сначала добавляются в основу.
+        """
+        if not self._dirty:
+            return self.pixels
+        if self._base_alpha is None:
+            self._base_tags = set(self._layers) - self._fresh
+            self._base_alpha = np.zeros((self.height, self.width), dtype=np.uint8)
+            self._base_transmittance = self._composite(self._base_tags, self._base_alpha, None)
+        else:
+            # Layers that survived the previous frame are settled now
+            settled = set(self._layers) - self._base_tags - self._fresh
+            self._base_tags |= settled
+            self._base_transmittance = self._composite(settled, self._base_alpha, self._base_transmittance)
+        alpha = self._base_alpha.copy()
+        transmittance = self._base_transmittance
+        fresh = self._fresh & set(self._layers)
+        if any(self._layers[tag]["coverage"] for tag in fresh):
+            transmittance = np.ones((self.height, self.width)) if transmittance is None else transmittance.copy()
+        transmittance = self._composite(fresh, alpha, transmittance)
+        if transmittance is not None:
+            # Composite the coverage once: the opaque strokes let (255 - alpha) / 255 through
+            alpha = (255 - ((255 - alpha) * transmittance).astype(np.int64)).astype(np.uint8)
+        self.pixels[..., :3] = 0 # All strokes are black
+        self.pixels[..., 3] = alpha
+        self._fresh = set()
+        self._dirty = False
+        return self.pixels
+
+    def _composite(self, tags, alpha, transmittance):
+        """
+        Накладывает слои tags на alpha (на месте) и на transmittance.
+
+        Returns:
+            np.ndarray | None: массив пропускания (H, W) - transmittance, измененный
+            на месте, новый (если его не было, а у слоев есть покрытие) или None.
+        """
+        for tag in tags:
+            layer = self._layers[tag]
+            # Spans are written with one slice assignment each
+            for x0, y0, x1, y1, a in layer["rects"]:
+                x0, y0 = max(x0, 0), max(y0, 0)
+                x1, y1 = min(x1, self.width - 1), min(y1, self.height - 1)
+                if x0 <= x1 and y0 <= y1:
+                    block = alpha[y0:y1 + 1, x0:x1 + 1]
+                    np.maximum(block, a, out=block)
+            arrays = self._layer_arrays(layer)
+            if arrays is not None:
+                xs, ys, a = arrays
+                inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+                # Overlapping pixels keep the darkest value, like stacked canvas items
+                np.maximum.at(alpha, (ys[inside], xs[inside]), a[inside])
+            for xs, ys, coverage in layer["coverage"]:
+                if transmittance is None:
+                    transmittance = np.ones((self.height, self.width))
+                inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+                # Each coverage sample lets through (1 - c) of what is below it
+                np.multiply.at(transmittance, (ys[inside], xs[inside]), 1 - coverage[inside])
+        return transmittance
+
+    def to_rgb(self):
+        """Накладывает кадр на цвет фона и возвращает RGB-массив (H, W, 3)."""
+        rgba = self.render()
+        a = rgba[..., 3:4].astype(np.uint16)
+        rgb = (self.background.astype(np.uint16) * (255 - a) + rgba[..., :3] * a) // 255
+        return rgb.astype(np.uint8)
+
+    def to_ppm(self):
+        """Кодирует кадр в PPM (P6) для tk.PhotoImage."""
+        header = f"P6 {self.width} {self.height} 255\n".encode("ascii")
+        return header + self.to_rgb().tobytes()
@@ -0,0 +1,156 @@
+import math
+import random
+
+import pytest
+
+from model.algorithms.algorithmsSecondOrderLine import (BresenhamEllipseStrategy, FilledEllipseStrategy,
+                                                        BresenhamHyperbolaStrategy, BresenhamParabolaStrategy)
+from model.algorithms.conicTracer import (conic_frame, ellipse_outline, hyperbola_branches, parabola_branches,
+                                          iter_ellipse)
+
+
+def _components(pixels):
+    """Число 8-связных компонент множества пикселей."""
+    pixels = set(pixels)
+    seen = set()
+    count = 0
+    for start in pixels:
+        if start in seen:
+            continue
+        count += 1
+        stack = [start]
+        seen.add(start)
+        while stack:
+            x, y = stack.pop()
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    neighbour = (x + dx, y + dy)
+                    if neighbour in pixels and neighbour not in seen:
+                        seen.add(neighbour)
+                        stack.append(neighbour)
+    return count
+
+
+@pytest.mark.parametrize("rx, ry, angle", [(40, 3, 0), (40, 3, 30), (150, 2, 45), (90, 6, 100)])
+def test_thin_ellipse_is_connected(rx, ry, angle):
+    assert _components((x, y) for x, y, _ in iter_ellipse((0, 0), rx, ry, angle)) == 1
+
+
+def test_random_ellipses_are_connected():
+    rng = random.Random(7)
+    for _ in range(200):
+        rx, ry = rng.randint(30, 150), rng.randint(2, 6)
+        center = (rng.randint(-50, 50), rng.randint(-50, 50))
+        pixels = [(x, y) for x, y, _ in iter_ellipse(center, rx, ry, rng.uniform(0, 360))]
+        assert _components(pixels) == 1
+
+
+def _has_no_gaps(pixels):
+    """Замкнутый контур без разрывов: одна 8-связная компонента, у каждого пикселя не меньше двух соседей."""
+    pixels = set(pixels)
+    for x, y in pixels:
+        neighbours = sum((x + dx, y + dy) in pixels for dx in (-1, 0, 1) for dy in (-1, 0, 1)) - 1
+        if neighbours < 2:
+            return False
+    return _components(pixels) == 1
+
+
+def _rotated_points(center, rx, ry, angle):
+    u, v = conic_frame(angle)
+    return (center, (center[0] + rx * u[0], center[1] + rx * u[1]),
+            (center[0] + ry * v[0], center[1] + ry * v[1]))
+
+
+def test_rotated_ellipse_outlines_have_no_gaps():
+    rng = random.Random(16)
+    strategy = BresenhamEllipseStrategy()
+    for _ in range(300):
+        rx, ry = rng.uniform(3, 200), rng.uniform(3, 200)
+        angle = rng.choice([rng.uniform(-360, 360), 90 * rng.randint(-4, 4), 45, 135])
+        center = (rng.randint(-50, 50), rng.randint(-50, 50))
+        pixels = [(x, y) for x, y, _ in strategy.iter_rotated_pixels(*_rotated_points(center, rx, ry, angle), angle)]
+        assert _has_no_gaps(pixels), (rx, ry, angle)
+
+
+def test_ellipse_outline_cache_returns_same_pixels():
+    ellipse_outline.cache_clear()
+    first = [(x, y) for x, y, _ in iter_ellipse((10, 20), 80.5, 31.25, 37)]
+    second = [(x, y) for x, y, _ in iter_ellipse((-40, 7), 80.5, 31.25, 37)]
+    assert ellipse_outline.cache_info().hits == 1
+    assert second == [(x - 50, y - 13) for x, y in first]
+
+
+def test_ellipse_outline_cache_ignores_float_noise():
+    ellipse_outline.cache_clear()
+    first = list(iter_ellipse((10, 20), 80.5, 31.25, 37))
+    # Axes recovered from transformed points are off in the last bits
+    second = list(iter_ellipse((10, 20), 80.5 + 1e-9, 31.25 - 1e-9, 37 + 360 + 1e-7))
+    assert ellipse_outline.cache_info().hits == 1
+    assert first == second
+
+
+@pytest.mark.parametrize("strategy, cache, swap", [
+    (BresenhamHyperbolaStrategy(), hyperbola_branches, False),
+    (BresenhamParabolaStrategy(), parabola_branches, True), # The focus lies on the v axis
+])
+def test_open_branches_are_cached(strategy, cache, swap):
+    cache.cache_clear()
+    viewport = (0, 0, 800, 600)
+    center, along_u, along_v = _rotated_points((400, 300), 60, 25, 33)
+    points = (center, along_v, along_u) if swap else (center, along_u, along_v)
+    first = [(x, y) for x, y, _ in strategy.iter_rotated_pixels(*points, 33, viewport)]
+    # The same shape moved by whole pixels together with the viewport, with float noise in the points
+    moved = [(x + 17 + 1e-10, y - 5) for x, y in points]
+    second = [(x, y) for x, y, _ in strategy.iter_rotated_pixels(*moved, 33 + 1e-9, (17, -5, 817, 595))]
+    assert first
+    assert cache.cache_info().hits == 1
+    assert second == [(x + 17, y - 5) for x, y in first]
+
+
+def test_rotated_filled_ellipse_covers_its_area():
+    rng = random.Random(61)
+    strategy = FilledEllipseStrategy()
+    outline = BresenhamEllipseStrategy()
+    for _ in range(100):
+        rx, ry = rng.uniform(4, 120), rng.uniform(4, 120)
+        angle = rng.uniform(0, 360)
+        points = _rotated_points((0, 0), rx, ry, angle)
+        filled = {(x, y) for x, y, _ in strategy.iter_rotated_pixels(*points, angle)}
+        assert abs(len(filled) - math.pi * rx * ry) <= 2 * math.pi * (rx + ry) / 2
+        # Every row is one span and the outline hugs the fill
+        rows = {}
+        for x, y in filled:
+            rows.setdefault(y, []).append(x)
+        assert all(max(xs) - min(xs) + 1 == len(xs) for xs in rows.values())
+        for x, y, _ in outline.iter_rotated_pixels(*points, angle):
+            assert any((x + dx, y + dy) in filled for dx in (-1, 0, 1) for dy in (-1, 0, 1)), (rx, ry, angle)
+
+
+@pytest.mark.parametrize("angle", [90, 180, 270])
+def test_quarter_turn_filled_ellipse_matches_axis_aligned(angle):
+    strategy = FilledEllipseStrategy()
+    rx, ry = (25, 60) if angle % 180 else (60, 25)
+    expected = sorted(strategy.iter_spans((100, 100), (100 + rx, 100), (100, 100 + ry)))
+    points = _rotated_points((100, 100), 60, 25, angle)
+    assert sorted(strategy.iter_rotated_spans(*points, angle)) == expected
+
+
+@pytest.mark.parametrize("angle", [90, 180, 270, -90, 450, 90 + 1e-12])
+def test_quarter_turns_use_axis_aligned_offsets(angle):
+    strategy = BresenhamEllipseStrategy()
+    rx, ry = 60, 25
+    if round(angle / 90) % 2:
+        rx, ry = ry, rx # The axes swap places after an odd quarter turn
+    expected = sorted((x, y) for x, y, _ in strategy.iter_pixels((100, 100), (100 + rx, 100), (100, 100 + ry)))
+    points = _rotated_points((100, 100), 60, 25, angle)
+    assert sorted((x, y) for x, y, _ in strategy.iter_rotated_pixels(*points, angle)) == sorted(set(expected))
+
+
+def test_quarter_turn_respects_viewport():
+    strategy = BresenhamEllipseStrategy()
+    viewport = (0, 0, 100, 100)
+    pixels = [(x, y) for x, y, _ in strategy.iter_rotated_pixels(*_rotated_points((100, 100), 60, 25, 90), 90,
+                                                                  viewport)]
+    margin = strategy.VIEWPORT_MARGIN
+    assert pixels
+    assert all(-margin <= x <= 100 + margin and -margin <= y <= 100 + margin for x, y in pixels)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from model.algorithms.algorithmsCurves import (NurbsCurve, BezierCurve, CurveContext, CompositeBSpline,
+                                               CatmullRomSpline, BezierChain, evaluate_segments)
+
+
+def test_nurbs_evaluate_many_matches_evaluate():
+    rng = np.random.default_rng(0)
+    controls = rng.uniform(0, 300, (5, 6, 2))
+    weights = rng.uniform(0.3, 3.0, 6)
+    strategy = NurbsCurve()
+    batch = strategy.evaluate_many(controls, 101, weights)
+    assert batch.shape == (5, 101, 2)
+    for control, curve in zip(controls, batch):
+        assert np.allclose(curve, strategy.evaluate(control, weights, samples=101))
+
+
+def test_nurbs_batch_is_not_a_bezier_batch():
+    controls = np.random.default_rng(1).uniform(0, 300, (3, 6, 2))
+    context = CurveContext()
+    context.set_strategy(NurbsCurve())
+    curves = context.evaluate_many(controls)
+    assert curves.shape == (3, 101, 2)
+    # A clamped curve passes through the first and the last control point
+    assert np.allclose(curves[:, 0], controls[:, 0]) and np.allclose(curves[:, -1], controls[:, -1])
+
+
+def test_nurbs_weight_pulls_curve_to_point():
+    control = np.array([[0, 0], [50, 120], [100, 0], [150, 120], [200, 0]], dtype=float)
+    weights = np.ones(5)
+    weights[2] = 8.0
+    plain = NurbsCurve().evaluate(control)
+    weighted = NurbsCurve().evaluate(control, weights)
+    distance = lambda curve: np.linalg.norm(curve - control[2], axis=1).min()
+    assert distance(weighted) < distance(plain)
+
+
+def test_nurbs_with_four_points_is_cubic_bezier():
+    controls = np.random.default_rng(2).uniform(0, 300, (4, 4, 2))
+    assert np.allclose(NurbsCurve().evaluate_many(controls), BezierCurve().evaluate_many(controls))
+
+
+@pytest.mark.parametrize("strategy, count", [(CompositeBSpline(), 7), (CatmullRomSpline(), 9), (BezierChain(), 10)])
+def test_composite_evaluate_covers_all_segments(strategy, count):
+    control = np.random.default_rng(count).uniform(0, 300, (count, 2))
+    segments = strategy.segment_count(count)
+    steps = 20
+    # Samples that fall on the same t as 20 steps per segment in the shared kernel
+    pieces = evaluate_segments(strategy.M, control[strategy.STRIDE * np.arange(segments)[:, None] + np.arange(4)],
+                               [steps] * segments)
+    expected = np.vstack([pieces[0]] + [piece[1:] for piece in pieces[1:]])
+    assert np.allclose(strategy.evaluate(control, segments * steps + 1), expected)
+    batch = strategy.evaluate_many(np.stack([control, control + 5]), segments * steps + 1)
+    assert np.allclose(batch[0], expected) and np.allclose(batch[1], expected + 5)
+
+
+def test_composite_evaluate_many_rejects_short_polygons():
+    with pytest.raises(ValueError):
+        CompositeBSpline().evaluate_many(np.zeros((2, 3, 2)))
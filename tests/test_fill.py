@@ -0,0 +1,63 @@
+import math
+from collections import defaultdict
+
+import pytest
+
+from model.algorithms.algorithmsFill import ET_AEL_FillStrategy
+
+
+class RectangleCanvas:
+    """Заглушка Canvas: запоминает прямоугольники."""
+    def __init__(self):
+        self.rectangles = []
+
+    def create_rectangle(self, *coords, **options):
+        self.rectangles.append(coords)
+
+
+def _baseline_pixels(polygon_points):
+    """Пиксели исходной заливки ET + AEL (целые вершины, конец спана - floor)."""
+    edge_table = defaultdict(list)
+    n = len(polygon_points)
+    for i in range(n):
+        (x1, y1), (x2, y2) = polygon_points[i], polygon_points[(i + 1) % n]
+        if y1 == y2:
+            continue
+        if y1 > y2:
+            x1, y1, x2, y2 = x2, y2, x1, y1
+        edge_table[y1].append({'y_max': y2, 'x_current': float(x1), 'slope_inv': (x2 - x1) / (y2 - y1)})
+    pixels = set()
+    active_edge_list = []
+    for y in range(min(p[1] for p in polygon_points), max(p[1] for p in polygon_points) + 1):
+        active_edge_list = [edge for edge in active_edge_list if edge['y_max'] > y]
+        active_edge_list.extend(edge_table.get(y, []))
+        active_edge_list.sort(key=lambda edge: edge['x_current'])
+        for i in range(0, len(active_edge_list) - 1, 2):
+            x_start = math.ceil(active_edge_list[i]['x_current'])
+            x_end = math.floor(active_edge_list[i + 1]['x_current'])
+            pixels.update((x, y) for x in range(x_start, x_end + 1))
+        for edge in active_edge_list:
+            edge['x_current'] += edge['slope_inv']
+    return pixels
+
+
+def _filled_pixels(polygon_points):
+    canvas = RectangleCanvas()
+    ET_AEL_FillStrategy().fill(canvas, polygon_points, "#000000")
+    return {(x, y) for x, y, _, _ in canvas.rectangles}
+
+
+@pytest.mark.parametrize("polygon", [
+    [(10, 10), (20, 10), (20, 20), (10, 20)],
+    [(0, 0), (30, 5), (12, 25)],
+    [(5, 5), (40, 8), (25, 20), (45, 40), (8, 30)],
+    [(50, 0), (60, 35), (95, 35), (67, 55), (78, 90), (50, 68), (22, 90), (33, 55), (5, 35), (40, 35)],
+])
+def test_polygon_fill_matches_baseline(polygon):
+    assert _filled_pixels(polygon) == _baseline_pixels(polygon)
+
+
+def test_square_fill_includes_right_column():
+    pixels = _filled_pixels([(10, 10), (20, 10), (20, 20), (10, 20)])
+    assert len(pixels) == 110
+    assert {x for x, _ in pixels} == set(range(10, 21))
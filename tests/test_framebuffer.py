@@ -0,0 +1,73 @@
+import random
+
+import numpy as np
+
+from model.framebuffer import FrameBuffer
+
+
+def _full_render(buffer):
+    """Кадр того же буфера, собранный заново из всех слоев."""
+    buffer._base_alpha = None
+    buffer._fresh = set()
+    buffer._dirty = True
+    return buffer.render().copy()
+
+
+def _draw(buffer, rng, tag):
+    kind = rng.randrange(4)
+    xs = [rng.randint(-10, 90) for _ in range(30)]
+    ys = [rng.randint(-10, 70) for _ in range(30)]
+    if kind == 0:
+        buffer.plot_many(xs, ys, [rng.random() for _ in xs], tag=tag)
+    elif kind == 1:
+        buffer.plot_many(xs, ys, [rng.random() for _ in xs], tag=tag, blend=True)
+    elif kind == 2:
+        buffer.fill_rect(xs[0], ys[0], xs[1], ys[1], rng.random(), tag=tag)
+    else:
+        for x, y in zip(xs, ys):
+            buffer.plot(x, y, tag=tag)
+
+
+def test_incremental_render_matches_full_rebuild():
+    rng = random.Random(1)
+    buffer, reference = FrameBuffer(80, 60), FrameBuffer(80, 60)
+    for step in range(300):
+        tag = f"shape{rng.randrange(12)}"
+        action = rng.random()
+        if action < 0.15:
+            buffer.delete(tag)
+            reference.delete(tag)
+        elif action < 0.2:
+            buffer.delete("preview")
+            reference.delete("preview")
+        else:
+            seed = rng.random()
+            target = "preview" if action < 0.5 else tag
+            _draw(buffer, random.Random(seed), target)
+            _draw(reference, random.Random(seed), target)
+        if step == 150:
+            buffer.resize(90, 50)
+            reference.resize(90, 50)
+        if rng.random() < 0.5:
+            assert np.array_equal(buffer.render(), _full_render(reference))
+
+
+def test_preview_frame_composites_only_the_preview(monkeypatch):
+    buffer = FrameBuffer(200, 200)
+    for i in range(50):
+        buffer.fill_rect(0, i, 199, i, tag=f"shape{i}")
+        buffer.plot_many([i, i + 1], [100, 101], [0.5, 0.5], tag=f"aa{i}", blend=True)
+    buffer.render()
+    buffer.plot(0, 150, tag="preview")
+    buffer.render() # The shapes of the first frame settle into the base
+    composited = []
+    composite = FrameBuffer._composite
+    def recording(self, tags, alpha, transmittance):
+        composited.extend(tags)
+        return composite(self, tags, alpha, transmittance)
+    monkeypatch.setattr(FrameBuffer, "_composite", recording)
+    for frame in range(5):
+        buffer.delete("preview")
+        buffer.plot_many([frame, frame + 10], [150, 150], tag="preview")
+        buffer.render()
+    assert set(composited) == {"preview"}
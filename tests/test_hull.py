@@ -0,0 +1,156 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from model.algorithms import algorithmsPolygon
+from model.algorithms.algorithmsPolygon import (monotone_chain, quickhull, chan, estimate_hull_size,
+                                                AutoHullStrategy, MonotoneChainStrategy,
+                                                QuickhullStrategy, AUTO_SMALL_INPUT)
+
+
+def _reference_hull(points):
+    """Оболочка простой монотонной цепью без NumPy: вершины без коллинеарных, от самой левой-нижней."""
+    pts = sorted(set(map(tuple, points)))
+    if len(pts) < 3:
+        return []
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+    lower, upper = [], []
+    for p in pts:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(pts):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    hull = lower[:-1] + upper[:-1]
+    return hull if len(hull) >= 3 else []
+
+
+def _circle_lattice(r):
+    """Все целые точки окружности x^2 + y^2 = r^2."""
+    points = []
+    for x in range(-r, r + 1):
+        y = math.isqrt(r * r - x * x)
+        if y * y + x * x == r * r:
+            points.extend({(x, y), (x, -y)})
+    return points
+
+
+def _point_sets():
+    rng = random.Random(24)
+    sets = {
+        "triangle": [(0, 0), (10, 0), (0, 10)],
+        "collinear": [(i, 2 * i + 1) for i in range(50)],
+        "collinear_duplicates": [(3, 3)] * 5 + [(i, i) for i in range(-10, 10)] * 2,
+        "all_duplicates": [(7, -2)] * 20,
+        "square_edges": [(x, y) for x in range(11) for y in range(11) if x in (0, 10) or y in (0, 10)],
+        "circle": _circle_lattice(5525),
+        "circle_float": [(1000 * math.cos(2 * math.pi * i / 300), 1000 * math.sin(2 * math.pi * i / 300))
+                         for i in range(300)],
+        "grid": [(x, y) for x in range(30) for y in range(30)],
+    }
+    for i in range(40):
+        n = rng.choice([3, 4, 5, 10, 50, 400])
+        span = rng.choice([3, 20, 1000])
+        points = [(rng.randint(-span, span), rng.randint(-span, span)) for _ in range(n)]
+        points += rng.sample(points, n // 3) # Duplicates
+        if i % 4 == 0: # Collinear points on the hull edges
+            points += [(span + 1, y) for y in range(-span, span + 1, max(1, span // 5))]
+        sets[f"random_{i}"] = points
+    return sets
+
+
+POINT_SETS = _point_sets()
+HULLS = {"monotone_chain": monotone_chain, "quickhull": quickhull, "chan": chan}
+
+
+@pytest.mark.parametrize("hull_name", HULLS)
+@pytest.mark.parametrize("set_name", POINT_SETS)
+def test_hull_matches_reference(hull_name, set_name):
+    points = POINT_SETS[set_name]
+    expected = _reference_hull(points)
+    assert [tuple(points[i]) for i in HULLS[hull_name](points)] == expected
+    # Array input gives the same vertices
+    xy = np.array(points, dtype=float).reshape(-1, 2)
+    assert [tuple(points[i]) for i in HULLS[hull_name](xy)] == expected
+
+
+@pytest.mark.parametrize("set_name", ["circle", "circle_float", "grid", "square_edges",
+                                      "random_0", "random_4", "random_8"])
+def test_chan_restarts_when_hull_outgrows_m(monkeypatch, set_name):
+    # Underestimated h: the first m = 4 is too small and the wrapping has to restart with larger m
+    sizes = []
+    group_hulls = algorithmsPolygon._group_hulls
+    def recording(xy, ids, size):
+        sizes.append(size)
+        return group_hulls(xy, ids, size)
+    monkeypatch.setattr(algorithmsPolygon, "estimate_hull_size", lambda points: 1)
+    monkeypatch.setattr(algorithmsPolygon, "_group_hulls", recording)
+    points = POINT_SETS[set_name]
+    expected = _reference_hull(points)
+    assert [tuple(points[i]) for i in chan(points)] == expected
+    assert sizes[0] == 4
+    if len(expected) > 4:
+        assert len(sizes) > 1
+
+
+def test_chan_random_clouds_with_small_groups(monkeypatch):
+    # Many groups of m = 4 and 16 points: tangents to triangles, segments and single points
+    monkeypatch.setattr(algorithmsPolygon, "estimate_hull_size", lambda points: 1)
+    rng = random.Random(25)
+    for _ in range(200):
+        n = rng.randint(3, 120)
+        points = [(rng.randint(-15, 15), rng.randint(-15, 15)) for _ in range(n)]
+        assert [points[i] for i in chan(points)] == _reference_hull(points)
+
+
+def test_estimate_hull_size_is_exact_for_small_input():
+    for points in POINT_SETS.values():
+        assert estimate_hull_size(points) == max(len(_reference_hull(points)), 1)
+
+
+def _gaussian_cloud(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, 300, size=(n, 2))
+
+
+def _on_circle(n, seed=2):
+    angles = np.random.default_rng(seed).uniform(0, 2 * np.pi, n)
+    return np.stack([1000 * np.cos(angles), 1000 * np.sin(angles)], axis=1)
+
+
+def test_estimate_hull_size_tracks_growth():
+    cloud, circle = _gaussian_cloud(50000), _on_circle(50000)
+    assert estimate_hull_size(cloud) < 200
+    assert estimate_hull_size(circle) > 10000
+
+
+def test_auto_hull_choice():
+    monotone, quick = MonotoneChainStrategy(), QuickhullStrategy()
+    auto = AutoHullStrategy(monotone, quick)
+    # Small input: always the monotone chain
+    assert auto.choose(_gaussian_cloud(AUTO_SMALL_INPUT - 1)) is monotone
+    # Large cloud with few hull vertices: Quickhull
+    assert auto.choose(_gaussian_cloud(50000)) is quick
+    # Large input with every point on the hull: the sort-based monotone chain
+    assert auto.choose(_on_circle(50000)) is monotone
+    # Square of uniform points: h grows only as log n
+    uniform = np.random.default_rng(3).uniform(0, 1000, size=(50000, 2))
+    assert auto.choose(uniform) is quick
+
+
+def test_auto_hull_records_its_choice(monkeypatch):
+    monotone, quick = MonotoneChainStrategy(), QuickhullStrategy()
+    auto = AutoHullStrategy(monotone, quick)
+    calls = []
+    estimate = algorithmsPolygon.estimate_hull_size
+    monkeypatch.setattr(algorithmsPolygon, "estimate_hull_size", lambda points: calls.append(1) or estimate(points))
+    points = [tuple(point) for point in _gaussian_cloud(20000).tolist()]
+    _, hull = auto.execute(points, None)
+    assert auto.last_choice is quick
+    assert hull == [points[i] for i in quickhull(points)]
+    assert len(calls) == 1 # The estimate runs once per build
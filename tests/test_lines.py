@@ -0,0 +1,36 @@
+import random
+
+import numpy as np
+import pytest
+
+from model.algorithms.algorithmsLine import BresenhamStrategy, DoubleStepBresenhamStrategy
+from model.framebuffer import FrameBuffer
+
+
+class RectangleCanvas:
+    """Заглушка Canvas: запоминает прямоугольники."""
+    def __init__(self):
+        self.rectangles = []
+
+    def create_rectangle(self, *coords, **options):
+        self.rectangles.append(coords)
+
+
+@pytest.mark.parametrize("viewport", [None, (0, 0, 800, 600)])
+def test_double_step_fast_path_matches_bresenham(viewport):
+    rng = random.Random(3)
+    plain, double = BresenhamStrategy(), DoubleStepBresenhamStrategy()
+    for i in range(120):
+        a = [rng.randint(-50, 850), rng.randint(-50, 650)]
+        b = [rng.randint(-50, 850), rng.randint(-50, 650)]
+        if i % 5 == 0:
+            b = [a[0] + rng.randint(-40, 40), a[1] + rng.randint(-40, 40)]
+        assert list(double.iter_pixels(a, b, viewport)) == list(plain.iter_pixels(a, b, viewport))
+        expected, actual = RectangleCanvas(), RectangleCanvas()
+        plain.execute(a, b, expected, viewport=viewport)
+        double.execute(a, b, actual, viewport=viewport)
+        assert sorted(actual.rectangles) == sorted(expected.rectangles)
+        expected, actual = FrameBuffer(800, 600), FrameBuffer(800, 600)
+        plain.execute(a, b, expected, viewport=viewport)
+        double.execute(a, b, actual, viewport=viewport)
+        assert np.array_equal(actual.render(), expected.render())
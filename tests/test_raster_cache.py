@@ -0,0 +1,103 @@
+import random
+
+import numpy as np
+import pytest
+
+from model.algorithms.rasterCache import RasterCache
+from model.algorithms.algorithmsLine import (DDAStrategy, BresenhamStrategy,
+                                             DoubleStepBresenhamStrategy, WuStrategy, LineContext)
+from model.algorithms.algorithmsSecondOrderLine import (BresenhamCircleStrategy, BresenhamEllipseStrategy,
+                                                        WuCircleStrategy, WuEllipseStrategy)
+
+
+def _direct(strategy, points):
+    pixels = list(strategy.iter_pixels(*points))
+    coords = np.array([(x, y) for x, y, _ in pixels], dtype=np.int64).reshape(-1, 2)
+    return coords, np.array([i for _, _, i in pixels], dtype=float)
+
+
+def _random_points(rng, count, integer):
+    if integer:
+        return [(rng.randint(-60, 60), rng.randint(-60, 60)) for _ in range(count)]
+    return [(rng.uniform(-60, 60), rng.uniform(-60, 60)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("strategy, count", [
+    (BresenhamStrategy(), 2),
+    (BresenhamCircleStrategy(), 2),
+    (BresenhamEllipseStrategy(), 3),
+    (WuCircleStrategy(), 2),
+    (WuEllipseStrategy(), 3),
+])
+@pytest.mark.parametrize("integer", [True, False])
+def test_cache_hit_matches_direct_rasterization(strategy, count, integer):
+    rng = random.Random(count * 2 + integer)
+    cache = RasterCache()
+    compute = lambda points: strategy.iter_pixels(*points)
+    hits = 0
+    for _ in range(300):
+        points = _random_points(rng, count, integer)
+        cache.lookup(strategy, points, compute)
+        dx, dy = rng.randint(-40, 40), rng.randint(-40, 40)
+        shifted = [(x + dx, y + dy) for x, y in points]
+        before = cache.hits
+        coords, intensities = cache.lookup(strategy, shifted, compute)
+        hits += cache.hits - before
+        expected_coords, expected_intensities = _direct(strategy, shifted)
+        assert np.array_equal(coords, expected_coords)
+        assert np.allclose(intensities, expected_intensities)
+    assert hits > 0
+
+
+@pytest.mark.parametrize("strategy", [DDAStrategy(), WuStrategy(), DoubleStepBresenhamStrategy()])
+def test_uncached_line_strategies(strategy):
+    cache = RasterCache()
+    assert cache.lookup(strategy, [(0.0, 0.0), (10.0, 3.0)], lambda points: strategy.iter_pixels(*points)) is None
+
+
+class CountingBresenham(BresenhamStrategy):
+    """Брезенхем, считающий пиксели, прочитанные без отсечения."""
+    def __init__(self):
+        super().__init__()
+        self.unclipped_pixels = 0
+
+    def iter_pixels(self, a, b, viewport=None):
+        for pixel in super().iter_pixels(a, b, viewport):
+            if viewport is None:
+                self.unclipped_pixels += 1
+            yield pixel
+
+
+class RectangleCanvas:
+    """Заглушка Canvas: запоминает прямоугольники."""
+    def __init__(self):
+        self.rectangles = []
+
+    def create_rectangle(self, *coords, **options):
+        self.rectangles.append(coords)
+
+
+def test_offscreen_line_miss_is_not_rasterized_in_full():
+    strategy = CountingBresenham()
+    viewport = (0, 0, 800, 600)
+    a, b = (-30000, 300), (30000, 310)
+    cache = RasterCache()
+    assert cache.lookup(strategy, (a, b), lambda points: strategy.iter_pixels(*points),
+                        viewport, strategy.VIEWPORT_MARGIN, (-30000, 300, 30000, 310)) is None
+    assert strategy.unclipped_pixels == 0
+    assert cache.stats()["entries"] == 0
+
+    context = LineContext()
+    canvas = RectangleCanvas()
+    assert context.execute_cached(a, b, canvas, viewport, strategy) is not None
+    assert strategy.unclipped_pixels == 0
+    assert 0 < len(canvas.rectangles) <= 810
+
+
+def test_onscreen_line_is_cached():
+    strategy = CountingBresenham()
+    context = LineContext()
+    context.execute_cached((10, 10), (200, 90), RectangleCanvas(), (0, 0, 800, 600), strategy)
+    context.execute_cached((20, 30), (210, 110), RectangleCanvas(), (0, 0, 800, 600), strategy)
+    assert context.cache.stats()["hits"] == 1
+    assert strategy.unclipped_pixels == 191
@@ -0,0 +1,83 @@
+import math
+import random
+
+import pytest
+
+from model.algorithms.algorithmsSecondOrderLine import BresenhamHyperbolaStrategy, BresenhamParabolaStrategy
+from model.algorithms.conicTracer import conic_frame
+
+
+def _pixels(stream):
+    return sorted({(x, y) for x, y, _ in stream})
+
+
+@pytest.mark.parametrize("points", [
+    ([100, 100], [100, 112], [140, 100]),
+    ([0, 0], [0, -5], [10, 0]),
+    ([-30, 40], [-30, 41], [-80, 40]),
+])
+@pytest.mark.parametrize("viewport", [None, (0, 0, 130, 130)])
+def test_parabola_axis_aligned_matches_rotated_path(points, viewport):
+    strategy = BresenhamParabolaStrategy()
+    expected = _pixels(strategy.iter_pixels(*points, viewport=viewport))
+    assert expected == _pixels(strategy.iter_rotated_pixels(*points, 0, viewport))
+    assert expected == _pixels(strategy.iter_rotated_pixels(*points, 360, viewport))
+
+
+@pytest.mark.parametrize("strategy, points", [
+    (BresenhamParabolaStrategy(), lambda cx, cy, rx, ry: ([cx, cy], [cx, cy + ry], [cx + rx, cy])),
+    (BresenhamHyperbolaStrategy(), lambda cx, cy, rx, ry: ([cx, cy], [cx + rx, cy], [cx, cy + ry])),
+])
+def test_execute_many_matches_single_shapes(strategy, points):
+    centers, radii = [[100, 100], [200, 150]], [[20, 10], [30, 15]]
+    pixels, _, index = strategy.execute_many(centers, radii)
+    for i, ((cx, cy), (rx, ry)) in enumerate(zip(centers, radii)):
+        expected = [(x, y) for x, y, _ in strategy.iter_pixels(*points(cx, cy, rx, ry))]
+        assert expected
+        assert [tuple(p) for p in pixels[index == i].tolist()] == expected
+
+
+def _hyperbola_cases(count, seed):
+    rng = random.Random(seed)
+    for _ in range(count):
+        a, b = rng.randint(1, 150), rng.randint(1, 150)
+        cx, cy = rng.randint(-50, 850), rng.randint(-50, 650)
+        yield (cx, cy), a, b, ([cx, cy], [cx + a, cy], [cx, cy + b])
+
+
+def test_hyperbola_follows_the_true_curve():
+    strategy = BresenhamHyperbolaStrategy()
+    for (cx, cy), a, b, points in _hyperbola_cases(150, 14):
+        pixels = _pixels(strategy.iter_pixels(*points))
+        assert pixels
+        for x, y in pixels:
+            u, v = x - cx, y - cy
+            # Distance to x^2/a^2 - y^2/b^2 = 1 to first order: |F| / |grad F|
+            f = u * u / (a * a) - v * v / (b * b) - 1
+            assert abs(f) / (2 * math.hypot(u / (a * a), v / (b * b))) <= 0.75, (a, b, u, v)
+        # Same extent as the conic tracer (which may finish the last step one pixel further)
+        assert 4 * (a + b) <= max(abs(y - cy) for _, y in pixels) <= 4 * (a + b) + 1
+
+
+def test_hyperbola_viewport_trace_covers_unbounded_trace():
+    strategy = BresenhamHyperbolaStrategy()
+    viewport, margin = (0, 0, 800, 600), strategy.VIEWPORT_MARGIN
+    for (cx, cy), a, b, points in _hyperbola_cases(150, 41):
+        clipped = set(_pixels(strategy.iter_pixels(*points, viewport=viewport)))
+        full = {(x, y) for x, y in _pixels(strategy.iter_pixels(*points))
+                if -margin <= x <= 800 + margin and -margin <= y <= 600 + margin}
+        # The trace may start at another pixel of the same curve, never more than a pixel off
+        for x, y in full:
+            assert any((x + dx, y + dy) in clipped for dx in (-1, 0, 1) for dy in (-1, 0, 1)), (a, b, x, y)
+        assert all(-margin <= x <= 800 + margin and -margin <= y <= 600 + margin for x, y in clipped)
+
+
+@pytest.mark.parametrize("a, b", [(100, 20), (20, 100), (37, 41)])
+@pytest.mark.parametrize("angle, viewport", [(1e-6, (0, 0, 800, 600)), (360, None), (-360, (0, 0, 800, 600))])
+def test_hyperbola_axis_aligned_matches_rotated_path(a, b, angle, viewport):
+    strategy = BresenhamHyperbolaStrategy()
+    center = (400, 300)
+    expected = _pixels(strategy.iter_pixels(center, (400 + a, 300), (400, 300 + b), viewport))
+    u, v = conic_frame(angle)
+    points = (center, (400 + a * u[0], 300 + a * u[1]), (400 + b * v[0], 300 + b * v[1]))
+    assert expected == _pixels(strategy.iter_rotated_pixels(*points, angle, viewport))
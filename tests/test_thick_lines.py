@@ -0,0 +1,42 @@
+import pytest
+
+from model.algorithms.algorithmsLine import thick_line_polygon
+from model.algorithms.algorithmsFill import scanline_spans
+
+
+def _pixels(a, b, width, cap="butt"):
+    polygon = thick_line_polygon(a, b, width, cap)
+    return {(x, y) for y, x_start, x_end in scanline_spans(polygon, half_open_x=True)
+            for x in range(x_start, x_end + 1)}
+
+
+@pytest.mark.parametrize("width", [2, 3, 4, 7, 20])
+def test_horizontal_line_has_width_rows(width):
+    pixels = _pixels((10, 50), (60, 50), width)
+    assert len({y for _, y in pixels}) == width
+    assert len(pixels) == width * 50
+
+
+@pytest.mark.parametrize("width", [2, 3, 4, 7, 20])
+def test_vertical_line_has_width_columns(width):
+    pixels = _pixels((50, 10), (50, 60), width)
+    assert len({x for x, _ in pixels}) == width
+    assert len(pixels) == width * 50
+
+
+@pytest.mark.parametrize("width", [2, 3, 4, 7, 20])
+def test_thickness_does_not_depend_on_direction(width):
+    horizontal = _pixels((10, 50), (60, 50), width)
+    vertical = _pixels((50, 10), (50, 60), width)
+    # The vertical line is the horizontal one reflected in the diagonal x = y
+    assert vertical == {(y, x) for x, y in horizontal}
+
+
+@pytest.mark.parametrize("width", [2, 3, 5, 10])
+def test_diagonal_line_covers_its_area(width):
+    length = 60 * 2 ** 0.5
+    pixels = _pixels((20, 20), (80, 80), width)
+    # One pixel per unit of area, up to the staircase along the two long edges
+    assert abs(len(pixels) - width * length) <= 2 * length / 2 ** 0.5
+    # The 45 degree line is symmetric with respect to its own axis
+    assert pixels == {(y, x) for x, y in pixels}
@@ -11,6 +11,10 @@ class CanvasView:
         self.start_x = None
         self.start_y = None
 
+        # Растровый буфер выводится одним элементом-изображением
+        self.frame_image = None
+        self.frame_image_id = None
+
     def get_canvas(self):
         """Возвращает объект canvas."""
         return self.canvas
@@ -37,6 +41,7 @@ class CanvasView:
         self.canvas.unbind("<Button-1>")
         self.canvas.unbind("<B1-Motion>")
         self.canvas.unbind("<ButtonRelease-1>")
+        self.canvas.unbind("<Button-3>")
         # Add any other events that might be bound elsewhere
         # For example, if you use <Enter>, <Leave>, etc.
         # self.canvas.unbind("<Any-Other-Event>")
@@ -44,6 +49,26 @@ class CanvasView:
     def clear(self):
         """Очищает Canvas."""
         self.canvas.delete("all")
+        self.frame_image = None
+        self.frame_image_id = None
+
+    def blit(self, framebuffer):
+        """Выводит буфер кадра на холст одним PhotoImage (один элемент на кадр)."""
+        data = framebuffer.to_ppm()
+        size = (framebuffer.width, framebuffer.height)
+        if self.frame_image is not None and (self.frame_image.width(), self.frame_image.height()) == size:
+            self.frame_image.configure(data=data, format="PPM")
+        else:
+            self.frame_image = tk.PhotoImage(data=data, format="PPM")
+        if self.frame_image_id is None or not self.canvas.find_withtag(self.frame_image_id):
+            self.frame_image_id = self.canvas.create_image(0, 0, anchor=tk.NW, image=self.frame_image, tags="framebuffer")
+        else:
+            self.canvas.itemconfig(self.frame_image_id, image=self.frame_image)
+        self.canvas.tag_lower(self.frame_image_id) # Handles and vector items stay on top
+
+    def get_viewport(self):
+        """Возвращает видимую область холста (xmin, ymin, xmax, ymax)."""
+        return 0, 0, self.canvas.winfo_width(), self.canvas.winfo_height()
 
     def get_coordinates(self, event):
         """Возвращает координаты события."""